@@ -0,0 +1,151 @@
+"""Compare end-of-speech-to-transcript latency of recognizer.listen and VAD capture.
+
+Plays WAV fixtures (16-bit mono) in real time through the old capture
+(``recognizer.listen`` with default thresholds, then recognition) and
+through StreamingCapture (adaptive VAD, early endpointing, speculative
+recognition at pauses). Latency is measured from the moment the last
+speech frame is delivered until the transcript is available.
+
+    python benchmarks/capture_benchmark.py fixtures/ --backend google
+    python benchmarks/capture_benchmark.py --synthetic 5 --stt-latency 0.4
+"""
+import argparse
+import glob
+import math
+import os
+import random
+import statistics
+import struct
+import sys
+import tempfile
+import time
+import wave
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import speech_recognition as sr  # noqa: E402
+
+from capture import SAMPLE_WIDTH, EnergyVAD, StreamingCapture, WavSource, frame_rms  # noqa: E402
+from recognition import LocalBackend, RecognitionEngine, create_backend  # noqa: E402
+
+
+class FrameStreamSource(sr.AudioSource):
+    """Feeds WavSource frames to recognizer.listen as if from a microphone"""
+
+    def __init__(self, wav_source):
+        self.SAMPLE_RATE = wav_source.sample_rate
+        self.SAMPLE_WIDTH = SAMPLE_WIDTH
+        self.CHUNK = wav_source.sample_rate * wav_source.frame_ms // 1000
+        self.stream = self
+        self._frames = wav_source.frames()
+
+    def read(self, size):
+        return next(self._frames, b"")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._frames.close()
+
+
+def write_synthetic(path, seed, speech_seconds=1.6, rate=16000):
+    """Room noise, a voiced phrase with a short pause in it, then silence"""
+    rng = random.Random(seed)
+    pitch = 110 + 40 * rng.random()
+    samples = []
+    segments = [(0.6, False), (speech_seconds * 0.6, True), (0.12, False),
+                (speech_seconds * 0.4, True), (1.5, False)]
+    t = 0
+    for seconds, voiced in segments:
+        for _ in range(int(seconds * rate)):
+            value = rng.gauss(0, 80)
+            if voiced:
+                envelope = 0.6 + 0.4 * math.sin(2 * math.pi * 4 * t / rate)
+                value += envelope * sum(2500 / k * math.sin(2 * math.pi * pitch * k * t / rate) for k in range(1, 5))
+            samples.append(max(-32768, min(32767, int(value))))
+            t += 1
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(rate)
+        wav.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+
+
+def speech_end_frame(path, ratio=3.0):
+    """Index of the last frame clearly above the fixture's opening noise level"""
+    source = WavSource(path, pad_ms=0)
+    energies = [frame_rms(frame) for frame in source.frames()]
+    opening = energies[:10]
+    floor = sum(opening) / len(opening)
+    voiced = [i for i, energy in enumerate(energies) if energy > max(floor * ratio, 120)]
+    return voiced[-1] if voiced else len(energies) - 1
+
+
+def run_one(path, make_engine, use_vad, webrtc_mode):
+    end_frame = speech_end_frame(path)
+    delivered = {}
+
+    def on_frame(index):
+        if index == end_frame:
+            delivered["at"] = time.monotonic()
+
+    source = WavSource(path, realtime=True, on_frame=on_frame)
+    engine = make_engine()
+    if use_vad:
+        vad = EnergyVAD(sample_rate=source.sample_rate, webrtc_mode=webrtc_mode)
+        utterance = StreamingCapture(source, vad=vad, on_speculate=engine.prefetch).capture()
+        audio = utterance.audio if utterance else None
+    else:
+        recognizer = sr.Recognizer()
+        with FrameStreamSource(source) as stream:
+            audio = recognizer.listen(stream, phrase_time_limit=6.0)
+    text = engine.recognize(audio) if audio else None
+    return time.monotonic() - delivered.get("at", time.monotonic()), text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("fixtures", nargs="?", help="directory of .wav files")
+    parser.add_argument("--synthetic", type=int, default=5, help="generated fixtures when no directory is given")
+    parser.add_argument("--backend", default="fake", help="'fake' or a BUJJI_STT_BACKEND name")
+    parser.add_argument("--stt-latency", type=float, default=0.4, help="seconds per request for the fake backend")
+    parser.add_argument("--webrtc", type=int, default=None, help="webrtcvad aggressiveness (0-3), if installed")
+    args = parser.parse_args()
+
+    if args.backend == "fake":
+        def recognize(audio, language):
+            time.sleep(args.stt_latency)
+            return "పరీక్ష"
+        backend = LocalBackend(recognize, confidence=0.9)
+    else:
+        backend = create_backend(args.backend)
+    make_engine = lambda: RecognitionEngine(backend)  # noqa: E731 - fresh cache per run
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.fixtures:
+            paths = sorted(glob.glob(os.path.join(args.fixtures, "*.wav")))
+        else:
+            paths = []
+            for i in range(args.synthetic):
+                path = os.path.join(tmp, f"synthetic{i}.wav")
+                write_synthetic(path, seed=i)
+                paths.append(path)
+        if not paths:
+            sys.exit(f"No .wav files found in {args.fixtures}")
+
+        listen_times, vad_times = [], []
+        for path in paths:
+            listen_latency, listen_text = run_one(path, make_engine, False, args.webrtc)
+            vad_latency, vad_text = run_one(path, make_engine, True, args.webrtc)
+            listen_times.append(listen_latency)
+            vad_times.append(vad_latency)
+            print(f"{os.path.basename(path)}: listen {listen_latency:.2f}s {listen_text!r} | "
+                  f"vad {vad_latency:.2f}s {vad_text!r}")
+
+    print(f"\nmedian end-of-speech to transcript: listen {statistics.median(listen_times):.2f}s, "
+          f"vad {statistics.median(vad_times):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Offline end-to-end benchmark of scripted voice sessions.
+
+Drives AudioChatbot and UserManager through thousands of turns with local
+fakes for Gemini, gTTS, Google STT and the microphone, then reports
+turns/sec, per-stage latency and memory growth. No network is needed.
+
+    python benchmarks/e2e_benchmark.py --turns 2000 --llm-latency 0.02
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+from fakes import FakeGemini, FakeGTTS, FakePlayer, FakeSpeech, install_fakes  # noqa: E402
+
+UTTERANCES = [
+    "నమస్కారం బుజ్జి",
+    "ఈరోజు వాతావరణం ఎలా ఉంది",
+    "నాకు ఒక కథ చెప్పు",
+    "సమయం ఎంత",
+    "నువ్వు ఎలా ఉన్నావ్",
+]
+
+
+def run_session(args, data_dir):
+    # Imported after the fakes are installed so nothing reaches the network
+    from audio_chatbot import AudioChatbot
+    from tracing import tracer
+    from user_manager import UserManager
+
+    user_manager = UserManager(data_dir=os.path.join(data_dir, "user_data"))
+    user_manager.create_user("bench", "bench")
+    context = user_manager.get_user_context("bench")
+    chatbot = AudioChatbot(context)
+    chatbot.streaming = args.streaming
+
+    memory_samples = []
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+
+    for turn in range(1, args.turns + 1):
+        tracer.new_turn()
+        with tracer.span("turn"):
+            text = chatbot.listen()
+            user_manager.update_user_context("bench", text, is_human=True)
+            if chatbot.streaming:
+                response = chatbot.speak_streaming(chatbot.stream_llm_response(text))
+            else:
+                response = chatbot.get_llm_response(text)
+                chatbot.speak(response)
+            user_manager.update_user_context("bench", response, is_human=False)
+        if turn % args.sample_every == 0 or turn == args.turns:
+            memory_samples.append((turn, tracemalloc.get_traced_memory()[0] - baseline))
+
+    user_manager.flush()
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    # Read before close(), which stops the writer and drops its counters
+    persistence = user_manager.persistence_stats()
+    user_manager.close()
+    return {
+        "turns": args.turns,
+        "seconds": elapsed,
+        "turns_per_sec": args.turns / elapsed,
+        "latency_ms": tracer.summary(),
+        "memory_bytes": memory_samples,
+        "persistence": persistence,
+        "tts_cache": chatbot.tts_cache.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds before the first token")
+    parser.add_argument("--token-latency", type=float, default=0.002, help="seconds between streamed tokens")
+    parser.add_argument("--reply-chars", type=int, default=300)
+    parser.add_argument("--tts-latency", type=float, default=0.03)
+    parser.add_argument("--stt-latency", type=float, default=0.03)
+    parser.add_argument("--capture-latency", type=float, default=0.01)
+    parser.add_argument("--no-streaming", dest="streaming", action="store_false")
+    parser.add_argument("--sample-every", type=int, default=100, help="turns between memory samples")
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    args = parser.parse_args()
+
+    os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+    # The fakes stand in for recognizer.listen, not the VAD frame capture
+    os.environ["BUJJI_VAD"] = "0"
+    FakeGTTS.latency = args.tts_latency
+    llm = FakeGemini(latency=args.llm_latency, token_latency=args.token_latency, reply_chars=args.reply_chars)
+    speech = FakeSpeech(UTTERANCES, capture_latency=args.capture_latency, stt_latency=args.stt_latency)
+
+    from tracing import tracer
+    tracer.enable()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        cwd = os.getcwd()
+        os.chdir(data_dir)  # keep the speech cache out of the working tree
+        try:
+            with install_fakes(llm, speech, FakePlayer()):
+                report = run_session(args, data_dir)
+        finally:
+            os.chdir(cwd)
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+
+    print(f"{report['turns']} turns in {report['seconds']:.1f}s ({report['turns_per_sec']:.1f} turns/sec)\n")
+    print(tracer.format_summary())
+    print("\nmemory growth (tracemalloc):")
+    for turn, growth in report["memory_bytes"]:
+        print(f"  after {turn:>6} turns: {growth / 1024:10.1f} KiB")
+    print(f"\npersistence: {report['persistence']}")
+    print(f"tts cache:   {report['tts_cache']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Throughput and memory of each embedding backend, bare and behind EmbeddingService.
+
+Each backend runs in its own process so its resident memory is measured
+on its own. Reports load time, peak RSS, embeddings/sec for one text per
+call and for batches, embeddings/sec with concurrent single-text callers
+through the micro-batching service, and the cache hit rate on a
+conversation-like mix where fixed phrases repeat.
+
+    python benchmarks/embedding_benchmark.py --backends hashing huggingface
+    python benchmarks/embedding_benchmark.py --backends onnx --model-dir models/minilm
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+WORDS = ["నమస్కారం", "బుజ్జి", "ఎలా", "ఉన్నావ్", "చాలా", "బాగుంది", "ఈరోజు", "వాతావరణం",
+         "సినిమా", "పాట", "అన్నం", "ఇంటికి", "రేపు", "స్కూల్", "ఆట", "పుస్తకం"]
+
+
+def utterances(count, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 14))) for _ in range(count)]
+
+
+def rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3  # bytes on macOS, KiB elsewhere
+
+
+def rate(fn, texts):
+    start = time.perf_counter()
+    fn(texts)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def measure(backend_name, model_dir, count, callers):
+    from embedding_backends import EmbeddingService, create_backend
+    from phrases import FIXED_PHRASES
+    from resources import EMBEDDING_MODEL
+
+    start = time.perf_counter()
+    backend = create_backend(backend_name, EMBEDDING_MODEL, model_dir=model_dir)
+    backend.embed_documents(["warm up"])
+    result = {"backend": backend_name, "load_s": time.perf_counter() - start}
+
+    texts = utterances(count)
+    result["single_per_s"] = rate(lambda batch: [backend.embed_query(t) for t in batch], texts)
+    result["batch32_per_s"] = rate(
+        lambda batch: [backend.embed_documents(batch[i:i + 32]) for i in range(0, len(batch), 32)], texts)
+
+    # Concurrent single-text callers, as from many sessions at once
+    service = EmbeddingService(backend, cache_size=0)
+    fresh = utterances(count, seed=1)
+
+    def concurrent(batch):
+        threads = [threading.Thread(target=lambda part: [service.embed_query(t) for t in part],
+                                    args=(batch[i::callers],)) for i in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    result["service_concurrent_per_s"] = rate(concurrent, fresh)
+    result["mean_batch"] = service.stats()["mean_batch"]
+
+    # Conversation-like mix: a third of the texts are fixed phrases
+    cached = EmbeddingService(backend)
+    rng = random.Random(2)
+    mix = [rng.choice(FIXED_PHRASES) if rng.random() < 0.33 else text for text in utterances(count, seed=2)]
+    result["cached_mix_per_s"] = rate(lambda batch: [cached.embed_query(t) for t in batch], mix)
+    result["cache_hit_rate"] = cached.stats()["hit_rate"]
+    result["peak_rss_mb"] = rss_mb()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["hashing", "huggingface"],
+                        help="any of hashing, huggingface, onnx")
+    parser.add_argument("--model-dir", help="exported ONNX model directory for the onnx backend")
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--callers", type=int, default=8, help="concurrent callers through the service")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.model_dir, args.texts, args.callers)))
+        return
+
+    print(f"{'backend':<12} {'load':>6} {'rss':>8} {'single/s':>9} {'batch32/s':>10} "
+          f"{'service/s':>10} {'batch':>6} {'mix/s':>9} {'hits':>6}")
+    for name in args.backends:
+        command = [sys.executable, os.path.abspath(__file__), "--child", name,
+                   "--texts", str(args.texts), "--callers", str(args.callers)]
+        if args.model_dir:
+            command += ["--model-dir", args.model_dir]
+        child = subprocess.run(command, capture_output=True, text=True)
+        if child.returncode != 0:
+            print(f"{name:<12} failed: {child.stderr.strip().splitlines()[-1] if child.stderr.strip() else '?'}")
+            continue
+        r = json.loads(child.stdout.strip().splitlines()[-1])
+        print(f"{name:<12} {r['load_s']:5.1f}s {r['peak_rss_mb']:6.0f}MB {r['single_per_s']:9.0f} "
+              f"{r['batch32_per_s']:10.0f} {r['service_concurrent_per_s']:10.0f} {r['mean_batch']:6.1f} "
+              f"{r['cached_mix_per_s']:9.0f} {r['cache_hit_rate']:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
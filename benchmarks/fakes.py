@@ -0,0 +1,159 @@
+"""Deterministic local stand-ins for Gemini, gTTS, Google STT and the microphone.
+
+Every fake has configurable latency and payload size so benchmarks can
+model slow or fast services without network access.
+"""
+import threading
+import time
+from contextlib import ExitStack
+from typing import Any, Iterator, List, Optional
+from unittest import mock
+
+import speech_recognition as sr
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+import resources
+import tts_cache
+
+TELUGU_WORDS = ["నమస్కారం", "బుజ్జి", "ఎలా", "ఉన్నావ్", "చాలా", "బాగుంది", "ఈరోజు", "వాతావరణం"]
+
+
+def telugu_text(chars: int, seed: int = 0) -> str:
+    """Deterministic Telugu-looking text of roughly ``chars`` characters"""
+    words, length, i = [], 0, seed
+    while length < chars:
+        word = TELUGU_WORDS[i % len(TELUGU_WORDS)]
+        i += 1
+        # End a sentence every eight words so streaming has boundaries to cut at
+        if i % 8 == 0:
+            word += "."
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+class FakeGemini(LLM):
+    """Stands in for GoogleGenerativeAI with a fixed latency and reply size"""
+
+    latency: float = 0.05
+    token_latency: float = 0.002
+    reply_chars: int = 300
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-gemini"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        self.calls += 1
+        time.sleep(self.latency)
+        return telugu_text(self.reply_chars, seed=self.calls)
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None,
+                **kwargs: Any) -> Iterator[GenerationChunk]:
+        self.calls += 1
+        time.sleep(self.latency)
+        for word in telugu_text(self.reply_chars, seed=self.calls).split(" "):
+            time.sleep(self.token_latency)
+            yield GenerationChunk(text=word + " ")
+
+
+class FakeGTTS:
+    """Stands in for gTTS; writes ``bytes_per_char`` bytes per character"""
+
+    latency = 0.03
+    bytes_per_char = 200
+
+    def __init__(self, text, lang='te', tld='com', **kwargs):
+        self.text = text
+
+    def write_to_fp(self, fp):
+        time.sleep(self.latency)
+        fp.write(b"\xff\xfb" * (len(self.text) * self.bytes_per_char // 2))
+
+
+class FakePlayer:
+    """Stands in for AudioPlayer; "plays" at ``bytes_per_second``"""
+
+    def __init__(self, bytes_per_second: float = 2_000_000):
+        self.bytes_per_second = bytes_per_second
+        self._stop = threading.Event()
+
+    def play(self, audio: bytes):
+        from playback import Playback
+        playback = Playback(audio, 0)
+        playback.started_at = time.monotonic()
+        playback.started.set()
+        self._stop.wait(len(audio) / self.bytes_per_second)
+        playback.done.set()
+        return playback
+
+    def stop(self):
+        self._stop.set()
+        self._stop = threading.Event()
+
+    @property
+    def busy(self):
+        return False
+
+
+class FakeMicrophone:
+    """Context manager standing in for sr.Microphone"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeSpeech:
+    """Scripted utterances for Recognizer.listen and recognize_google"""
+
+    def __init__(self, utterances: List[str], capture_latency: float = 0.01,
+                 stt_latency: float = 0.03, audio_seconds: float = 2.0):
+        self.utterances = utterances
+        self.capture_latency = capture_latency
+        self.stt_latency = stt_latency
+        self.audio_seconds = audio_seconds
+        self.turn = 0
+
+    def listen(self, recognizer, source, *args, **kwargs):
+        time.sleep(self.capture_latency)
+        self.turn += 1
+        # Unique audio per turn so the recognition cache does not short-circuit
+        frames = self.turn.to_bytes(4, "little") * int(16000 * self.audio_seconds / 2)
+        return sr.AudioData(frames, 16000, 2)
+
+    def recognize_google(self, recognizer, audio, language="en-US", show_all=False, **kwargs):
+        time.sleep(self.stt_latency)
+        turn = int.from_bytes(audio.get_raw_data()[:4], "little")
+        text = self.utterances[(turn - 1) % len(self.utterances)]
+        if language != "te-IN":
+            text = "transliterated text"
+        result = {"alternative": [{"transcript": text, "confidence": 0.9 if language == "te-IN" else 0.4}]}
+        return result if show_all else text
+
+
+def install_fakes(llm: FakeGemini, speech: FakeSpeech, player: Optional[FakePlayer] = None,
+                  embedding_size: int = 384) -> ExitStack:
+    """Patch every external service; close the returned stack to undo"""
+    stack = ExitStack()
+    stack.enter_context(mock.patch.object(resources, "_llm", llm))
+    stack.enter_context(mock.patch.object(resources, "_embeddings", DeterministicFakeEmbedding(size=embedding_size)))
+    stack.enter_context(mock.patch.object(resources, "_audio_player", player or FakePlayer()))
+    stack.enter_context(mock.patch.object(tts_cache, "gTTS", FakeGTTS))
+    stack.enter_context(mock.patch.object(sr, "Microphone", FakeMicrophone))
+    stack.enter_context(mock.patch.object(
+        sr.Recognizer, "listen", lambda recognizer, source, *a, **kw: speech.listen(recognizer, source, *a, **kw)
+    ))
+    stack.enter_context(mock.patch.object(
+        sr.Recognizer, "recognize_google",
+        lambda recognizer, audio, *a, **kw: speech.recognize_google(recognizer, audio, *a, **kw)
+    ))
+    return stack
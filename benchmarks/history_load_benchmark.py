@@ -0,0 +1,80 @@
+"""Compare loading the last N turns with a full scan versus fetching them by turn id.
+
+Populates a throwaway Chroma store with synthetic turns for one user and
+times the old path (get everything, sort in Python, keep the tail) against
+UserManager.get_recent_turns, which looks the tail up by id.
+
+    python benchmarks/history_load_benchmark.py --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from persistence import turn_id  # noqa: E402
+from user_manager import UserManager  # noqa: E402
+
+USERNAME = "bench_user"
+DIMENSIONS = 8  # vector size does not matter for metadata lookups
+BATCH = 5000
+
+
+def populate(collection, count):
+    start = time.time() - count
+    for offset in range(0, count, BATCH):
+        size = min(BATCH, count - offset)
+        turns = range(offset + 1, offset + size + 1)
+        collection.add(
+            ids=[turn_id(USERNAME, turn) for turn in turns],
+            embeddings=[[random.random() for _ in range(DIMENSIONS)] for _ in turns],
+            documents=[f"message number {turn}" for turn in turns],
+            metadatas=[{
+                "timestamp": start + turn,
+                "type": "human" if turn % 2 else "ai",
+                "username": USERNAME,
+                "turn": turn,
+            } for turn in turns],
+        )
+
+
+def full_scan(collection, limit):
+    results = collection.get(where={"username": USERNAME}, include=['metadatas', 'documents'])
+    rows = sorted(zip(results['documents'], results['metadatas']), key=lambda r: r[1]['timestamp'])
+    return rows[-limit:]
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--window", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'turns':>10} {'full scan':>12} {'indexed':>12} {'speedup':>9}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            manager = UserManager(data_dir=data_dir)
+            collection = manager.collection
+            populate(collection, size)
+            manager.store.create(USERNAME, "unused", last_turn=size)
+
+            scan = timed(lambda: full_scan(collection, args.window), args.repeat)
+            indexed = timed(lambda: manager.get_recent_turns(USERNAME, args.window, collection), args.repeat)
+            print(f"{size:>10} {scan * 1000:>10.1f}ms {indexed * 1000:>10.1f}ms {scan / indexed:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
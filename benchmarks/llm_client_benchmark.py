@@ -0,0 +1,194 @@
+"""Tail latency and error rate of the LLM client layer against a local mock Gemini.
+
+Starts a mock of the Gemini REST API on localhost with configurable
+latency, slow-tail and error rates. Many concurrent sessions then call
+it twice: once through the bare GoogleGenerativeAI client and once
+through ResilientLLM (retries, deadlines, optional hedging, shared rate
+limiter). Reports p50/p95/p99 latency, error rate and client stats. First
+checks that a 429 costs exactly one upstream request per attempt.
+
+    python benchmarks/llm_client_benchmark.py --sessions 32 --calls 20 --error-rate 0.05 --hedge
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+REPLY = "నమస్కారం! నేను బుజ్జి. మీకు ఎలా సహాయం చేయగలను?"
+
+
+def candidate(text):
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"},
+                            "finishReason": "STOP", "index": 0}]}
+
+
+class MockGemini(BaseHTTPRequestHandler):
+    """generateContent / streamGenerateContent with injected latency and failures"""
+
+    latency = 0.15
+    slow_rate = 0.05
+    slow_latency = 2.0
+    error_rate = 0.05
+    requests = 0
+    fail_next = 0  # answer this many upcoming requests with 429
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with MockGemini.lock:
+            MockGemini.requests += 1
+            forced = MockGemini.fail_next > 0
+            MockGemini.fail_next -= forced
+        if forced:
+            self._send(429, {"error": {"code": 429, "message": "mock quota", "status": "RESOURCE_EXHAUSTED"}})
+            return
+        roll = random.random()
+        if roll < self.error_rate:
+            self._send(503 if roll < self.error_rate / 2 else 429,
+                       {"error": {"code": 503, "message": "mock overload", "status": "UNAVAILABLE"}})
+            return
+        time.sleep(self.slow_latency if random.random() < self.slow_rate
+                   else random.lognormvariate(0, 0.3) * self.latency)
+        if ":streamGenerateContent" in self.path:
+            self._send(200, [candidate(word + " ") for word in REPLY.split(" ")])
+        else:
+            self._send(200, candidate(REPLY))
+
+    def _send(self, status, body):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def run_load(llm, sessions, calls, streaming):
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def session():
+        for _ in range(calls):
+            start = time.perf_counter()
+            try:
+                if streaming:
+                    "".join(llm.stream("నమస్కారం"))
+                else:
+                    llm.invoke("నమస్కారం")
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                with lock:
+                    errors.append(type(e).__name__)
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def upstream_requests(llm, fail_next):
+    """Requests the mock received for one call while the next ``fail_next`` get a 429"""
+    with MockGemini.lock:
+        MockGemini.requests = 0
+        MockGemini.fail_next = fail_next
+    try:
+        llm.invoke("నమస్కారం")
+    except Exception:
+        pass
+    with MockGemini.lock:
+        MockGemini.fail_next = 0
+        return MockGemini.requests
+
+
+def check_single_attempt(client):
+    """A 429 must cost exactly one upstream request per ResilientLLM attempt.
+
+    Catches retries hidden inside the client, which would stack under
+    ResilientLLM's own retries, skip its rate limiter and outlast its deadline.
+    """
+    from llm_client import ResilientLLM
+    error_rate, MockGemini.error_rate = MockGemini.error_rate, 0.0
+    no_retries = ResilientLLM(client.llm, max_retries=0, call_kwargs=client.call_kwargs)
+    one_retry = ResilientLLM(client.llm, max_retries=1, backoff=0.01, call_kwargs=client.call_kwargs)
+    results = {"one attempt, 429": (upstream_requests(no_retries, 1), 1),
+               "two attempts, 429 then ok": (upstream_requests(one_retry, 1), 2)}
+    MockGemini.error_rate = error_rate
+    ok = True
+    for name, (seen, expected) in results.items():
+        ok &= seen == expected
+        print(f"{name:<28} {seen} upstream requests (expected {expected})")
+    return ok
+
+
+def report(name, latencies, errors, elapsed):
+    total = len(latencies) + len(errors)
+    ordered = sorted(latencies)
+    pct = lambda p: ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000 if ordered else float("nan")  # noqa: E731
+    print(f"{name:<10} p50 {statistics.median(ordered) * 1000 if ordered else float('nan'):7.0f}ms  "
+          f"p95 {pct(0.95):7.0f}ms  p99 {pct(0.99):7.0f}ms  "
+          f"errors {len(errors) / total:6.1%}  {total / elapsed:6.1f} calls/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--calls", type=int, default=20, help="calls per session")
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--rps", type=float, default=50, help="shared rate limit for the resilient client")
+    parser.add_argument("--hedge", action="store_true")
+    parser.add_argument("--stream", action="store_true", help="measure streaming calls (time to full reply)")
+    args = parser.parse_args()
+
+    MockGemini.latency = args.latency
+    MockGemini.slow_rate = args.slow_rate
+    MockGemini.slow_latency = args.slow_latency
+    MockGemini.error_rate = args.error_rate
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockGemini)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ["GOOGLE_API_KEY"] = "mock-key"
+    os.environ["BUJJI_LLM_ENDPOINT"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["BUJJI_LLM_RPS"] = str(args.rps)
+    os.environ["BUJJI_LLM_BURST"] = str(max(1, int(args.rps)))
+    os.environ["BUJJI_LLM_HEDGE"] = "1" if args.hedge else "0"
+
+    import resources
+    resilient = resources.get_llm()
+
+    # Warm both paths so connection setup is not measured
+    for llm in (resilient.llm, resilient):
+        try:
+            llm.invoke("warm up")
+        except Exception:
+            pass
+
+    if not check_single_attempt(resilient):
+        server.shutdown()
+        sys.exit("The client retries on its own; ResilientLLM attempts are not single requests")
+    print()
+
+    report("bare", *run_load(resilient.llm, args.sessions, args.calls, args.stream))
+    report("resilient", *run_load(resilient, args.sessions, args.calls, args.stream))
+    print(f"\nclient stats: {json.dumps(resilient.stats(), indent=2)}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Logins per second at several bcrypt costs, inline versus through AuthService.
+
+For each cost, fills a throwaway user store and then times:
+
+  inline    bcrypt.checkpw on one thread, as the login window used to
+  pool      AuthService.verify from ``--clients`` concurrent callers
+  cached    the same logins again, answered from the verified-credentials cache
+
+    python benchmarks/login_benchmark.py --costs 8 10 12 --clients 16
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import bcrypt  # noqa: E402
+
+from auth_service import AuthService  # noqa: E402
+from user_store import UserStore  # noqa: E402
+
+PASSWORD = "bench-password"
+
+
+def logins_per_second(fn, usernames, clients):
+    """Run ``fn(username)`` for every name across ``clients`` threads"""
+    failures = []
+
+    def client(part):
+        for username in part:
+            if not fn(username):
+                failures.append(username)
+
+    threads = [threading.Thread(target=client, args=(usernames[i::clients],)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if failures:
+        raise RuntimeError(f"{len(failures)} logins failed")
+    return len(usernames) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--costs", type=int, nargs="+", default=[4, 8, 10, 12])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--logins", type=int, default=200, help="logins per measurement")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=None, help="auth pool size (default: CPU count)")
+    args = parser.parse_args()
+
+    print(f"{'cost':>4} {'check':>9} {'inline/s':>9} {'pool/s':>9} {'cached/s':>10}")
+    for cost in args.costs:
+        with tempfile.TemporaryDirectory() as data_dir:
+            store = UserStore(os.path.join(data_dir, "users.sqlite3"))
+            password_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(cost)).decode('utf-8')
+            store.create_many((f"user{i}", password_hash, "", time.time(), None) for i in range(args.users))
+            auth = AuthService(store, rounds=cost, workers=args.workers)
+            auth.has_user("user0")  # load the index outside the timings
+
+            # Fewer inline logins at high cost; they run one at a time
+            inline_logins = max(args.clients, args.logins // 4)
+            names = [f"user{random.randrange(args.users)}" for _ in range(args.logins)]
+            check_ms = 1000 / logins_per_second(
+                lambda u: bcrypt.checkpw(PASSWORD.encode('utf-8'), store.password_hash(u).encode('utf-8')),
+                names[:inline_logins], 1)
+            inline = 1000 / check_ms
+            pool = logins_per_second(lambda u: auth.verify(u, PASSWORD).result(), names, args.clients)
+            cached = logins_per_second(lambda u: auth.verify(u, PASSWORD).result(), names, args.clients)
+            print(f"{cost:>4} {check_ms:7.1f}ms {inline:9.1f} {pool:9.1f} {cached:10.0f}")
+            auth.shutdown()
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
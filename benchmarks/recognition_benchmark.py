@@ -0,0 +1,72 @@
+"""Compare serial Telugu-then-English recognition with the parallel engine.
+
+Runs every WAV file in a fixture directory through the old serial
+fallback and through RecognitionEngine, and reports per-file latency.
+
+    python benchmarks/recognition_benchmark.py fixtures/ --backend google
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import speech_recognition as sr  # noqa: E402
+
+from recognition import RecognitionEngine, create_backend  # noqa: E402
+
+
+def load_fixture(path):
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(path) as source:
+        return recognizer.record(source)
+
+
+def serial(backend, audio):
+    """The original behaviour: Telugu first, English only if that fails"""
+    try:
+        return backend.recognize(audio, "te-IN")[0]
+    except (sr.UnknownValueError, sr.RequestError):
+        try:
+            return backend.recognize(audio, "en-US")[0]
+        except sr.UnknownValueError:
+            return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("fixtures", help="directory of .wav files")
+    parser.add_argument("--backend", default="google")
+    args = parser.parse_args()
+
+    backend = create_backend(args.backend)
+    paths = sorted(glob.glob(os.path.join(args.fixtures, "*.wav")))
+    if not paths:
+        sys.exit(f"No .wav files found in {args.fixtures}")
+
+    serial_times, parallel_times = [], []
+    for path in paths:
+        audio = load_fixture(path)
+
+        start = time.perf_counter()
+        serial_text = serial(backend, audio)
+        serial_times.append(time.perf_counter() - start)
+
+        # Fresh engine per file so the cache does not hide the network cost
+        engine = RecognitionEngine(backend)
+        start = time.perf_counter()
+        parallel_text = engine.recognize(audio)
+        parallel_times.append(time.perf_counter() - start)
+
+        print(f"{os.path.basename(path)}: serial {serial_times[-1]:.2f}s {serial_text!r} | "
+              f"parallel {parallel_times[-1]:.2f}s {parallel_text!r}")
+
+    print(f"\nmedian serial {statistics.median(serial_times):.2f}s, "
+          f"parallel {statistics.median(parallel_times):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
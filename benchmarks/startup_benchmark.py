@@ -0,0 +1,58 @@
+"""Measure time from launch to login-window-ready and to the first greeting.
+
+Runs ``src/main.py`` in a fresh interpreter several times with
+BUJJI_STARTUP_BENCHMARK=1, which logs in automatically and exits once the
+welcome message has been spoken.
+
+    python benchmarks/startup_benchmark.py --user alice --password secret --runs 5
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+STAGE_LINE = re.compile(r"^\[startup\] (.+): ([\d.]+)s$")
+
+
+def run_once(user, password, timeout):
+    env = dict(os.environ,
+               BUJJI_STARTUP_BENCHMARK="1",
+               BUJJI_BENCH_USER=user,
+               BUJJI_BENCH_PASSWORD=password)
+    result = subprocess.run(
+        [sys.executable, "main.py"], cwd=SRC_DIR, env=env,
+        capture_output=True, text=True, timeout=timeout
+    )
+    stages = {}
+    for line in result.stdout.splitlines():
+        match = STAGE_LINE.match(line.strip())
+        if match:
+            stages[match.group(1)] = float(match.group(2))
+    return stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    samples = {}
+    for i in range(args.runs):
+        stages = run_once(args.user, args.password, args.timeout)
+        print(f"run {i + 1}: " + ", ".join(f"{k}={v:.3f}s" for k, v in stages.items()))
+        for stage, seconds in stages.items():
+            samples.setdefault(stage, []).append(seconds)
+
+    print("\nstage                     median     min     max")
+    for stage, values in samples.items():
+        print(f"{stage:<24} {statistics.median(values):7.3f} {min(values):7.3f} {max(values):7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Login, history load and insert latency with many users in the shared store.
+
+Fills a throwaway UserStore with ``--users`` accounts and the shared
+collection with ``--turns-per-user`` turns for each, then times:
+
+  login     credential lookup + bcrypt check (legacy JSON read for comparison)
+  history   UserManager.get_recent_turns for random users
+  insert    one synchronous turn write into the shared collection
+
+    python benchmarks/user_store_benchmark.py --users 100000 --turns-per-user 4
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import bcrypt  # noqa: E402
+
+from persistence import turn_id  # noqa: E402
+from user_manager import UserManager  # noqa: E402
+
+DIMENSIONS = 8  # vector size does not matter for metadata lookups
+BATCH = 5000
+PASSWORD = "bench-password"
+
+
+def populate_users(manager, users, password_hash, last_turn):
+    now = time.time()
+    for offset in range(0, users, BATCH):
+        manager.store.create_many(
+            (f"user{i}", password_hash, "", now, last_turn) for i in range(offset, min(offset + BATCH, users))
+        )
+
+
+def populate_turns(collection, users, turns_per_user):
+    rows = [(f"user{u}", t) for u in range(users) for t in range(1, turns_per_user + 1)]
+    for offset in range(0, len(rows), BATCH):
+        chunk = rows[offset:offset + BATCH]
+        collection.add(
+            ids=[turn_id(username, turn) for username, turn in chunk],
+            embeddings=[[random.random() for _ in range(DIMENSIONS)] for _ in chunk],
+            documents=[f"message {turn} from {username}" for username, turn in chunk],
+            metadatas=[{
+                "timestamp": time.time(),
+                "type": "human" if turn % 2 else "ai",
+                "username": username,
+                "turn": turn,
+            } for username, turn in chunk],
+        )
+
+
+def populate_legacy_profiles(users_dir, users, password_hash):
+    os.makedirs(users_dir, exist_ok=True)
+    for i in range(users):
+        with open(os.path.join(users_dir, f"legacy{i}.json"), 'w') as f:
+            json.dump({"username": f"legacy{i}", "password_hash": password_hash, "context_summary": ""}, f)
+
+
+def sample(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "p50_ms": statistics.median(timings) * 1000,
+        "p95_ms": timings[int(len(timings) * 0.95) - 1] * 1000,
+    }
+
+
+def report(name, timings):
+    print(f"{name:<24} p50 {timings['p50_ms']:8.3f}ms   p95 {timings['p95_ms']:8.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--turns-per-user", type=int, default=4)
+    parser.add_argument("--window", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--bcrypt-rounds", type=int, default=4,
+                        help="low by default so the store lookup is visible")
+    parser.add_argument("--legacy-profiles", type=int, default=0,
+                        help="also write this many JSON profiles to time the old login path")
+    args = parser.parse_args()
+
+    password_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(args.bcrypt_rounds)).decode('utf-8')
+    pick = lambda: f"user{random.randrange(args.users)}"  # noqa: E731
+
+    # Otherwise the first login of each user upgrades its hash to the default cost
+    os.environ['BUJJI_BCRYPT_ROUNDS'] = str(args.bcrypt_rounds)
+    with tempfile.TemporaryDirectory() as data_dir:
+        manager = UserManager(data_dir=data_dir)
+
+        start = time.perf_counter()
+        populate_users(manager, args.users, password_hash, args.turns_per_user)
+        print(f"created {args.users} users in {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        populate_turns(manager.collection, args.users, args.turns_per_user)
+        print(f"stored {args.users * args.turns_per_user} turns in {time.perf_counter() - start:.1f}s\n")
+
+        report("login lookup", sample(lambda: manager.store.password_hash(pick()), args.repeat))
+        report("login (with bcrypt)", sample(lambda: manager.authenticate(pick(), PASSWORD), args.repeat))
+        if args.legacy_profiles:
+            populate_legacy_profiles(manager.users_dir, args.legacy_profiles, password_hash)
+
+            def legacy_lookup():
+                path = os.path.join(manager.users_dir, f"legacy{random.randrange(args.legacy_profiles)}.json")
+                with open(path) as f:
+                    json.load(f)["password_hash"]
+            report("legacy JSON lookup", sample(legacy_lookup, args.repeat))
+
+        report("history load", sample(lambda: manager.get_recent_turns(pick(), args.window), args.repeat))
+
+        # update_user_context embeds the text; use a stand-in vector instead
+        def insert():
+            username = pick()
+            turn = manager.store.next_turn(username)
+            manager.collection.add(
+                ids=[turn_id(username, turn)],
+                embeddings=[[random.random() for _ in range(DIMENSIONS)]],
+                documents=["benchmark insert"],
+                metadatas=[{"timestamp": time.time(), "type": "human", "username": username, "turn": turn}],
+            )
+        report("insert", sample(insert, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import os
+import signal
+
+import speech_recognition as sr
+
+import resources
+from capture import MicrophoneSource, StreamingCapture
+from conversation import Conversation, is_exit_command
+from phrases import EXIT_RESPONSE, GREETING
+from recognition import RecognitionEngine, create_backend
+from streaming import StreamingSpeaker, speak_stream
+from tracing import tracer
+
+# Seconds to wait for the user to start speaking before a capture gives up
+CAPTURE_TIMEOUT = 8.0
+
+
+class AudioChatbot(Conversation):
+    def __init__(self, user_context=None, on_summary=None):
+        print(f"\nInitializing chatbot with user context...")
+        super().__init__(user_context, on_summary=on_summary)
+        
+        # Initialize other components
+        self.recognizer = sr.Recognizer()
+        # Telugu and English recognition run concurrently
+        self.recognition = RecognitionEngine(
+            create_backend(os.getenv('BUJJI_STT_BACKEND', 'google'), self.recognizer)
+        )
+        # Voice activity detection ends the capture as soon as speech stops and
+        # starts recognition at pauses; BUJJI_VAD=0 uses recognizer.listen
+        self.capturer = None
+        if os.getenv('BUJJI_VAD', '1') != '0':
+            self.capturer = StreamingCapture(MicrophoneSource(), on_speculate=self.recognition.prefetch)
+        self.is_running = True
+        self.tts_cache = resources.get_tts_cache()
+        # Speak replies sentence by sentence while Gemini is still generating
+        self.streaming = os.getenv('BUJJI_STREAMING', '1') != '0'
+        self.speaker = None
+        self.last_time_to_first_audio = None
+        # Shared player thread; all speech goes through its queue
+        self.player = resources.get_audio_player()
+        signal.signal(signal.SIGINT, self.signal_handler)
+
+    def signal_handler(self, signum, frame):
+        """Handle Ctrl+C gracefully"""
+        print("\nGracefully shutting down... (Press Ctrl+C again to force quit)")
+        self.is_running = False
+        self.stop_speaking()
+        
+    def listen(self):
+        """Convert speech to text with Telugu support"""
+        audio = self.capture()
+        return self.transcribe(audio) if audio else None
+
+    def capture(self, cancelled=None):
+        """Record one phrase from the microphone, or None if nobody spoke"""
+        if self.capturer is not None:
+            with tracer.span("capture", vad=True):
+                utterance = self.capturer.capture(timeout=CAPTURE_TIMEOUT, cancelled=cancelled)
+            return utterance.audio if utterance else None
+        try:
+            with sr.Microphone() as source:
+                # Add a longer phrase time limit (default is 3 seconds, so 6 seconds now)
+                with tracer.span("capture"):
+                    # Give up waiting for speech eventually so a cancelled
+                    # turn releases the microphone
+                    return self.recognizer.listen(source, timeout=CAPTURE_TIMEOUT, phrase_time_limit=6.0)
+        except sr.WaitTimeoutError:
+            return None
+
+    def transcribe(self, audio):
+        """Recognize captured audio"""
+        try:
+            # Telugu and English are recognized in parallel; Telugu script wins
+            return self.recognition.recognize(audio)
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            raise Exception(f"Recognition service error: {e}")
+
+    def speak(self, text):
+        """Convert text to speech using gTTS for Telugu"""
+        print(f"Bot: {text}")
+        try:
+            # Synthesize (or reuse) Telugu speech and play it from memory
+            audio = self.tts_cache.synthesize(text, lang='te')
+            
+            # Wait for audio to finish; stop_speaking() ends it early
+            self.player.play(audio).wait()
+                
+        except Exception as e:
+            print(f"Error in text-to-speech: {e}")
+
+    def speak_streaming(self, pieces, on_text=None, executor=None, token=None):
+        """Speak a streamed response, starting playback at the first sentence"""
+        speaker = self.speaker = StreamingSpeaker(self.tts_cache, self.player, lang='te', executor=executor)
+        unregister = token.on_cancel(speaker.stop) if token else None
+        try:
+            text = speak_stream(pieces, speaker, on_text=on_text)
+            speaker.wait()
+        finally:
+            if unregister:
+                unregister()
+        self.last_time_to_first_audio = speaker.time_to_first_audio
+        if self.last_time_to_first_audio is not None:
+            # Reported with the stage timings in the tracer's p50/p95 summary
+            tracer.record("time_to_first_audio", self.last_time_to_first_audio)
+            print(f"Time to first audio: {self.last_time_to_first_audio:.2f}s")
+        print(f"Bot: {text}")
+        return text
+
+    def stop_speaking(self):
+        """Interrupt any ongoing speech"""
+        if self.speaker:
+            self.speaker.stop()
+        self.player.stop()
+
+    def run(self):
+        """Main chat loop"""
+        print("Chatbot initialized. Say something or 'stop' to exit. Press Ctrl+C for graceful shutdown.")
+        
+        # Initial Telugu greeting
+        self.speak(GREETING)
+        
+        while self.is_running:
+            try:
+                tracer.new_turn()
+                # Get user input through speech
+                user_input = self.listen()
+                if not user_input:
+                    continue
+                    
+                # Exit conditions
+                if is_exit_command(user_input):
+                    self.speak(EXIT_RESPONSE)
+                    break
+                
+                # Get and speak response
+                if self.streaming:
+                    self.speak_streaming(self.stream_llm_response(user_input))
+                    continue
+                response = self.get_llm_response(user_input)
+                if self.is_running:  # Check if we should still speak
+                    self.speak(response)
+                
+            except Exception as e:
+                print(f"\nAn error occurred: {e}")
+                break
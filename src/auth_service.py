@@ -0,0 +1,168 @@
+import concurrent.futures
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import bcrypt
+
+DEFAULT_ROUNDS = 12
+
+
+def _cost(password_hash: str) -> int:
+    """Work factor of a bcrypt hash ("$2b$12$...")"""
+    try:
+        return int(password_hash.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+class AuthService:
+    """Password checks for the user store, off the caller's thread.
+
+    One instance per store is shared by the process (see
+    ``resources.get_auth_service``). Usernames and password hashes are
+    kept in an in-memory index, loaded once on the worker pool and
+    reloaded when the store changes (in this process or another).
+    bcrypt runs on a worker pool so neither the Tk event loop nor the
+    server's session threads wait on it; new hashes use ``rounds``
+    (``BUJJI_BCRYPT_ROUNDS``), and weaker stored hashes are upgraded on the
+    next successful login. Successful checks are remembered for
+    ``cache_ttl`` seconds under a keyed hash of the credentials, so
+    reconnecting clients skip bcrypt; wrong passwords always pay for it.
+    """
+
+    def __init__(self, store, rounds: Optional[int] = None, workers: Optional[int] = None,
+                 cache_ttl: Optional[float] = None, cache_size: int = 10000):
+        self.store = store
+        self.rounds = rounds or int(os.getenv('BUJJI_BCRYPT_ROUNDS', str(DEFAULT_ROUNDS)))
+        self.cache_ttl = cache_ttl if cache_ttl is not None else float(os.getenv('BUJJI_AUTH_CACHE_TTL', '900'))
+        self.cache_size = cache_size
+        # bcrypt releases the GIL, so threads use every core
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers or os.cpu_count() or 2, thread_name_prefix="bcrypt"
+        )
+        self._index: Optional[Dict[str, str]] = None
+        self._version = None
+        self._lock = threading.Lock()
+        self._verified: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._secret = secrets.token_bytes(32)
+        # Checked for unknown users so they take as long as known ones
+        self._dummy_hash = None
+        self.counts = {"logins": 0, "failed": 0, "cache_hits": 0, "bcrypt_checks": 0,
+                       "rehashed": 0, "index_loads": 0}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self.counts, users=len(self._index or {}), cached=len(self._verified),
+                        rounds=self.rounds)
+
+    def _count(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    def _users(self) -> Dict[str, str]:
+        version = self.store.accounts_version()
+        if self._index is None or version != self._version:
+            with self._lock:
+                if self._index is None or version != self._version:
+                    self._index = {row[0]: row[1] for row in self.store.accounts()}
+                    self._version = version
+                    self.counts["index_loads"] += 1
+        return self._index
+
+    def _write(self, username: str, write: Callable[[], object]):
+        """Run a store write and apply it to the index without a full reload"""
+        before = self.store.accounts_version()
+        result = write()
+        with self._lock:
+            after = self.store.accounts_version()
+            if self._index is not None and self._version == before and after == before + 1:
+                self._index[username] = self.store.password_hash(username)
+                self._version = after
+        return result
+
+    def has_user(self, username: str) -> bool:
+        return username in self._users()
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+
+    def submit(self, fn: Callable, *args) -> concurrent.futures.Future:
+        """Run ``fn`` on the auth worker pool"""
+        return self._pool.submit(fn, *args)
+
+    def hash_password(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds)).decode('utf-8')
+
+    def _cache_key(self, username: str, password: str) -> bytes:
+        return hmac.new(self._secret, f"{username}\0{password}".encode('utf-8'), hashlib.sha256).digest()
+
+    def _cached(self, key: bytes, password_hash: str) -> bool:
+        with self._lock:
+            entry = self._verified.get(key)
+            if entry is None:
+                return False
+            # A changed password or an expired entry needs a real check
+            if entry[0] != password_hash or entry[1] < time.monotonic():
+                del self._verified[key]
+                return False
+            self.counts["cache_hits"] += 1
+            return True
+
+    def _remember(self, key: bytes, password_hash: str):
+        if self.cache_ttl <= 0:
+            return
+        with self._lock:
+            self._verified[key] = (password_hash, time.monotonic() + self.cache_ttl)
+            while len(self._verified) > self.cache_size:
+                self._verified.popitem(last=False)
+
+    def check(self, username: str, password: str) -> bool:
+        """Verify credentials on the calling thread"""
+        self._count("logins")
+        password_hash = self._users().get(username)
+        if password_hash is None:
+            if self._dummy_hash is None:
+                self._dummy_hash = self.hash_password(secrets.token_hex(8))
+            bcrypt.checkpw(password.encode('utf-8'), self._dummy_hash.encode('utf-8'))
+            self._count("failed")
+            return False
+        key = self._cache_key(username, password)
+        if self._cached(key, password_hash):
+            return True
+        self._count("bcrypt_checks")
+        if not bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8')):
+            self._count("failed")
+            return False
+        if _cost(password_hash) < self.rounds:
+            password_hash = self.hash_password(password)
+            self._write(username, lambda: self.store.set_password_hash(username, password_hash))
+            self._count("rehashed")
+        self._remember(key, password_hash)
+        return True
+
+    def create(self, username: str, password: str) -> bool:
+        """Add an account on the calling thread; False if the name is taken"""
+        if self.has_user(username):
+            return False
+        password_hash = self.hash_password(password)
+        return self._write(username, lambda: self.store.create(username, password_hash))
+
+    def verify(self, username: str, password: str) -> concurrent.futures.Future:
+        """Future of whether the credentials are valid"""
+        # The index lookup happens on the pool too; a reload reads the whole table
+        return self._pool.submit(self.check, username, password)
+
+    def register(self, username: str, password: str) -> concurrent.futures.Future:
+        """Future of whether a new account was created (False if the name is taken)"""
+        return self._pool.submit(self.create, username, password)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+        self.store.close()
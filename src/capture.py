@@ -0,0 +1,253 @@
+import array
+import math
+import sys
+import time
+import wave
+from collections import deque
+from typing import Callable, Iterator, List, Optional
+
+import speech_recognition as sr
+
+from tracing import tracer
+
+try:
+    import webrtcvad
+except ImportError:  # optional; the energy detector works on its own
+    webrtcvad = None
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # 16-bit mono PCM
+FRAME_MS = 30     # a frame size webrtcvad accepts
+
+
+def frame_rms(frame: bytes) -> float:
+    """Root mean square energy of a 16-bit little-endian PCM frame"""
+    samples = array.array('h', frame[:len(frame) - len(frame) % 2])
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class MicrophoneSource:
+    """Fixed-size PCM frames from the default microphone"""
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frame_ms: int = FRAME_MS,
+                 device_index: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.device_index = device_index
+
+    def frames(self) -> Iterator[bytes]:
+        chunk = self.sample_rate * self.frame_ms // 1000
+        with sr.Microphone(device_index=self.device_index, sample_rate=self.sample_rate,
+                           chunk_size=chunk) as source:
+            while True:
+                yield source.stream.read(chunk)
+
+
+class WavSource:
+    """Frames from a 16-bit mono WAV file, for fixtures and benchmarks.
+
+    With ``realtime`` the frames are paced like a live microphone.
+    ``pad_ms`` of silence is appended so the end of speech can be detected.
+    """
+
+    def __init__(self, path: str, frame_ms: int = FRAME_MS, realtime: bool = False,
+                 pad_ms: int = 1000, on_frame: Optional[Callable[[int], None]] = None):
+        self.path = path
+        self.frame_ms = frame_ms
+        self.realtime = realtime
+        self.pad_ms = pad_ms
+        self.on_frame = on_frame
+        with wave.open(path, 'rb') as wav:
+            if wav.getnchannels() != 1 or wav.getsampwidth() != SAMPLE_WIDTH:
+                raise ValueError(f"{path}: expected 16-bit mono audio")
+            self.sample_rate = wav.getframerate()
+
+    def frames(self) -> Iterator[bytes]:
+        chunk = self.sample_rate * self.frame_ms // 1000
+        start = time.monotonic()
+        index = 0
+        with wave.open(self.path, 'rb') as wav:
+            while True:
+                frame = wav.readframes(chunk)
+                if len(frame) < chunk * SAMPLE_WIDTH:
+                    break
+                yield self._pace(frame, index, start)
+                index += 1
+        silence = bytes(chunk * SAMPLE_WIDTH)
+        for _ in range(self.pad_ms // self.frame_ms):
+            yield self._pace(silence, index, start)
+            index += 1
+
+    def _pace(self, frame: bytes, index: int, start: float) -> bytes:
+        if self.realtime:
+            delay = start + (index + 1) * self.frame_ms / 1000 - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        if self.on_frame:
+            self.on_frame(index)
+        return frame
+
+
+class EnergyVAD:
+    """Frame-level voice activity detection against an adaptive noise floor.
+
+    The noise floor is calibrated from the first ``calibration_ms`` of
+    audio (like ``adjust_for_ambient_noise``) and then tracks the room
+    during non-speech frames, so it follows fans and traffic without a
+    fixed threshold. When webrtcvad is installed, loud frames must also
+    look like voice to it.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frame_ms: int = FRAME_MS,
+                 calibration_ms: int = 300, ratio: float = 3.0, min_energy: float = 120.0,
+                 adapt: float = 0.05, webrtc_mode: Optional[int] = 2):
+        self.sample_rate = sample_rate
+        self.ratio = ratio
+        self.min_energy = min_energy
+        self.adapt = adapt
+        self.calibration_frames = max(1, calibration_ms // frame_ms)
+        self.noise_floor: Optional[float] = None
+        self._calibration: List[float] = []
+        self._webrtc = webrtcvad.Vad(webrtc_mode) if webrtcvad and webrtc_mode is not None else None
+
+    @property
+    def calibrating(self) -> bool:
+        return self.noise_floor is None
+
+    @property
+    def threshold(self) -> float:
+        return max((self.noise_floor or 0.0) * self.ratio, self.min_energy)
+
+    def calibrate(self, frame: bytes):
+        self._calibration.append(frame_rms(frame))
+        if len(self._calibration) >= self.calibration_frames:
+            self.noise_floor = sum(self._calibration) / len(self._calibration)
+            self._calibration = []
+
+    def recalibrate(self):
+        self.noise_floor = None
+
+    def is_speech(self, frame: bytes) -> bool:
+        rms = frame_rms(frame)
+        speech = rms > self.threshold
+        if speech and self._webrtc is not None:
+            speech = self._webrtc.is_speech(frame, self.sample_rate)
+        if not speech:
+            self.noise_floor += self.adapt * (rms - self.noise_floor)
+        return speech
+
+
+class Utterance:
+    """Captured speech plus when it ended"""
+
+    def __init__(self, audio: sr.AudioData, speech_ended_at: float, endpointed_at: float):
+        self.audio = audio
+        self.speech_ended_at = speech_ended_at
+        self.endpointed_at = endpointed_at
+
+    @property
+    def endpoint_delay(self) -> float:
+        """Seconds between the end of speech and the capture returning"""
+        return self.endpointed_at - self.speech_ended_at
+
+
+class StreamingCapture:
+    """Capture one utterance, ending it as soon as the speaker stops.
+
+    Speech starts after ``start_ms`` of voiced frames (earlier audio is
+    kept from a ``preroll_ms`` ring buffer) and ends after
+    ``end_silence_ms`` of silence. At a shorter pause of ``speculate_ms``
+    the audio so far is handed to ``on_speculate`` so recognition can
+    start while the user may still be talking; if they do not resume, the
+    final utterance is byte-for-byte the same audio and the recognition
+    already in flight is reused.
+    """
+
+    def __init__(self, source, vad: Optional[EnergyVAD] = None, start_ms: int = 90,
+                 end_silence_ms: int = 500, speculate_ms: int = 240, tail_ms: int = 150,
+                 preroll_ms: int = 300, max_phrase_seconds: float = 6.0,
+                 on_speculate: Optional[Callable[[sr.AudioData], None]] = None):
+        self.source = source
+        frame_ms = source.frame_ms
+        self.vad = vad or EnergyVAD(sample_rate=source.sample_rate, frame_ms=frame_ms)
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.tail_frames = tail_ms // frame_ms
+        # Speculation needs the whole tail in the buffer to match the final audio
+        self.speculate_frames = min(max(speculate_ms // frame_ms, self.tail_frames, 1), self.end_frames)
+        self.preroll_frames = max(self.start_frames, preroll_ms // frame_ms)
+        self.max_frames = int(max_phrase_seconds * 1000 // frame_ms)
+        self.on_speculate = on_speculate
+        self.frame_seconds = frame_ms / 1000
+
+    def capture(self, timeout: Optional[float] = None,
+                cancelled: Optional[Callable[[], bool]] = None) -> Optional[Utterance]:
+        """Record one utterance; None on timeout, cancellation or no speech"""
+        frames = self.source.frames()
+        try:
+            return self._capture(frames, timeout, cancelled)
+        finally:
+            frames.close()
+
+    def _capture(self, frames, timeout, cancelled) -> Optional[Utterance]:
+        deadline = time.monotonic() + timeout if timeout else None
+        preroll = deque(maxlen=self.preroll_frames)
+        buffer: List[bytes] = []
+        voiced = 0
+        last_speech = 0
+        silence = 0
+        speech_ended_at = None
+
+        for frame in frames:
+            if cancelled and cancelled():
+                return None
+            if self.vad.calibrating:
+                self.vad.calibrate(frame)
+                continue
+            speech = self.vad.is_speech(frame)
+
+            if not buffer:
+                # Waiting for speech to start
+                preroll.append(frame)
+                voiced = voiced + 1 if speech else 0
+                if voiced >= self.start_frames:
+                    buffer = list(preroll)
+                    last_speech = len(buffer)
+                elif deadline and time.monotonic() > deadline:
+                    return None
+                continue
+
+            buffer.append(frame)
+            if speech:
+                silence = 0
+                last_speech = len(buffer)
+                speech_ended_at = None
+            else:
+                silence += 1
+                if silence == 1:
+                    # The previous frame was the last one with speech in it
+                    speech_ended_at = time.monotonic() - self.frame_seconds
+                if silence == self.speculate_frames and self.on_speculate:
+                    self.on_speculate(self._audio(buffer, last_speech))
+                if silence >= self.end_frames:
+                    return self._utterance(buffer, last_speech, speech_ended_at)
+            if len(buffer) >= self.max_frames:
+                # Same cap as the old phrase_time_limit
+                return self._utterance(buffer, last_speech, speech_ended_at)
+
+        # Source ran out (end of a WAV fixture)
+        return self._utterance(buffer, last_speech, speech_ended_at) if buffer else None
+
+    def _audio(self, buffer: List[bytes], last_speech: int) -> sr.AudioData:
+        end = min(last_speech + self.tail_frames, len(buffer))
+        return sr.AudioData(b"".join(buffer[:end]), self.source.sample_rate, SAMPLE_WIDTH)
+
+    def _utterance(self, buffer, last_speech, speech_ended_at) -> Utterance:
+        now = time.monotonic()
+        utterance = Utterance(self._audio(buffer, last_speech), speech_ended_at or now, now)
+        tracer.record("endpoint", utterance.endpoint_delay)
+        return utterance
@@ -0,0 +1,206 @@
+import os
+import threading
+import time
+
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain.schema.messages import HumanMessage, AIMessage, SystemMessage
+from langchain.schema.runnable import RunnablePassthrough
+from langchain_core.output_parsers import StrOutputParser
+
+import resources
+from llm_client import CANCELLED, LLMCancelled
+from memory import LongTermMemory
+from phrases import (  # noqa: F401 - re-exported for existing imports
+    EXIT_COMMANDS, EXIT_RESPONSE, NOT_HEARD_RESPONSE, ERROR_RESPONSE, is_exit_command
+)
+from response_cache import context_key
+from summarizer import RollingSummarizer
+from tracing import tracer
+
+
+# Backstop in case summarization falls behind; normally the summarizer
+# keeps the history well under this
+MAX_HISTORY_MESSAGES = 40
+
+
+class Conversation:
+    """Conversation state for one user: prompt, rolling history and chain.
+
+    Holds no audio or GUI state, so the desktop chatbot and the headless
+    server can both build on it. The LLM client is shared process-wide.
+    """
+
+    def __init__(self, user_context=None, llm=None, on_summary=None):
+        self.llm = llm or resources.get_llm()
+
+        # Set up conversation template
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", "You are a Telugu speaking chatbot named Bujji. Your responses should be warm, friendly and in Telugu language."),
+            MessagesPlaceholder(variable_name="conversation_summary"),
+            MessagesPlaceholder(variable_name="long_term_memory"),
+            MessagesPlaceholder(variable_name="chat_history"),
+            ("user", "{input}")
+        ])
+
+        # Running summary of older turns, persisted per user
+        self.summary = user_context.get("summary") if user_context else None
+        self.summarizer = RollingSummarizer(self.llm, on_summary=on_summary)
+        self._history_lock = threading.Lock()
+        
+        # Initialize context and chat history
+        self.chat_history = []
+        if user_context and user_context.get("history"):
+            context_str = "\n".join(user_context["history"][-5:])
+            self.chat_history.append(HumanMessage(content="Previous context: " + context_str))
+            self.chat_history.append(AIMessage(content="నేను అర్థం చేసుకున్నాను. మీరు ఏమి చెప్పాలనుకుంటున్నారు?"))
+
+        # Optional reuse of replies to near-identical utterances
+        self.username = user_context.get("username") if user_context else None
+        self.response_cache = (
+            resources.get_response_cache() if os.getenv('BUJJI_RESPONSE_CACHE') == '1' else None
+        )
+        
+        # Relevant turns from earlier sessions, retrieved per utterance
+        self.memory = LongTermMemory(
+            user_context.get("vectorstore") if user_context else None,
+            search_filter={"username": self.username} if self.username else None
+        )
+
+        # Setup chain
+        self.chain = (
+            {
+                "input": RunnablePassthrough(),
+                "chat_history": lambda _: self.chat_history,
+                "conversation_summary": lambda _: self.summary_messages(),
+                "long_term_memory": lambda text: self.memory.recall(text, self.chat_history)
+            }
+            | self.prompt
+            | self.llm
+            | StrOutputParser()
+        )
+
+    def get_llm_response(self, text, token=None):
+        """Get response using LangChain conversation chain.
+
+        Returns None, without remembering the turn, if ``token`` is
+        cancelled before the reply arrives.
+        """
+        if not text:
+            return NOT_HEARD_RESPONSE
+        cached = self.cached_response(text)
+        if cached is not None:
+            if token is not None and token.cancelled:
+                return None
+            self.remember_turn(text, cached)
+            return cached
+        try:
+            context = context_key(text, self.chat_history, self.summary)
+            with tracer.span("llm"):
+                response = self.chain.invoke(text, config=self.call_config(token))
+            if token is not None and token.cancelled:
+                return None
+            self.cache_response(context, text, response)
+            self.remember_turn(text, response)
+            return response
+
+        except LLMCancelled:
+            return None
+        except Exception as e:
+            print(f"Error getting LLM response: {e}")
+            return ERROR_RESPONSE
+
+    def stream_llm_response(self, text, token=None):
+        """Yield the response piece by piece as the chain generates it.
+
+        Stops, without remembering the turn, if ``token`` is cancelled.
+        """
+        if not text:
+            yield NOT_HEARD_RESPONSE
+            return
+        cached = self.cached_response(text)
+        if cached is not None:
+            yield cached
+            if token is None or not token.cancelled:
+                self.remember_turn(text, cached)
+            return
+        context = context_key(text, self.chat_history, self.summary)
+        started = time.perf_counter()
+        pieces = []
+        failed = False
+        with tracer.span("llm", streaming=True) as span:
+            try:
+                for piece in self.chain.stream(text, config=self.call_config(token)):
+                    if not pieces:
+                        span.set(first_token_ms=round((time.perf_counter() - started) * 1000, 1))
+                    pieces.append(piece)
+                    yield piece
+            except LLMCancelled:
+                return
+            except Exception as e:
+                print(f"Error getting LLM response: {e}")
+                if not pieces:
+                    yield ERROR_RESPONSE
+                    return
+                failed = True
+        if token is not None and token.cancelled:
+            return
+        response = "".join(pieces)
+        if not failed:
+            self.cache_response(context, text, response)
+        self.remember_turn(text, response)
+
+    @staticmethod
+    def call_config(token):
+        """Chain config that lets the LLM client abandon the call when ``token`` is cancelled"""
+        if token is None:
+            return None
+        return {"configurable": {CANCELLED: lambda: token.cancelled}}
+
+    def cached_response(self, text):
+        """Reply from the semantic response cache, if enabled and hit"""
+        if self.response_cache is None:
+            return None
+        context = context_key(text, self.chat_history, self.summary)
+        if context is None:
+            return None
+        try:
+            with tracer.span("response_cache") as span:
+                reply = self.response_cache.lookup(self.username, context, text)
+                span.set(hit=reply is not None)
+            return reply
+        except Exception as e:
+            print(f"Error reading response cache: {e}")
+            return None
+
+    def cache_response(self, context, text, response):
+        if self.response_cache is None or context is None or not response:
+            return
+        try:
+            self.response_cache.store(self.username, context, text, response)
+        except Exception as e:
+            print(f"Error writing response cache: {e}")
+
+    def remember_turn(self, text, response):
+        """Add a completed turn to the rolling chat history"""
+        with self._history_lock:
+            self.chat_history.extend([
+                HumanMessage(content=text),
+                AIMessage(content=response)
+            ])
+            if len(self.chat_history) > MAX_HISTORY_MESSAGES:
+                self.chat_history = self.chat_history[-MAX_HISTORY_MESSAGES:]
+
+        # Fold older turns into the summary once the history gets long
+        self.summarizer.maybe_summarize(self)
+
+    def summary_messages(self):
+        if not self.summary:
+            return []
+        return [SystemMessage(content="Summary of your earlier conversations with this user:\n" + self.summary)]
+
+    def apply_summary(self, summary, folded):
+        """Replace folded messages with the updated summary"""
+        folded_ids = {id(message) for message in folded}
+        with self._history_lock:
+            self.summary = summary
+            self.chat_history = [m for m in self.chat_history if id(m) not in folded_ids]
@@ -0,0 +1,279 @@
+"""Embedding backends and the shared caching, micro-batching front end.
+
+``resources.get_embeddings`` picks a backend with ``BUJJI_EMBEDDINGS``:
+
+* ``huggingface`` (default): sentence-transformers MiniLM on torch
+* ``onnx``: the same model exported to ONNX (int8 if quantized) from
+  ``BUJJI_EMBEDDINGS_MODEL_DIR``, without torch
+* ``hashing``: deterministic feature hashing, for tests and benchmarks
+
+and wraps it in ``EmbeddingService``. To prepare an int8 ONNX model:
+
+    optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 models/minilm
+    python src/embedding_backends.py quantize models/minilm
+"""
+import argparse
+import concurrent.futures
+import hashlib
+import math
+import os
+import queue
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
+ONNX_MODEL_FILES = ("model_int8.onnx", "model_quantized.onnx", "model.onnx")
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic bag-of-features vectors: words and character trigrams.
+
+    Needs no model and gives the same vector for the same text in every
+    process, so tests and benchmarks are reproducible. Similar strings get
+    similar vectors, but there is no semantic understanding.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def _features(self, text: str):
+        for word in text.lower().split():
+            yield "w:" + word
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                yield "c:" + padded[i:i + 3]
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        for feature in self._features(text):
+            digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+            vector[digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class OnnxEmbeddings(Embeddings):
+    """Sentence-transformers model run with onnxruntime on the CPU.
+
+    Loads ``model_int8.onnx`` (or ``model_quantized.onnx``, or
+    ``model.onnx``) and ``tokenizer.json`` from ``model_dir``; mean pooling
+    and normalization match the sentence-transformers pipeline. Texts are
+    sorted by length before batching to keep padding small.
+    """
+
+    def __init__(self, model_dir: str, max_length: int = 256, batch_size: int = 32,
+                 threads: Optional[int] = None):
+        import numpy as np
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self._np = np
+        path = next((os.path.join(directory, name)
+                     for name in ONNX_MODEL_FILES
+                     for directory in (model_dir, os.path.join(model_dir, "onnx"))
+                     if os.path.exists(os.path.join(directory, name))), None)
+        if path is None:
+            raise FileNotFoundError(f"No ONNX model in {model_dir}; expected one of {', '.join(ONNX_MODEL_FILES)}")
+        self.model_path = path
+        self.batch_size = batch_size
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self._inputs = {i.name for i in self.session.get_inputs()}
+
+    def _embed_batch(self, texts: List[str]):
+        np = self._np
+        encodings = self.tokenizer.encode_batch(texts)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": np.array([e.ids for e in encodings], dtype=np.int64), "attention_mask": mask}
+        if "token_type_ids" in self._inputs:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self._inputs})[0]
+        weights = mask[:, :, None].astype(hidden.dtype)
+        pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            chunk = order[start:start + self.batch_size]
+            for i, vector in zip(chunk, self._embed_batch([texts[i] for i in chunk])):
+                vectors[i] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class _Request:
+    __slots__ = ("texts", "future")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future = concurrent.futures.Future()
+
+
+class EmbeddingService(Embeddings):
+    """Cache and micro-batch calls to a shared embedding backend.
+
+    Vectors are cached by a hash of the text in an LRU of ``cache_size``
+    entries, stored as float32, so fixed phrases and repeated utterances
+    are embedded once. Cache misses from concurrent callers are queued to
+    a single worker, which embeds everything waiting (up to ``max_batch``
+    texts, optionally lingering ``max_wait_ms`` for more) in one backend
+    call. Queries and documents share the cache; every backend here embeds
+    them the same way.
+    """
+
+    def __init__(self, backend, cache_size: int = 2048, max_batch: int = 64, max_wait_ms: float = 0.0):
+        self.backend = backend
+        self.cache_size = cache_size
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._cache: "OrderedDict[bytes, array]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+        self.batched_texts = 0
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._cache),
+            "batches": self.batches,
+            "mean_batch": self.batched_texts / self.batches if self.batches else 0.0,
+        }
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = self._key(text)
+                cached = self._cache.get(key)
+                if cached is None:
+                    missing.setdefault(text, []).append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    vectors[i] = cached.tolist()
+            self.hits += len(texts) - sum(len(indexes) for indexes in missing.values())
+            self.misses += sum(len(indexes) for indexes in missing.values())
+        if missing:
+            unique = list(missing)
+            for text, vector in zip(unique, self._submit(unique).result()):
+                for i in missing[text]:
+                    vectors[i] = vector
+                self._store(text, vector)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def _store(self, text: str, vector: List[float]):
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[self._key(text)] = array('f', vector)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _submit(self, texts: List[str]) -> concurrent.futures.Future:
+        request = _Request(texts)
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True, name="embeddings")
+                self._worker.start()
+        self._queue.put(request)
+        return request.future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0].texts)
+            # Whatever queued up during the previous backend call goes in this one
+            while size < self.max_batch:
+                try:
+                    request = self._queue.get(timeout=self.max_wait) if self.max_wait else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request.texts)
+            # Every future must get a result or an exception, or its caller waits forever
+            try:
+                unique = list(dict.fromkeys(text for request in batch for text in request.texts))
+                vectors = self.backend.embed_documents(unique)
+                if len(vectors) != len(unique):
+                    raise ValueError(f"Embedding backend returned {len(vectors)} vectors for {len(unique)} texts")
+                by_text = dict(zip(unique, vectors))
+                results = [[by_text[text] for text in request.texts] for request in batch]
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            self.batches += 1
+            self.batched_texts += len(unique)
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+
+
+def create_backend(name: str, model_name: str, model_dir: Optional[str] = None):
+    """Instantiate a backend by its BUJJI_EMBEDDINGS name"""
+    if name == "huggingface":
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=model_name)
+    if name == "onnx":
+        if not model_dir:
+            raise ValueError("Set BUJJI_EMBEDDINGS_MODEL_DIR to an exported ONNX model directory")
+        return OnnxEmbeddings(model_dir, threads=int(os.getenv('BUJJI_EMBEDDINGS_THREADS', '0')) or None)
+    if name == "hashing":
+        return HashingEmbeddings()
+    raise ValueError(f"Unknown embedding backend: {name}")
+
+
+def quantize(model_dir: str) -> str:
+    """Write an int8 dynamically quantized copy of ``model.onnx`` next to it"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    directory = model_dir if os.path.exists(os.path.join(model_dir, "model.onnx")) else os.path.join(model_dir, "onnx")
+    target = os.path.join(directory, "model_int8.onnx")
+    quantize_dynamic(os.path.join(directory, "model.onnx"), target, weight_type=QuantType.QInt8)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    quantize_cmd = commands.add_parser("quantize", help="int8-quantize an exported ONNX model")
+    quantize_cmd.add_argument("model_dir")
+    args = parser.parse_args()
+    target = quantize(args.model_dir)
+    print(f"Wrote {target} ({os.path.getsize(target) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""Export, import and compact conversation history in the shared store.
+
+Export streams accounts and turns to JSON Lines (gzip-compressed when the
+file name ends in ``.gz``) one page at a time, so memory stays flat no
+matter how much history there is. Import reads such a file back,
+reusing the exported vectors or re-embedding in batches; turns of an
+account that already has history are appended after it rather than
+overwriting it. Compaction removes repeated boilerplate turns
+(welcomes, greetings, exit commands and replies; the first of each is
+kept) and turns older than a retention horizon, optionally folding the
+old turns into each user's context summary first, and reports the store
+size and history query times before and after.
+
+    python src/history_tool.py export history.jsonl.gz [--user NAME] [--vectors] [--accounts]
+    python src/history_tool.py import history.jsonl.gz [--reembed]
+    python src/history_tool.py compact [--user NAME] [--retain-days 180] [--summarize] [--dry-run]
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+from typing import Dict, Iterator, List, Optional
+
+from persistence import turn_id
+from phrases import FIXED_PHRASES, WELCOME_TEMPLATE, is_exit_command
+
+BATCH = 5000         # rows per Chroma page
+EMBED_BATCH = 256    # texts per embed_documents call
+TURN_WINDOW = 500    # turns scanned at a time while compacting
+FOLD_TURNS = 100     # old turns per summarization call
+FORMAT = "bujji-history"
+VERSION = 1
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _vector(embedding) -> List[float]:
+    return embedding.tolist() if hasattr(embedding, "tolist") else [float(x) for x in embedding]
+
+
+def iter_turns(collection, username: Optional[str] = None, vectors: bool = False) -> Iterator[Dict]:
+    """Yield stored turns page by page, optionally with their vectors"""
+    include = ['documents', 'metadatas'] + (['embeddings'] if vectors else [])
+    where = {"username": username} if username else None
+    offset = 0
+    while True:
+        rows = collection.get(where=where, limit=BATCH, offset=offset, include=include)
+        if not rows['ids']:
+            return
+        for i, doc_id in enumerate(rows['ids']):
+            record = {"kind": "turn", "id": doc_id, "text": rows['documents'][i],
+                      "metadata": rows['metadatas'][i] or {}}
+            if vectors:
+                record["embedding"] = _vector(rows['embeddings'][i])
+            yield record
+        offset += len(rows['ids'])
+
+
+def export_history(manager, path: str, username: Optional[str] = None,
+                   vectors: bool = False, accounts: bool = False) -> Dict[str, int]:
+    """Write accounts (optionally) and turns to ``path``; returns record counts"""
+    counts = {"accounts": 0, "turns": 0}
+    with _open(path, "w") as f:
+        f.write(json.dumps({"format": FORMAT, "version": VERSION, "exported_at": time.time(),
+                            "vectors": vectors}) + "\n")
+        # Accounts first, so an import can create users before their turns arrive
+        if accounts:
+            if username:
+                rows = [row for row in [manager.store.account(username)] if row is not None]
+            else:
+                rows = manager.store.accounts()
+            for name, password_hash, summary, created_at, last_turn in rows:
+                f.write(json.dumps({"kind": "account", "username": name, "password_hash": password_hash,
+                                    "context_summary": summary, "created_at": created_at,
+                                    "last_turn": last_turn}, ensure_ascii=False) + "\n")
+                counts["accounts"] += 1
+        for record in iter_turns(manager.collection, username, vectors):
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            counts["turns"] += 1
+    return counts
+
+
+def import_history(manager, path: str, reembed: bool = False) -> Dict[str, int]:
+    """Load an export into the shared collection; re-running it is harmless.
+
+    Accounts created by the import keep their exported turn numbers. For
+    accounts that already existed, turns are numbered past the account's
+    ``last_turn`` (skipping ones already stored), and the merged history
+    is then renumbered by timestamp, so no live turn is overwritten.
+    """
+    counts = {"accounts": 0, "turns": 0, "embedded": 0, "skipped": 0, "duplicates": 0}
+    last_turns: Dict[str, int] = {}
+    unnumbered = set()
+    created = set()
+    merging: Dict[str, Dict] = {}  # existing account -> next turn and stored turns
+    pending: List[Dict] = []
+
+    def stored_turns(username: str) -> set:
+        rows = manager.collection.get(where={"username": username}, include=['documents', 'metadatas'])
+        return {(m.get("timestamp"), m.get("type"), d) for d, m in zip(rows['documents'], rows['metadatas'])}
+
+    def flush():
+        if not pending:
+            return
+        reuse = [r for r in pending if "embedding" in r and not reembed]
+        embed = [r for r in pending if "embedding" not in r or reembed]
+        if embed:
+            vectors = manager.embeddings.embed_documents([r["text"] for r in embed])
+            for record, vector in zip(embed, vectors):
+                record["embedding"] = vector
+            counts["embedded"] += len(embed)
+        rows = reuse + embed
+        # Upsert by id keeps a repeated import from duplicating turns; numbered
+        # turns get the username:turn id get_recent_turns looks up
+        manager.collection.upsert(
+            ids=[turn_id(r["metadata"]["username"], r["metadata"]["turn"]) if "turn" in r["metadata"] else r["id"]
+                 for r in rows],
+            embeddings=[r["embedding"] for r in rows],
+            documents=[r["text"] for r in rows],
+            metadatas=[r["metadata"] for r in rows],
+        )
+        counts["turns"] += len(rows)
+        pending.clear()
+
+    with _open(path, "r") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != FORMAT:
+            raise ValueError(f"{path} is not a {FORMAT} export")
+        for line in f:
+            record = json.loads(line)
+            if record.get("kind") == "account":
+                if manager.store.create(record["username"], record["password_hash"],
+                                        context_summary=record.get("context_summary") or "",
+                                        created_at=record.get("created_at"),
+                                        last_turn=record.get("last_turn")):
+                    counts["accounts"] += 1
+                    created.add(record["username"])
+                continue
+            username = record["metadata"].get("username")
+            if not username or not manager.store.exists(username):
+                counts["skipped"] += 1  # turns need an account to belong to
+                continue
+            if username not in created:
+                if username not in merging:
+                    merging[username] = {"next": manager.store.last_turn(username) or 0,
+                                         "stored": stored_turns(username)}
+                merge = merging[username]
+                key = (record["metadata"].get("timestamp"), record["metadata"].get("type"), record["text"])
+                if key in merge["stored"]:
+                    counts["duplicates"] += 1
+                    continue
+                merge["stored"].add(key)
+                # Past the live history; renumbered by timestamp below
+                merge["next"] += 1
+                record["metadata"] = dict(record["metadata"], turn=merge["next"])
+            elif record["metadata"].get("turn") is None:
+                unnumbered.add(username)
+            else:
+                last_turns[username] = max(last_turns.get(username, 0), record["metadata"]["turn"])
+            pending.append(record)
+            if len(pending) >= EMBED_BATCH:
+                flush()
+    flush()
+
+    for username, turn in last_turns.items():
+        if username not in unnumbered:
+            manager.store.set_last_turn(username, max(turn, manager.store.last_turn(username) or 0))
+    for username in unnumbered | set(merging):
+        manager.renumber_turns(username)
+    return counts
+
+
+def boilerplate(username: str) -> set:
+    """Texts that carry nothing worth remembering about a conversation"""
+    return {text.strip() for text in FIXED_PHRASES + [WELCOME_TEMPLATE.format(username=username)]}
+
+
+def _fold(chain, summary: str, turns: List[Dict]) -> str:
+    lines = "\n".join(
+        f"{'User' if t['metadata'].get('type') == 'human' else 'Bujji'}: {t['text']}" for t in turns
+    )
+    return chain.invoke({"summary": summary or "(none)", "turns": lines, "max_words": 120}).strip()
+
+
+def compact_user(manager, username: str, retain_days: Optional[float] = None,
+                 chain=None, dry_run: bool = False) -> Dict[str, int]:
+    """Drop a user's repeated boilerplate and expired turns, then renumber what is left.
+
+    The first occurrence of each boilerplate text is kept, so the history
+    still shows how the conversation opened and closed. Turns are scanned
+    ``TURN_WINDOW`` at a time in turn order, so with a summarization
+    ``chain`` expired turns are folded into the summary oldest first.
+    """
+    counts = {"turns": 0, "boilerplate": 0, "expired": 0}
+    collection = manager.collection
+    last_turn = manager.store.last_turn(username)
+    if last_turn is None:
+        last_turn = manager.renumber_turns(username)
+    cutoff = time.time() - retain_days * 86400 if retain_days is not None else None
+    fixed = boilerplate(username)
+    seen = set()
+    summary = manager.store.context_summary(username) or ""
+    doomed: List[str] = []
+    folding: List[Dict] = []
+
+    for start in range(1, last_turn + 1, TURN_WINDOW):
+        rows = collection.get(
+            ids=[turn_id(username, turn) for turn in range(start, min(start + TURN_WINDOW, last_turn + 1))],
+            include=['documents', 'metadatas'],
+        )
+        turns = sorted(
+            ({"id": i, "text": d, "metadata": m} for i, d, m in
+             zip(rows['ids'], rows['documents'], rows['metadatas'])),
+            key=lambda t: t["metadata"]["turn"],
+        )
+        counts["turns"] += len(turns)
+        for t in turns:
+            text = (t["text"] or "").strip()
+            if text in fixed or (t["metadata"].get("type") == "human" and is_exit_command(text)):
+                if text in seen:
+                    counts["boilerplate"] += 1
+                    doomed.append(t["id"])
+                    continue
+                seen.add(text)
+            if cutoff is not None and t["metadata"].get("timestamp", 0) < cutoff:
+                counts["expired"] += 1
+                doomed.append(t["id"])
+                if chain is not None:
+                    folding.append(t)
+            if len(folding) >= FOLD_TURNS:
+                if not dry_run:
+                    summary = _fold(chain, summary, folding)
+                folding = []
+    if folding and not dry_run:
+        summary = _fold(chain, summary, folding)
+
+    if dry_run or not doomed:
+        return counts
+    if chain is not None and counts["expired"]:
+        # Summary first: a failure part way leaves turns, never a gap in memory
+        manager.store.set_context_summary(username, summary)
+    for start in range(0, len(doomed), BATCH):
+        collection.delete(ids=doomed[start:start + BATCH])
+    manager.renumber_turns(username)
+    return counts
+
+
+def store_size(data_dir: str) -> int:
+    """Bytes on disk under the data directory"""
+    total = 0
+    for root, _, files in os.walk(data_dir):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def time_queries(manager, usernames: List[str], repeats: int = 5) -> Dict[str, float]:
+    """Best-of-``repeats`` mean milliseconds for a history load and a memory search"""
+    collection = manager.collection
+    load, search = [], []
+    for username in usernames:
+        last_turn = manager.store.last_turn(username)
+        if not last_turn:
+            continue
+        sample = collection.get(ids=[turn_id(username, last_turn)], include=['embeddings'])
+        if not sample['ids']:
+            continue
+        vector = _vector(sample['embeddings'][0])
+        for timings, run in (
+            (load, lambda: manager.get_recent_turns(username)),
+            (search, lambda: collection.query(query_embeddings=[vector], n_results=4,
+                                              where={"username": username})),
+        ):
+            best = float("inf")
+            for _ in range(repeats):
+                started = time.perf_counter()
+                run()
+                best = min(best, time.perf_counter() - started)
+            timings.append(best)
+    mean = lambda values: sum(values) / len(values) * 1000 if values else float("nan")  # noqa: E731
+    return {"history_ms": mean(load), "search_ms": mean(search)}
+
+
+def compact(manager, username: Optional[str] = None, retain_days: Optional[float] = None,
+            summarize: bool = False, dry_run: bool = False, sample_users: int = 20) -> Dict:
+    """Compact one user or everyone; returns totals and before/after measurements"""
+    chain = None
+    if summarize and retain_days is not None:
+        import resources
+        from summarizer import RollingSummarizer
+        chain = RollingSummarizer(resources.get_llm()).chain
+
+    usernames = manager.store.usernames() if username is None else iter([username])
+    sample = [username] if username else [name for _, name in zip(range(sample_users), manager.store.usernames())]
+    report = {"users": 0, "turns": 0, "boilerplate": 0, "expired": 0,
+              "size_before": store_size(manager.data_dir), "before": time_queries(manager, sample)}
+    for name in usernames:
+        try:
+            counts = compact_user(manager, name, retain_days, chain, dry_run)
+        except Exception as e:
+            print(f"Error compacting {name}: {e}")
+            continue
+        report["users"] += 1
+        for key, value in counts.items():
+            report[key] += value
+    report["size_after"] = store_size(manager.data_dir)
+    report["after"] = time_queries(manager, sample)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default="user_data")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_cmd = commands.add_parser("export", help="stream history to a .jsonl or .jsonl.gz file")
+    export_cmd.add_argument("path")
+    export_cmd.add_argument("--user", help="only this user (default: everyone)")
+    export_cmd.add_argument("--vectors", action="store_true", help="include embeddings so import can skip the model")
+    export_cmd.add_argument("--accounts", action="store_true", help="include password hashes and summaries")
+
+    import_cmd = commands.add_parser("import", help="load an export into the store")
+    import_cmd.add_argument("path")
+    import_cmd.add_argument("--reembed", action="store_true", help="embed again even when vectors were exported")
+
+    compact_cmd = commands.add_parser("compact", help="drop boilerplate and expired turns")
+    compact_cmd.add_argument("--user", help="only this user (default: everyone)")
+    compact_cmd.add_argument("--retain-days", type=float, help="drop turns older than this")
+    compact_cmd.add_argument("--summarize", action="store_true",
+                             help="fold expired turns into the user's summary before dropping them")
+    compact_cmd.add_argument("--dry-run", action="store_true", help="count what would be removed")
+    args = parser.parse_args()
+
+    from user_manager import UserManager
+    manager = UserManager(data_dir=args.data_dir)
+    start = time.perf_counter()
+    if args.command == "export":
+        counts = export_history(manager, args.path, args.user, args.vectors, args.accounts)
+        print(f"Exported {counts['accounts']} accounts and {counts['turns']} turns to {args.path} "
+              f"({os.path.getsize(args.path) / 1e6:.1f} MB, {time.perf_counter() - start:.1f}s)")
+    elif args.command == "import":
+        counts = import_history(manager, args.path, args.reembed)
+        print(f"Imported {counts['accounts']} accounts and {counts['turns']} turns "
+              f"({counts['embedded']} embedded, {counts['skipped']} skipped without an account, "
+              f"{counts['duplicates']} already stored, "
+              f"{time.perf_counter() - start:.1f}s)")
+    else:
+        report = compact(manager, args.user, args.retain_days, args.summarize, args.dry_run)
+        verb = "Would remove" if args.dry_run else "Removed"
+        print(f"{verb} {report['boilerplate']} boilerplate and {report['expired']} expired turns "
+              f"of {report['turns']} across {report['users']} users ({time.perf_counter() - start:.1f}s)")
+        print(f"Store size: {report['size_before'] / 1e6:.1f} MB -> {report['size_after'] / 1e6:.1f} MB "
+              "(Chroma reuses freed pages; run `chroma utils vacuum` to shrink the file)")
+        print(f"History load: {report['before']['history_ms']:.1f} ms -> {report['after']['history_ms']:.1f} ms, "
+              f"memory search: {report['before']['search_ms']:.1f} ms -> {report['after']['search_ms']:.1f} ms")
+    manager.close()
+
+
+if __name__ == "__main__":
+    main()
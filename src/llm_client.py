@@ -0,0 +1,453 @@
+import concurrent.futures
+import contextvars
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from tracing import tracer
+
+# Exception class names (google.api_core, httpx, requests) worth retrying
+RETRYABLE_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "BadGateway", "Aborted", "Unknown",
+    "ConnectError", "ReadTimeout", "ConnectTimeout", "RemoteProtocolError",
+}
+
+
+# Key in RunnableConfig["configurable"] for a ``() -> bool`` that abandons the call
+CANCELLED = "cancelled"
+# Longest a call waits before checking whether it was cancelled
+CANCEL_POLL = 0.05
+
+
+class LLMTimeoutError(TimeoutError):
+    """The call did not finish within its deadline"""
+
+
+class LLMCancelled(Exception):
+    """The caller abandoned the call (e.g. the voice turn was cancelled)"""
+
+
+def cancel_check(config: Optional[RunnableConfig]) -> Callable[[], bool]:
+    """The cancellation check passed in a call's config, or one that never fires"""
+    check = ((config or {}).get("configurable") or {}).get(CANCELLED)
+    return check or (lambda: False)
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+class TokenBucket:
+    """Request rate limiter shared by every session in the process"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take a token, waiting up to ``timeout`` seconds for one"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.waited += time.monotonic() - start
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class LatencyWindow:
+    """Recent call latencies for percentile-based hedging"""
+
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+    def __len__(self):
+        return len(self.samples)
+
+
+class _Workers:
+    """Threads for upstream attempts, split into primary and spare slots.
+
+    First attempts take a primary slot, waiting for one if all are busy.
+    Hedges only start if a spare slot is free, so they never queue behind
+    the calls they race. An abandoned attempt (cancelled, timed out or
+    beaten by its hedge) keeps running until upstream answers; it moves to
+    a spare slot when one is free, handing its primary slot to new calls.
+    The pool has a thread per slot, so admitted work never waits in it.
+    """
+
+    def __init__(self, primary: int, spare: int):
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=primary + spare, thread_name_prefix="llm")
+        self._primary = threading.Semaphore(primary)
+        self._spare = threading.Semaphore(spare)
+        self._lock = threading.Lock()
+        self._slots: Dict[concurrent.futures.Future, str] = {}
+
+    def acquire_primary(self, timeout: float) -> bool:
+        return self._primary.acquire(timeout=max(timeout, 0))
+
+    def try_acquire_spare(self) -> bool:
+        return self._spare.acquire(blocking=False)
+
+    def release_spare(self):
+        self._spare.release()
+
+    def start(self, slot: str, fn: Callable, *args, **kwargs) -> concurrent.futures.Future:
+        """Run ``fn`` in a slot the caller has already acquired"""
+        future = self.executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        with self._lock:
+            self._slots[future] = slot
+        # Runs at once if the call already finished
+        future.add_done_callback(self._release)
+        return future
+
+    def abandon(self, future: concurrent.futures.Future):
+        if future.cancel():
+            return  # never started; the done callback frees its slot
+        with self._lock:
+            if self._slots.get(future) != "primary" or not self._spare.acquire(blocking=False):
+                return
+            self._slots[future] = "spare"
+        self._primary.release()
+
+    def _release(self, future: concurrent.futures.Future):
+        with self._lock:
+            slot = self._slots.pop(future, None)
+        if slot == "primary":
+            self._primary.release()
+        elif slot == "spare":
+            self._spare.release()
+
+
+class _StreamPump:
+    """Drains one ``llm.stream`` call on a worker thread into a queue"""
+
+    def __init__(self, workers: _Workers, slot: str, llm, input, config, kwargs, ready: threading.Event):
+        self.items = queue.Queue()
+        self.first = None
+        self.abandoned = False
+        self._ready = ready
+        self._workers = workers
+        self._future = workers.start(slot, self._run, llm, input, config, kwargs)
+
+    def abandon(self):
+        self.abandoned = True
+        self._workers.abandon(self._future)
+
+    def _run(self, llm, input, config, kwargs):
+        try:
+            for chunk in llm.stream(input, config, **kwargs):
+                if self.abandoned:
+                    return
+                self._put(("chunk", chunk))
+            self._put(("done", None))
+        except Exception as e:
+            self._put(("error", e))
+
+    def _put(self, item):
+        if self.first is None:
+            self.first = item
+            self._ready.set()
+        else:
+            self.items.put(item)
+
+    def chunks(self, stall_timeout: float, cancelled: Callable[[], bool]) -> Iterator:
+        kind, value = self.first
+        try:
+            while kind == "chunk":
+                yield value
+                stalled_at = time.monotonic() + stall_timeout
+                while True:
+                    if cancelled():
+                        raise LLMCancelled()
+                    remaining = stalled_at - time.monotonic()
+                    if remaining <= 0:
+                        raise LLMTimeoutError(f"LLM stream stalled for {stall_timeout}s")
+                    try:
+                        kind, value = self.items.get(timeout=min(remaining, CANCEL_POLL))
+                        break
+                    except queue.Empty:
+                        continue
+            if kind == "error":
+                raise value
+        finally:
+            # Also reached when the consumer stops iterating early
+            if kind == "chunk":
+                self.abandon()
+
+
+class ResilientLLM(Runnable):
+    """Deadlines, retries, hedging and rate limiting around a shared LLM client.
+
+    Drop-in for the LLM step of a chain. Each call waits for a token from
+    the shared ``limiter``, then runs with an overall ``deadline``;
+    retryable failures (quota, 5xx, timeouts) are retried with full-jitter
+    exponential backoff. With ``hedge`` on, a call still running after the
+    recent p95 latency gets a second identical request and the first
+    response wins. Streams are retried and hedged up to the first token.
+    ``call_kwargs`` are passed on every upstream call, e.g. to switch off
+    the client's own retries so each attempt is exactly one request.
+    Attempts run on ``max_workers`` threads, plus ``spare_workers`` for
+    hedges and abandoned attempts (see ``_Workers``).
+    """
+
+    def __init__(self, llm, deadline: float = 20.0, max_retries: int = 2,
+                 backoff: float = 0.25, max_backoff: float = 4.0, hedge: bool = False,
+                 hedge_min_samples: int = 20, hedge_min_delay: float = 0.2,
+                 limiter: Optional[TokenBucket] = None, max_workers: int = 16,
+                 spare_workers: Optional[int] = None, call_kwargs: Optional[Dict] = None):
+        self.llm = llm
+        self.call_kwargs = call_kwargs or {}
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.limiter = limiter
+        self.latency = {"invoke": LatencyWindow(), "stream": LatencyWindow()}
+        self._workers = _Workers(max_workers, spare_workers if spare_workers is not None else max(2, max_workers // 4))
+        self._stats_lock = threading.Lock()
+        self.counts = {"calls": 0, "succeeded": 0, "failed": 0, "retries": 0,
+                       "hedges": 0, "hedge_wins": 0, "hedges_skipped": 0, "abandoned": 0,
+                       "timeouts": 0, "throttled": 0, "cancelled": 0}
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            counts = dict(self.counts)
+        calls = counts["calls"]
+        counts["error_rate"] = counts["failed"] / calls if calls else 0.0
+        for kind, window in self.latency.items():
+            for p in (0.5, 0.95, 0.99):
+                value = window.percentile(p)
+                counts[f"{kind}_p{int(p * 100)}_ms"] = round(value * 1000, 1) if value is not None else None
+        if self.limiter is not None:
+            counts["limiter_wait_s"] = round(self.limiter.waited, 3)
+        return counts
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs) -> Any:
+        kwargs = {**self.call_kwargs, **kwargs}
+        cancelled = cancel_check(config)
+        return self._with_retries(
+            "invoke", lambda deadline: self._invoke_hedged(input, config, kwargs, deadline, cancelled), cancelled
+        )
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs) -> Iterator:
+        kwargs = {**self.call_kwargs, **kwargs}
+        cancelled = cancel_check(config)
+        started = time.monotonic()
+        pump = self._with_retries(
+            "stream", lambda deadline: self._stream_hedged(input, config, kwargs, deadline, cancelled), cancelled
+        )
+        remaining = max(started + self.deadline - time.monotonic(), self.hedge_min_delay)
+        try:
+            yield from pump.chunks(stall_timeout=remaining, cancelled=cancelled)
+        except LLMCancelled:
+            self._count("cancelled")
+            raise
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.counts[key] += amount
+
+    def _with_retries(self, kind: str, attempt_fn, cancelled: Callable[[], bool]):
+        self._count("calls")
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            try:
+                if cancelled():
+                    raise LLMCancelled()
+                self._take_token(deadline)
+                started = time.monotonic()
+                result = attempt_fn(deadline)
+                self.latency[kind].add(time.monotonic() - started)
+                self._count("succeeded")
+                return result
+            except LLMCancelled:
+                self._count("cancelled")
+                raise
+            except Exception as e:
+                if isinstance(e, LLMTimeoutError):
+                    self._count("timeouts")
+                # Full jitter keeps many sessions from retrying in lockstep
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                if attempt >= self.max_retries or not is_retryable(e) or time.monotonic() + delay >= deadline:
+                    self._count("failed")
+                    raise
+                attempt += 1
+                self._count("retries")
+                tracer.record("llm_retry", delay, error=type(e).__name__, attempt=attempt)
+                self._backoff(delay, cancelled)
+
+    def _backoff(self, delay: float, cancelled: Callable[[], bool]):
+        until = time.monotonic() + delay
+        while not cancelled():
+            remaining = until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, CANCEL_POLL))
+
+    def _take_token(self, deadline: float):
+        if self.limiter is None or self.limiter.try_acquire():
+            return
+        self._count("throttled")
+        if not self.limiter.acquire(timeout=deadline - time.monotonic()):
+            raise LLMTimeoutError("Timed out waiting for the LLM rate limiter")
+
+    def _hedge_delay(self, kind: str) -> Optional[float]:
+        if not self.hedge or len(self.latency[kind]) < self.hedge_min_samples:
+            return None
+        return max(self.latency[kind].percentile(0.95), self.hedge_min_delay)
+
+    def _try_hedge(self) -> bool:
+        """Take a spare slot and a limiter token for a hedge, without waiting for either"""
+        if not self._workers.try_acquire_spare():
+            self._count("hedges_skipped")
+            return False
+        # Hedges are extra load; never let them wait on or overdraw the limiter
+        if self.limiter is not None and not self.limiter.try_acquire():
+            self._workers.release_spare()
+            return False
+        self._count("hedges")
+        return True
+
+    def _acquire_primary(self, deadline: float, cancelled: Callable[[], bool]):
+        while not self._workers.acquire_primary(min(deadline - time.monotonic(), CANCEL_POLL)):
+            if cancelled():
+                raise LLMCancelled()
+            if time.monotonic() >= deadline:
+                raise LLMTimeoutError("No free LLM worker before the deadline")
+
+    def _abandon(self, pending):
+        for attempt in pending:
+            if isinstance(attempt, _StreamPump):
+                attempt.abandon()
+            else:
+                self._workers.abandon(attempt)
+        self._count("abandoned", len(pending))
+
+    def _invoke_hedged(self, input, config, kwargs, deadline, cancelled):
+        def submit(slot):
+            return self._workers.start(slot, self.llm.invoke, input, config, **kwargs)
+
+        self._acquire_primary(deadline, cancelled)
+        pending = [submit("primary")]
+        hedge, error = None, None
+        hedge_delay = self._hedge_delay("invoke")
+        hedge_at = time.monotonic() + hedge_delay if hedge_delay is not None else None
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            wait = min(deadline, hedge_at or deadline, now + CANCEL_POLL) - now
+            done, _ = concurrent.futures.wait(pending, timeout=wait, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                if future is hedge:
+                    self._count("hedge_wins")
+                self._abandon(pending)
+                return future.result()
+            if cancelled():
+                self._abandon(pending)
+                raise LLMCancelled()
+            if not done and hedge_at is not None and time.monotonic() >= hedge_at:
+                hedge_at = None  # hedge at most once per attempt
+                if self._try_hedge():
+                    hedge = submit("spare")
+                    pending.append(hedge)
+        if error is not None and not pending:
+            raise error
+        self._abandon(pending)
+        raise LLMTimeoutError(f"LLM call exceeded its {self.deadline}s deadline")
+
+    def _stream_hedged(self, input, config, kwargs, deadline, cancelled) -> _StreamPump:
+        ready = threading.Event()
+
+        def start(slot):
+            return _StreamPump(self._workers, slot, self.llm, input, config, kwargs, ready)
+
+        self._acquire_primary(deadline, cancelled)
+        pending = [start("primary")]
+        hedge, error = None, None
+        hedge_delay = self._hedge_delay("stream")
+        hedge_at = time.monotonic() + hedge_delay if hedge_delay is not None else None
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            ready.wait(min(deadline, hedge_at or deadline, now + CANCEL_POLL) - now)
+            ready.clear()
+            started = [pump for pump in pending if pump.first is not None]
+            for pump in started:
+                pending.remove(pump)
+                if pump.first[0] == "error":
+                    error = pump.first[1]
+                    continue
+                if pump is hedge:
+                    self._count("hedge_wins")
+                self._abandon(pending)
+                return pump
+            if cancelled():
+                break
+            if not started and hedge_at is not None and time.monotonic() >= hedge_at:
+                hedge_at = None
+                if self._try_hedge():
+                    hedge = start("spare")
+                    pending.append(hedge)
+        self._abandon(pending)
+        if cancelled():
+            raise LLMCancelled()
+        if error is not None and not pending:
+            raise error
+        raise LLMTimeoutError(f"No LLM output within the {self.deadline}s deadline")
@@ -1,28 +1,38 @@
 import os
+import time
+LAUNCH_TIME = time.perf_counter()
 os.environ['TOKENIZERS_PARALLELISM'] = 'false'
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
 
-import speech_recognition as sr
-from gtts import gTTS
-import pygame
-import google.generativeai as genai
-from dotenv import load_dotenv
-import signal
+import concurrent.futures
 import sys
-import time
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
 import threading
+# Only lightweight modules here: the login window must paint before
+# LangChain, Chroma, torch and the audio stack are imported (see preloader.py)
 from user_manager import UserManager
+from phrases import (
+    is_exit_command, EXIT_RESPONSE, WELCOME_TEMPLATE, FIXED_PHRASES
+)
+import preloader
+from tracing import tracer
+from scheduler import TurnScheduler, TurnCancelled
+from ui_updates import TranscriptView, UIUpdateQueue
+
+# Set BUJJI_STARTUP_BENCHMARK=1 to log in automatically with
+# BUJJI_BENCH_USER/BUJJI_BENCH_PASSWORD and exit after the first greeting
+STARTUP_BENCHMARK = os.getenv('BUJJI_STARTUP_BENCHMARK') == '1'
+
+# Lines kept in the on-screen transcript, and turns shown by the History button
+TRANSCRIPT_LINES = 400
+HISTORY_TURNS = 500
+# How often the login window checks on a password check in progress
+LOGIN_POLL_MS = 20
 
-from langchain_google_genai import GoogleGenerativeAI
-from langchain.chains import create_history_aware_retriever
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.schema.messages import HumanMessage, AIMessage
-from langchain.schema.runnable import RunnablePassthrough
-from langchain_core.runnables import RunnableConfig
-from langchain_core.output_parsers import StrOutputParser
+def report_startup(stage):
+    """Print the time elapsed since launch for a startup milestone"""
+    print(f"[startup] {stage}: {time.perf_counter() - LAUNCH_TIME:.3f}s", flush=True)
 
 class LoginWindow:
     def __init__(self, on_login_success):
@@ -31,6 +41,11 @@ class LoginWindow:
         self.window.geometry("500x500")
         self.user_manager = UserManager()
         self.on_login_success = on_login_success
+        # Import and warm everything else while the user types their password
+        preloader.start(
+            self.user_manager.chroma_dir, FIXED_PHRASES,
+            on_done=lambda: report_startup("heavy modules loaded")
+        )
         
         # Username
         ttk.Label(self.window, text="Username:").pack(pady=5)
@@ -43,21 +58,74 @@ class LoginWindow:
         ttk.Entry(self.window, textvariable=self.password_var, show="*").pack()
         
         # Login button
-        ttk.Button(self.window, text="Login", command=self.login).pack(pady=10)
-        ttk.Button(self.window, text="Register", command=self.register).pack()
+        self.login_button = ttk.Button(self.window, text="Login", command=self.login)
+        self.login_button.pack(pady=10)
+        self.register_button = ttk.Button(self.window, text="Register", command=self.register)
+        self.register_button.pack()
+        self.status_label = ttk.Label(self.window, text="")
+        self.status_label.pack(pady=10)
         
+        self.window.after(0, self.on_ready)
         self.window.mainloop()
     
+    def on_ready(self):
+        report_startup("login window ready")
+        if STARTUP_BENCHMARK:
+            self.username_var.set(os.getenv('BUJJI_BENCH_USER', ''))
+            self.password_var.set(os.getenv('BUJJI_BENCH_PASSWORD', ''))
+            self.login()
+    
+    def set_busy(self, message):
+        """Disable the buttons while a check runs; an empty message re-enables them"""
+        state = ["disabled"] if message else ["!disabled"]
+        self.login_button.state(state)
+        self.register_button.state(state)
+        self.status_label.config(text=message)
+    
+    def when_done(self, future, callback):
+        """Call ``callback(result)`` on the Tk thread once ``future`` finishes"""
+        if not future.done():
+            self.window.after(LOGIN_POLL_MS, self.when_done, future, callback)
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            self.set_busy("")
+            messagebox.showerror("Error", f"Something went wrong: {e}")
+            return
+        callback(result)
+    
     def login(self):
         username = self.username_var.get()
         password = self.password_var.get()
         
-        if self.user_manager.authenticate(username, password):
-            context = self.user_manager.get_user_context(username)
-            self.window.destroy()
-            self.on_login_success(username, context)
-        else:
+        # bcrypt runs on the auth pool so the window keeps repainting
+        self.set_busy("Checking...")
+        self.when_done(
+            self.user_manager.authenticate_async(username, password),
+            lambda ok: self.on_authenticated(username, ok)
+        )
+    
+    def on_authenticated(self, username, ok):
+        if not ok:
+            self.set_busy("")
             messagebox.showerror("Error", "Invalid username or password")
+            return
+        self.set_busy("Loading your conversations...")
+        context = concurrent.futures.Future()
+        
+        def load():
+            try:
+                context.set_result(self.user_manager.get_user_context(username))
+            except Exception as e:
+                context.set_exception(e)
+        
+        threading.Thread(target=load, daemon=True).start()
+        self.when_done(context, lambda user_context: self.on_context_loaded(username, user_context))
+    
+    def on_context_loaded(self, username, context):
+        self.window.destroy()
+        self.on_login_success(username, context)
     
     def register(self):
         username = self.username_var.get()
@@ -66,8 +134,13 @@ class LoginWindow:
         if not username or not password:
             messagebox.showerror("Error", "Please enter both username and password")
             return
-            
-        if self.user_manager.create_user(username, password):
+        
+        self.set_busy("Creating account...")
+        self.when_done(self.user_manager.create_user_async(username, password), self.on_registered)
+    
+    def on_registered(self, created):
+        self.set_busy("")
+        if created:
             messagebox.showinfo("Success", "User registered successfully! You can now login.")
         else:
             messagebox.showerror("Error", "Username already exists")
@@ -82,29 +155,42 @@ class AudioChatbotGUI:
         self.user_context = user_context
         self.user_manager = UserManager()
         
-        # Initialize the chatbot with full context
-        self.chatbot = AudioChatbot(user_context)
-        self.is_recording = False
-        self.is_speaking = False
+        # Initialize the chatbot with full context (usually imported by now;
+        # the preloader started on it while the login window was open)
+        from audio_chatbot import AudioChatbot
+        self.chatbot = AudioChatbot(
+            user_context,
+            on_summary=lambda summary: self.user_manager.update_context_summary(username, summary)
+        )
+        # Set and read from several worker threads
+        self._recording = threading.Event()
+        self._speaking = threading.Event()
+        # Fixed worker pools per stage; one turn in flight at a time
+        self.scheduler = TurnScheduler()
         
         # Create GUI elements
         self.setup_gui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Welcome message without showing previous context
-        welcome_msg = f"నమస్కారం {username}!"
+        welcome_msg = WELCOME_TEMPLATE.format(username=username)
         self.add_bot_message(welcome_msg)
-        # Store welcome message in context
-        self.user_manager.update_user_context(self.username, welcome_msg, is_human=False)
         self.chatbot.speak(welcome_msg)
+        report_startup("first greeting")
+        if STARTUP_BENCHMARK:
+            self.root.after(0, self.root.quit)
     
     def setup_gui(self):
         # Chat display area
         self.chat_frame = ttk.Frame(self.root)
         self.chat_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        # Chat display
+        # Chat display; only the most recent lines are kept on screen
         self.chat_display = tk.Text(self.chat_frame, wrap=tk.WORD, state=tk.DISABLED)
         self.chat_display.pack(fill=tk.BOTH, expand=True)
+        self.transcript = TranscriptView(self.chat_display, max_lines=TRANSCRIPT_LINES)
+        # Worker threads update widgets only through this queue
+        self.ui = UIUpdateQueue(self.root, self.transcript)
         
         # Status label
         self.status_label = ttk.Label(self.root, text="Ready")
@@ -125,272 +211,256 @@ class AudioChatbotGUI:
             command=self.stop_interaction
         )
         self.stop_button.pack(pady=(0, 10), padx=20, fill=tk.X)
+        
+        # Full conversation history from storage
+        self.history_button = ttk.Button(
+            self.root,
+            text="📜 History",
+            command=self.show_history
+        )
+        self.history_button.pack(pady=(0, 10), padx=20, fill=tk.X)
+        
+        # Ctrl+T toggles per-stage latency tracing
+        self.root.bind("<Control-t>", self.toggle_tracing)
     
     def add_user_message(self, message):
-        self.chat_display.config(state=tk.NORMAL)
-        self.chat_display.insert(tk.END, f"You: {message}\n\n")
-        self.chat_display.see(tk.END)
-        self.chat_display.config(state=tk.DISABLED)
+        self.ui.append(f"You: {message}\n\n")
     
     def add_bot_message(self, message):
-        self.chat_display.config(state=tk.NORMAL)
-        self.chat_display.insert(tk.END, f"Bujji: {message}\n\n")
-        self.chat_display.see(tk.END)
-        self.chat_display.config(state=tk.DISABLED)
+        self.ui.append(f"Bujji: {message}\n\n")
     
-    def toggle_recording(self):
-        if self.is_speaking:
-            # Stop current speech if any
-            pygame.mixer.music.stop()
-            self.is_speaking = False
+    def start_bot_message(self):
+        """Open a bot message that is filled in as the reply streams"""
+        self.ui.append("Bujji: ")
+    
+    def append_bot_text(self, text):
+        self.ui.append(text)
+    
+    def end_bot_message(self):
+        self.append_bot_text("\n\n")
+    
+    def set_status(self, text):
+        self.ui.config(self.status_label, text=text)
+    
+    def set_mic_label(self, text):
+        self.ui.config(self.mic_button, text=text)
+    
+    def show_history(self):
+        """Open the full stored conversation in a separate window"""
+        window = tk.Toplevel(self.root)
+        window.title(f"History - {self.username}")
+        window.geometry("400x600")
+        history = tk.Text(window, wrap=tk.WORD, state=tk.DISABLED)
+        scrollbar = ttk.Scrollbar(window, command=history.yview)
+        history.config(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        history.pack(fill=tk.BOTH, expand=True)
+        view = TranscriptView(history, max_lines=HISTORY_TURNS * 4)
+        view.append("Loading...")
+        
+        def load():
+            self.user_manager.flush()
+            return self.user_manager.get_recent_turns(self.username, limit=HISTORY_TURNS)
+        
+        def render(turns):
+            if not window.winfo_exists():
+                return
+            view.clear()
+            view.append("".join(
+                f"{'You' if doc.metadata.get('type') == 'human' else 'Bujji'}: {doc.page_content}\n\n"
+                for doc in turns
+            ) or "No history yet")
+            history.see("1.0")
         
+        def loaded(future):
+            if future.exception():
+                print(f"Error loading history: {future.exception()}")
+                return
+            self.ui.post(render, future.result())
+        
+        self.scheduler.pools["persistence"].submit(load).add_done_callback(loaded)
+    
+    @property
+    def is_recording(self):
+        return self._recording.is_set()
+
+    @is_recording.setter
+    def is_recording(self, value):
+        self._recording.set() if value else self._recording.clear()
+
+    @property
+    def is_speaking(self):
+        return self._speaking.is_set()
+
+    @is_speaking.setter
+    def is_speaking(self, value):
+        self._speaking.set() if value else self._speaking.clear()
+    
+    def toggle_recording(self):
         if not self.is_recording:
+            # Starting a new utterance cancels any reply still being spoken
             self.start_recording()
         else:
             self.stop_recording()
     
     def start_recording(self):
         self.is_recording = True
-        self.mic_button.config(text="🔴 Recording...")
-        self.status_label.config(text="Listening...")
+        self.set_mic_label("🔴 Recording...")
+        self.set_status("Listening...")
         
-        # Start recording in a separate thread
-        threading.Thread(target=self.record_audio, daemon=True).start()
+        # Run the turn on the scheduler's stage pools
+        self.scheduler.start_turn(self.run_turn)
     
     def stop_recording(self):
         self.is_recording = False
-        self.mic_button.config(text="🎤 Press to Speak")
-        self.status_label.config(text="Processing...")
+        self.set_mic_label("🎤 Press to Speak")
+        self.set_status("Processing...")
     
-    def record_audio(self):
+    def run_turn(self, turn):
+        """Capture, recognize and answer one utterance; aborts when the turn is cancelled"""
+        turn.token.on_cancel(self.chatbot.stop_speaking)
         try:
-            text = self.chatbot.listen()
-            if text:
-                self.add_user_message(text)
-                
-                # Process in separate thread to keep GUI responsive
-                threading.Thread(target=self.process_input, args=(text,), daemon=True).start()
-            else:
-                self.status_label.config(text="Could not understand audio")
-                
+            audio = turn.run("capture", self.chatbot.capture, lambda: turn.cancelled)
+            text = turn.run("stt", self.chatbot.transcribe, audio) if audio else None
+        except TurnCancelled:
+            raise
         except Exception as e:
-            self.status_label.config(text=f"Error: {str(e)}")
+            self.set_status(f"Error: {str(e)}")
+            return
         finally:
             self.is_recording = False
-            self.mic_button.config(text="🎤 Press to Speak")
+            self.set_mic_label("🎤 Press to Speak")
+        
+        if not text:
+            self.set_status("Could not understand audio")
+            return
+        self.add_user_message(text)
+        self.process_input(turn, text)
     
-    def process_input(self, text):
-        if text.lower() in ["quit", "exit", "bye", "stop", "ఆపు", "సరే", "చాలు", "వెళ్తున్నా"]:
-            response = "సర్లే నువ్వు వెళ్ళి రా!"
+    def process_input(self, turn, text):
+        if is_exit_command(text):
+            response = EXIT_RESPONSE
             self.add_bot_message(response)
-            self.speak_response(response)
-            self.root.after(2000, self.root.quit)
-        else:
-            # Update user context with the user's message
-            self.user_manager.update_user_context(self.username, text, is_human=True)
-            
-            # Get bot response
-            response = self.chatbot.get_llm_response(text)
-            
-            # Update user context with bot's response
-            self.user_manager.update_user_context(self.username, response, is_human=False)
-            
-            self.add_bot_message(response)
-            self.speak_response(response)
+            turn.run("tts", self.speak_response, response)
+            self.ui.post(self.root.after, 2000, self.root.quit)
+            return
+        
+        if self.chatbot.streaming:
+            self.process_input_streaming(turn, text)
+            return
+        
+        # Get bot response; a cancelled turn stops waiting on the LLM
+        response = turn.run("llm", self.chatbot.get_llm_response, text, token=turn.token)
+        if response is None:
+            raise TurnCancelled()
+        
+        # Update user context with both messages, only once the turn was answered
+        # so stored history matches the conversation's own
+        turn.submit("persistence", self.user_manager.update_user_context, self.username, text, is_human=True)
+        turn.submit("persistence", self.user_manager.update_user_context, self.username, response, is_human=False)
+        
+        self.add_bot_message(response)
+        turn.run("tts", self.speak_response, response)
+    
+    def process_input_streaming(self, turn, text):
+        """Show and speak the reply sentence by sentence as it is generated"""
+        self.is_speaking = True
+        self.set_status("Speaking...")
+        self.start_bot_message()
+        try:
+            response = turn.run(
+                "llm", self.chatbot.speak_streaming,
+                self.chatbot.stream_llm_response(text, token=turn.token),
+                on_text=self.append_bot_text,
+                executor=self.scheduler.pools["tts"],
+                token=turn.token,
+            )
+            if turn.cancelled:
+                raise TurnCancelled()
+            turn.submit("persistence", self.user_manager.update_user_context, self.username, text, is_human=True)
+            turn.submit("persistence", self.user_manager.update_user_context, self.username, response, is_human=False)
+        except TurnCancelled:
+            raise
+        except Exception as e:
+            self.set_status(f"Error in speech: {str(e)}")
+        finally:
+            self.end_bot_message()
+            self.is_speaking = False
+            self.set_status("Ready")
     
     def speak_response(self, text):
         self.is_speaking = True
-        self.status_label.config(text="Speaking...")
+        self.set_status("Speaking...")
         
         try:
-            # Create gTTS object with Telugu language
-            tts = gTTS(text=text, lang='te')
-            
-            # Save the audio
-            tts.save(self.chatbot.temp_file)
+            # Synthesize (or reuse) Telugu speech and play it from memory
+            audio = self.chatbot.tts_cache.synthesize(text, lang='te')
             
-            # Play audio using pygame
-            pygame.mixer.music.load(self.chatbot.temp_file)
-            pygame.mixer.music.play()
-            
-            # Wait for audio to finish
-            while pygame.mixer.music.get_busy() and self.is_speaking:
-                time.sleep(0.1)
-            
-            # Clean up
-            if os.path.exists(self.chatbot.temp_file):
-                os.remove(self.chatbot.temp_file)
+            # Returns when playback ends or the Stop button interrupts it
+            self.chatbot.player.play(audio).wait()
                 
         except Exception as e:
-            self.status_label.config(text=f"Error in speech: {str(e)}")
+            self.set_status(f"Error in speech: {str(e)}")
         finally:
             self.is_speaking = False
-            self.status_label.config(text="Ready")
+            self.set_status("Ready")
+    
+    def toggle_tracing(self, event=None):
+        if tracer.enabled:
+            print(tracer.format_summary())
+            tracer.disable()
+            self.set_status("Tracing off")
+        else:
+            tracer.enable(os.getenv('BUJJI_TRACE_FILE', 'bujji_trace.jsonl'))
+            self.set_status("Tracing on")
+    
+    def on_close(self):
+        """Stop audio, flush queued conversation turns and close the window"""
+        self.stop_interaction()
+        self.ui.close()
+        # Waits for queued persistence before the writer is flushed and closed
+        self.scheduler.shutdown()
+        self.user_manager.close()
+        self.root.destroy()
     
     def stop_interaction(self):
+        # Cancelling the turn aborts capture, recognition, generation and playback
+        self.scheduler.cancel_current()
         if self.is_speaking:
             self.is_speaking = False
-            pygame.mixer.music.stop()
-        if self.is_recording:
-            self.is_recording = False
-        self.status_label.config(text="Ready")
-        self.mic_button.config(text="🎤 Press to Speak")
-
-class AudioChatbot:
-    def __init__(self, user_context=None):
-        print(f"\nInitializing chatbot with user context...")
-        load_dotenv()
-        
-        # Configure LangChain with Gemini
-        api_key = os.getenv('GOOGLE_API_KEY')
-        if not api_key:
-            raise ValueError("Please set GOOGLE_API_KEY in your .env file")
-            
-        self.llm = GoogleGenerativeAI(
-            model="gemini-2.0-flash",
-            google_api_key=api_key,
-            temperature=0.7
-        )
-        
-        # Set up conversation template
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a Telugu speaking chatbot named Bujji. Your responses should be warm, friendly and in Telugu language."),
-            MessagesPlaceholder(variable_name="chat_history"),
-            ("user", "{input}")
-        ])
-        
-        # Initialize context and chat history
-        self.chat_history = []
-        if user_context and user_context.get("history"):
-            context_str = "\n".join(user_context["history"][-5:])
-            self.chat_history.append(HumanMessage(content="Previous context: " + context_str))
-            self.chat_history.append(AIMessage(content="నేను అర్థం చేసుకున్నాను. మీరు ఏమి చెప్పాలనుకుంటున్నారు?"))
-        
-        # Setup chain
-        self.chain = (
-            {"input": RunnablePassthrough(), "chat_history": lambda _: self.chat_history}
-            | self.prompt
-            | self.llm
-            | StrOutputParser()
-        )
-        
-        # Initialize other components
-        self.recognizer = sr.Recognizer()
-        self.is_running = True
-        self.temp_file = "temp_speech.mp3"
-        pygame.mixer.init()
-        signal.signal(signal.SIGINT, self.signal_handler)
-
-    def signal_handler(self, signum, frame):
-        """Handle Ctrl+C gracefully"""
-        print("\nGracefully shutting down... (Press Ctrl+C again to force quit)")
-        self.is_running = False
-        
-    def listen(self):
-        """Convert speech to text with Telugu support"""
-        try:
-            with sr.Microphone() as source:
-                # Add a longer phrase time limit (default is 3 seconds, so 6 seconds now)
-                audio = self.recognizer.listen(source, phrase_time_limit=6.0)
-                # Try Telugu first, then English if Telugu fails
-                try:
-                    text = self.recognizer.recognize_google(audio, language="te-IN")
-                except:
-                    # Fallback to English if Telugu recognition fails
-                    text = self.recognizer.recognize_google(audio, language="en-US")
-                return text
-        except sr.UnknownValueError:
-            return None
-        except sr.RequestError as e:
-            raise Exception(f"Recognition service error: {e}")
-
-    def get_llm_response(self, text):
-        """Get response using LangChain conversation chain"""
-        if not text:
-            return "నేను మీ మాట వినలేదు. దయచేసి మళ్ళీ చెప్పండి."
-        try:
-            response = self.chain.invoke(text)
-            
-            # Update chat history
-            self.chat_history.extend([
-                HumanMessage(content=text),
-                AIMessage(content=response)
-            ])
-            
-            # Keep only last 10 messages
-            if len(self.chat_history) > 10:
-                self.chat_history = self.chat_history[-10:]
-                
-            return response
-            
-        except Exception as e:
-            print(f"Error getting LLM response: {e}")
-            return "ఏదో తప్పు జరిగింది. దయచేసి మళ్ళీ ప్రయత్నించండి."
-
-    def speak(self, text):
-        """Convert text to speech using gTTS for Telugu"""
-        print(f"Bot: {text}")
-        try:
-            # Create gTTS object with Telugu language
-            tts = gTTS(text=text, lang='te')
-            
-            # Save the audio
-            tts.save(self.temp_file)
-            
-            # Play audio using pygame
-            pygame.mixer.music.load(self.temp_file)
-            pygame.mixer.music.play()
-            
-            # Wait for audio to finish
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
-                if not self.is_running:
-                    pygame.mixer.music.stop()
-                    break
-                
-            # Clean up
-            if os.path.exists(self.temp_file):
-                os.remove(self.temp_file)
-                
-        except Exception as e:
-            print(f"Error in text-to-speech: {e}")
+            self.chatbot.stop_speaking()
+        self.is_recording = False
+        self.set_status("Ready")
+        self.set_mic_label("🎤 Press to Speak")
 
-    def run(self):
-        """Main chat loop"""
-        print("Chatbot initialized. Say something or 'stop' to exit. Press Ctrl+C for graceful shutdown.")
-        
-        # Initial Telugu greeting
-        welcome_msg = "ఏరా ఎలా ఉన్నావ్, నా పేరు బుజ్జి, ఏం కావాలి నీకు"  # Hello! I am your friend. How can I help you?
-        self.speak(welcome_msg)
-        
-        while self.is_running:
-            try:
-                # Get user input through speech
-                user_input = self.listen()
-                if not user_input:
-                    continue
-                    
-                # Exit conditions
-                if user_input.lower() in ["quit", "exit", "bye", "stop", "ఆపు", "సరే", "చాలు", "వెళ్తున్నా"]:
-                    self.speak("సర్లే నువ్వు వెళ్ళి రా!")  # Goodbye! Have a great day! in Telugu
-                    break
-                
-                # Get and speak response
-                response = self.get_llm_response(user_input)
-                if self.is_running:  # Check if we should still speak
-                    self.speak(response)
-                
-            except Exception as e:
-                print(f"\nAn error occurred: {e}")
-                break
+def __getattr__(name):
+    # AudioChatbot moved to audio_chatbot.py so importing main stays cheap
+    if name == "AudioChatbot":
+        from audio_chatbot import AudioChatbot
+        return AudioChatbot
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def main():
     def on_login_success(username, context):
         root = tk.Tk()
         app = AudioChatbotGUI(root, username, context)
         root.mainloop()
+        # Make sure queued turns reach disk before the process exits
+        app.user_manager.close()
     
     LoginWindow(on_login_success)
 
+def serve():
+    """Run Bujji headless, serving many sessions over a local socket"""
+    from server import main as server_main
+    server_main()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if "--profile-imports" in sys.argv[1:]:
+        # Diagnostic: what each module costs to import on a cold interpreter
+        print(preloader.format_profile(preloader.profile_imports()))
+    elif "--server" in sys.argv[1:]:
+        sys.argv.remove("--server")
+        serve()
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,99 @@
+import concurrent.futures
+import contextvars
+from typing import Dict, Iterable, List, Optional
+
+from langchain_core.messages import SystemMessage
+
+from tracing import tracer
+
+_encoding = None
+
+# Retrieval runs on a small shared pool so a slow query can be abandoned
+# without holding up the turn
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory")
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken, falling back to a byte-based estimate"""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            print(f"tiktoken unavailable, estimating token counts: {e}")
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    # Telugu script is 3 bytes per character in UTF-8 and rarely merges
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+class LongTermMemory:
+    """Retrieve relevant past turns from the user's vector store.
+
+    Results are deduplicated against the rolling chat history and packed
+    into a single system message that stays under a token budget.
+    """
+
+    def __init__(self, vectorstore, k: int = 6, token_budget: int = 400, timeout: float = 0.5,
+                 search_filter: Optional[Dict] = None):
+        self.vectorstore = vectorstore
+        # Metadata filter, e.g. {"username": ...} on the shared collection
+        self.search_filter = search_filter
+        self.k = k
+        self.token_budget = token_budget
+        self.timeout = timeout
+
+    def search(self, query: str) -> List:
+        """Top-k similar documents, or an empty list if the search times out"""
+        future = _executor.submit(contextvars.copy_context().run, self._search, query)
+        try:
+            return future.result(timeout=self.timeout)
+        except concurrent.futures.TimeoutError:
+            print(f"Memory retrieval timed out after {self.timeout}s")
+        except Exception as e:
+            print(f"Error retrieving memories: {e}")
+        return []
+
+    def _search(self, query: str) -> List:
+        with tracer.span("memory", k=self.k):
+            return self.vectorstore.similarity_search(query, k=self.k, filter=self.search_filter)
+
+    def pack(self, docs: Iterable, exclude: Iterable[str] = ()) -> List[str]:
+        """Drop duplicates and keep the most relevant turns within the token budget"""
+        seen = set()
+        for text in exclude:
+            # Multi-line messages (e.g. the "Previous context" seed) count line by line
+            seen.add(_normalize(text))
+            seen.update(_normalize(line) for line in text.splitlines())
+        packed, used = [], 0
+        for doc in docs:
+            key = _normalize(doc.page_content)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            speaker = "Bujji" if doc.metadata.get("type") == "ai" else "User"
+            line = f"- {speaker}: {doc.page_content}"
+            tokens = count_tokens(line)
+            if used + tokens > self.token_budget:
+                continue
+            packed.append(line)
+            used += tokens
+        return packed
+
+    def recall(self, query: str, chat_history: Iterable = ()) -> List:
+        """Messages to add to the prompt for this turn"""
+        if not query or self.vectorstore is None:
+            return []
+        exclude = [query] + [message.content for message in chat_history]
+        lines = self.pack(self.search(query), exclude)
+        if not lines:
+            return []
+        return [SystemMessage(
+            content="Things the user said in earlier conversations that may be relevant:\n" + "\n".join(lines)
+        )]
@@ -0,0 +1,118 @@
+"""Move per-user JSON profiles and Chroma collections into the shared user store.
+
+Older versions kept ``users/{username}.json`` and a ``{username}_context``
+collection for every account. This copies each profile into the SQLite
+user store and each collection's turns (with their stored vectors) into
+the shared collection, tagged with the username and numbered by
+timestamp. Migration is idempotent; users already in the store are
+skipped.
+
+    python src/migrate_store.py --data-dir user_data [--delete-legacy]
+"""
+import argparse
+import json
+import os
+import time
+from persistence import turn_id
+
+BATCH = 5000
+
+
+def copy_turns(manager, username: str) -> int:
+    """Copy a legacy collection into the shared one; returns the number of turns.
+
+    Legacy turns have random ids and no turn number, so they are numbered
+    1..N by timestamp and stored under their ``username:turn`` ids.
+    """
+    try:
+        legacy = manager.chroma_client.get_collection(name=f"{username}_context")
+    except Exception:
+        return 0  # user never stored anything
+    # Order by timestamp first, without loading documents or vectors
+    stamped, offset = [], 0
+    while True:
+        rows = legacy.get(limit=BATCH, offset=offset, include=['metadatas'])
+        if not rows['ids']:
+            break
+        stamped.extend(((metadata or {}).get('timestamp', 0), doc_id)
+                       for doc_id, metadata in zip(rows['ids'], rows['metadatas']))
+        offset += len(rows['ids'])
+    ordered = [doc_id for _, doc_id in sorted(stamped)]
+
+    for start in range(0, len(ordered), BATCH):
+        chunk = ordered[start:start + BATCH]
+        rows = legacy.get(ids=chunk, include=['embeddings', 'documents', 'metadatas'])
+        by_id = {doc_id: i for i, doc_id in enumerate(rows['ids'])}
+        turns = [(start + n, by_id[doc_id]) for n, doc_id in enumerate(chunk, start=1) if doc_id in by_id]
+        # Upsert keeps a re-run from duplicating turns
+        manager.collection.upsert(
+            ids=[turn_id(username, turn) for turn, _ in turns],
+            embeddings=[rows['embeddings'][i] for _, i in turns],
+            documents=[rows['documents'][i] for _, i in turns],
+            metadatas=[dict(rows['metadatas'][i] or {}, username=username, turn=turn) for turn, i in turns],
+        )
+    return len(ordered)
+
+
+def migrate_user(manager, username: str, delete_legacy: bool = False) -> bool:
+    """Move one user into the store; returns False if there was nothing to migrate"""
+    path = os.path.join(manager.users_dir, f"{username}.json")
+    if manager.store.exists(username) or not os.path.exists(path):
+        return False
+    with open(path, 'r') as f:
+        profile = json.load(f)
+
+    # Turns first, so the account only appears once its history is in place
+    last_turn = copy_turns(manager, username)
+    manager.store.create(
+        username,
+        profile['password_hash'],
+        context_summary=profile.get('context_summary', ""),
+        created_at=os.path.getmtime(path),
+        last_turn=last_turn,
+    )
+    if delete_legacy:
+        try:
+            manager.chroma_client.delete_collection(name=f"{username}_context")
+        except Exception:
+            pass
+        os.remove(path)
+    return True
+
+
+def migrate(manager, delete_legacy: bool = False) -> int:
+    """Migrate every legacy profile under ``manager.users_dir``"""
+    if not os.path.isdir(manager.users_dir):
+        return 0
+    migrated, start = 0, time.perf_counter()
+    with os.scandir(manager.users_dir) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            username = entry.name[:-len(".json")]
+            try:
+                if migrate_user(manager, username, delete_legacy):
+                    migrated += 1
+            except Exception as e:
+                print(f"Error migrating {username}: {e}")
+                continue
+            if migrated and migrated % 1000 == 0:
+                print(f"Migrated {migrated} users ({time.perf_counter() - start:.0f}s)")
+    return migrated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default="user_data")
+    parser.add_argument("--delete-legacy", action="store_true",
+                        help="remove the JSON profiles and per-user collections once copied")
+    args = parser.parse_args()
+
+    from user_manager import UserManager
+    manager = UserManager(data_dir=args.data_dir)
+    migrated = migrate(manager, delete_legacy=args.delete_legacy)
+    print(f"Migrated {migrated} users; {manager.store.count()} users in the store")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import atexit
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from tracing import tracer
+
+
+def turn_id(username: str, turn: int) -> str:
+    """Document id of a user's numbered turn, so recent turns can be fetched by id"""
+    return f"{username}:{turn}"
+
+
+class ContextWriter:
+    """Write-behind queue for conversation turns.
+
+    Interactions are put on a bounded queue and persisted by a background
+    thread. Each batch is embedded with a single ``embed_documents`` call
+    and written with one bulk insert per user collection, so the response
+    path never waits on the embedding model or SQLite. A failed batch is
+    retried ``retries`` times with doubling backoff (rows are upserted
+    under fixed ids, so a retry never duplicates); after that its turns are
+    counted as failed and the next ``flush()`` returns False.
+    """
+
+    def __init__(self, get_embeddings: Callable, get_collection: Callable[[str], object],
+                 max_queue: int = 1000, batch_size: int = 32, max_wait: float = 0.25,
+                 retries: int = 3, backoff: float = 0.5, max_backoff: float = 4.0):
+        self.get_embeddings = get_embeddings
+        self.get_collection = get_collection
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.batch_sizes = deque(maxlen=100)
+        self.written = 0
+        self.failed = 0
+        self.retried = 0
+        self._reported_failed = 0
+        self._closed = False
+        # Interactions put but not yet written; flush() waits for it to reach 0
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def queue_depth(self) -> int:
+        return self.queue.qsize()
+
+    def stats(self) -> Dict:
+        """Queue depth and batch statistics for monitoring"""
+        sizes = list(self.batch_sizes)
+        return {
+            "queue_depth": self.queue_depth,
+            "written": self.written,
+            "failed": self.failed,
+            "retried": self.retried,
+            "batches": len(sizes),
+            "avg_batch_size": sum(sizes) / len(sizes) if sizes else 0.0,
+            "max_batch_size": max(sizes) if sizes else 0,
+        }
+
+    def put(self, username: str, text: str, metadata: Dict):
+        """Queue an interaction; blocks only when the queue is full"""
+        if self._closed:
+            raise RuntimeError("ContextWriter is closed")
+        # The id is fixed here so a retried batch upserts the same rows
+        doc_id = turn_id(username, metadata["turn"]) if "turn" in metadata else str(uuid.uuid4())
+        with self._idle:
+            self._pending += 1
+        self.queue.put((username, text, metadata, doc_id, tracer.current_turn()))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far has been written.
+
+        False on timeout, or if turns were dropped after their retries since
+        the previous flush.
+        """
+        with self._idle:
+            if not self._idle.wait_for(lambda: self._pending == 0, timeout):
+                return False
+            dropped = self.failed != self._reported_failed
+            self._reported_failed = self.failed
+            return not dropped
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Flush pending interactions and stop the writer thread"""
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        self.queue.put(None)
+        self._thread.join(timeout)
+
+    def _next_batch(self) -> Optional[List]:
+        item = self.queue.get()
+        if item is None:
+            self.queue.task_done()
+            return None
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=max(remaining, 0)) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Put the sentinel back so the loop exits after this batch
+                self.queue.task_done()
+                self.queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                break
+            try:
+                self._write_with_retries(batch)
+                self.written += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                print(f"Error adding interactions to context, dropped {len(batch)}: {e}")
+            finally:
+                self.batch_sizes.append(len(batch))
+                for _ in batch:
+                    self.queue.task_done()
+                with self._idle:
+                    self._pending -= len(batch)
+                    self._idle.notify_all()
+
+    def _write_with_retries(self, batch: List):
+        attempt = 0
+        while True:
+            try:
+                with tracer.span("persist", batch_size=len(batch), attempt=attempt,
+                                 turns=sorted({turn for *_, turn in batch if turn})):
+                    self._write(batch)
+                return
+            except Exception as e:
+                if attempt >= self.retries:
+                    raise
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+                attempt += 1
+                self.retried += 1
+                print(f"Error adding interactions to context, retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+
+    def _write(self, batch: List):
+        vectors = self.get_embeddings().embed_documents([text for _, text, _, _, _ in batch])
+
+        # One bulk insert per collection; users sharing a collection share the insert
+        by_collection: Dict[str, tuple] = {}
+        for (username, text, metadata, doc_id, _), vector in zip(batch, vectors):
+            collection = self.get_collection(username)
+            _, rows = by_collection.setdefault(
+                collection.name, (collection, {"ids": [], "embeddings": [], "documents": [], "metadatas": []})
+            )
+            rows["ids"].append(doc_id)
+            rows["embeddings"].append(vector)
+            rows["documents"].append(text)
+            rows["metadatas"].append(metadata)
+
+        for collection, rows in by_collection.values():
+            collection.upsert(**rows)
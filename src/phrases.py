@@ -0,0 +1,20 @@
+"""Fixed phrases and exit commands.
+
+Kept free of heavy imports so the login window can use them before
+LangChain and the audio stack are loaded.
+"""
+
+EXIT_COMMANDS = ["quit", "exit", "bye", "stop", "ఆపు", "సరే", "చాలు", "వెళ్తున్నా"]
+EXIT_RESPONSE = "సర్లే నువ్వు వెళ్ళి రా!"  # Goodbye! Have a great day! in Telugu
+NOT_HEARD_RESPONSE = "నేను మీ మాట వినలేదు. దయచేసి మళ్ళీ చెప్పండి."
+ERROR_RESPONSE = "ఏదో తప్పు జరిగింది. దయచేసి మళ్ళీ ప్రయత్నించండి."
+
+GREETING = "ఏరా ఎలా ఉన్నావ్, నా పేరు బుజ్జి, ఏం కావాలి నీకు"  # Hello! I am your friend. How can I help you?
+WELCOME_TEMPLATE = "నమస్కారం {username}!"
+
+# Pre-synthesized into the speech cache at startup
+FIXED_PHRASES = [GREETING, EXIT_RESPONSE, NOT_HEARD_RESPONSE, ERROR_RESPONSE]
+
+
+def is_exit_command(text):
+    return text.lower() in EXIT_COMMANDS
@@ -0,0 +1,150 @@
+import io
+import queue
+import threading
+import time
+from typing import Optional
+
+import pygame
+
+from tracing import tracer
+
+_INTERRUPT = object()
+
+
+class Playback:
+    """Handle for one queued audio buffer"""
+
+    def __init__(self, audio: bytes, generation: int):
+        self.audio = audio
+        self.generation = generation
+        self.length = 0.0
+        self.started = threading.Event()
+        self.done = threading.Event()
+        self.started_at = None
+        self.interrupted = False
+        self.turn_id = tracer.current_turn()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until this buffer has finished playing or was stopped"""
+        return self.done.wait(timeout)
+
+
+class AudioPlayer:
+    """One dedicated player thread fed with in-memory MP3 buffers.
+
+    Buffers are decoded straight from memory and played in the order they
+    were queued; the next buffer is handed to the mixer channel before the
+    current one ends so consecutive chunks play without a gap. The end of
+    each buffer is signalled through ``Playback.done`` instead of polling,
+    and ``stop`` interrupts playback immediately (barge-in).
+    """
+
+    def __init__(self):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        self.queue = queue.Queue()
+        self._generation = 0
+        self._interrupted = threading.Event()
+        self._channel = None
+        self._current = None
+        self._pending = None
+        self._ends_at = 0.0
+        self._thread = threading.Thread(target=self._run, daemon=True, name="audio-player")
+        self._thread.start()
+
+    @property
+    def busy(self) -> bool:
+        return self._current is not None or not self.queue.empty()
+
+    def play(self, audio: bytes) -> Playback:
+        """Queue an MP3 buffer for playback and return its handle"""
+        playback = Playback(audio, self._generation)
+        self.queue.put(playback)
+        return playback
+
+    def stop(self):
+        """Stop the current buffer and drop everything queued before now"""
+        self._generation += 1
+        self._interrupted.set()
+        self.queue.put(_INTERRUPT)
+
+    def close(self):
+        self.stop()
+        self.queue.put(None)
+        self._thread.join(timeout=1.0)
+
+    def _start(self, playback: Playback, at: float):
+        playback.started_at = at
+        playback.started.set()
+
+    def _finish(self, playback: Optional[Playback], interrupted: bool = False):
+        if playback is not None:
+            playback.interrupted = interrupted
+            if playback.started_at is not None:
+                tracer.record("playback", time.monotonic() - playback.started_at,
+                              turn_id=playback.turn_id, interrupted=interrupted)
+            playback.done.set()
+
+    def _interrupt(self):
+        if self._channel is not None:
+            self._channel.stop()
+        self._finish(self._current, interrupted=True)
+        self._finish(self._pending, interrupted=True)
+        self._current = self._pending = None
+        self._interrupted.clear()
+
+    def _run(self):
+        while True:
+            now = time.monotonic()
+            if self._current is not None and now >= self._ends_at:
+                # The mixer has moved on to the queued buffer, if any
+                self._finish(self._current)
+                self._current, self._pending = self._pending, None
+                if self._current is not None:
+                    self._start(self._current, self._ends_at)
+                    self._ends_at += self._current.length
+                continue
+
+            if self._pending is not None:
+                # The channel holds one queued buffer; wait for the hand-off
+                if self._interrupted.wait(self._ends_at - now):
+                    self._interrupt()
+                continue
+
+            timeout = self._ends_at - now if self._current is not None else None
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            if item is _INTERRUPT:
+                self._interrupt()
+                continue
+            if item.generation != self._generation:
+                self._finish(item, interrupted=True)
+                continue
+
+            try:
+                sound = pygame.mixer.Sound(file=io.BytesIO(item.audio))
+            except Exception as e:
+                print(f"Error decoding audio: {e}")
+                self._finish(item)
+                continue
+            item.length = sound.get_length()
+            now = time.monotonic()
+
+            if self._current is not None and self._channel is not None and self._channel.get_busy():
+                self._channel.queue(sound)
+                self._pending = item
+            else:
+                self._finish(self._current)
+                self._channel = sound.play()
+                if self._channel is None:
+                    print("Error playing audio: no free mixer channel")
+                    self._current = None
+                    self._finish(item)
+                    continue
+                self._current = item
+                self._start(item, now)
+                self._ends_at = now + item.length
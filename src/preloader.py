@@ -0,0 +1,101 @@
+"""Deferred loading of the heavy subsystems, and an import-time profile.
+
+The login window only needs Tk, bcrypt and SQLite. Everything else
+(LangChain, Chroma, torch, the audio stack) is imported and warmed on a
+background thread while the user types.
+
+    python src/main.py --profile-imports
+"""
+import importlib
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import resources
+
+# Roughly cheapest-needed-first: speech for the greeting, then the chat stack
+HEAVY_MODULES = [
+    "gtts",
+    "pygame",
+    "speech_recognition",
+    "langchain_core",
+    "langchain",
+    "langchain_google_genai",
+    "chromadb",
+    "langchain_chroma",
+    "langchain_huggingface",
+    "audio_chatbot",
+]
+
+# Seconds each module took to import on the background thread
+import_times: Dict[str, float] = {}
+
+
+def start(chroma_dir: str, phrases: Iterable[str] = (),
+          on_done: Optional[Callable[[], None]] = None) -> threading.Thread:
+    """Import heavy modules and warm shared resources on a daemon thread"""
+    def load():
+        for name in HEAVY_MODULES:
+            if name == "langchain_huggingface" and os.getenv('BUJJI_EMBEDDINGS', 'huggingface') != 'huggingface':
+                continue  # torch is only needed by the default embedding backend
+            started = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                print(f"Error preloading {name}: {e}")
+            import_times[name] = time.perf_counter() - started
+            if name == "gtts":
+                # Fixed phrases synthesize on their own thread meanwhile
+                resources.get_tts_cache().warm_up(phrases)
+        try:
+            resources.get_chroma_client(chroma_dir)
+            resources.get_embeddings()
+            resources.get_llm()
+        except Exception as e:
+            print(f"Error preloading resources: {e}")
+        if on_done:
+            on_done()
+
+    thread = threading.Thread(target=load, daemon=True, name="preloader")
+    thread.start()
+    return thread
+
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def profile_imports(modules: Iterable[str] = ("main",) + tuple(HEAVY_MODULES)
+                    ) -> List[Tuple[str, float, float]]:
+    """Import ``modules`` in a fresh interpreter under ``-X importtime``.
+
+    Returns (module, cumulative seconds, self seconds) for every top-level
+    import, most expensive first. A fresh process is used so modules this
+    interpreter already loaded are still measured.
+    """
+    code = "".join(f"import {name}\n" for name in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True,
+        env=dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1"),
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match and not match.group(3):  # top-level imports only
+            rows.append((match.group(4), int(match.group(2)) / 1e6, int(match.group(1)) / 1e6))
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1])
+    return sorted(rows, key=lambda row: row[1], reverse=True)
+
+
+def format_profile(rows: List[Tuple[str, float, float]], limit: int = 25) -> str:
+    lines = [f"{'module':<40} {'cumulative':>11} {'self':>9}"]
+    for name, cumulative, own in rows[:limit]:
+        lines.append(f"{name:<40} {cumulative * 1000:>9.1f}ms {own * 1000:>7.1f}ms")
+    lines.append(f"{'total':<40} {sum(row[1] for row in rows) * 1000:>9.1f}ms")
+    return "\n".join(lines)
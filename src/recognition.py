@@ -0,0 +1,203 @@
+import concurrent.futures
+import contextvars
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Sequence, Tuple
+
+import speech_recognition as sr
+
+from tracing import tracer
+
+TELUGU_SCRIPT = re.compile('[\u0C00-\u0C7F]')
+
+
+def has_telugu_script(text: str) -> bool:
+    return bool(TELUGU_SCRIPT.search(text or ""))
+
+
+class RecognitionBackend:
+    """A speech-to-text service. ``recognize`` returns (text, confidence)
+    and raises ``sr.UnknownValueError`` when nothing was understood."""
+
+    name = "backend"
+
+    def recognize(self, audio: sr.AudioData, language: str) -> Tuple[str, float]:
+        raise NotImplementedError
+
+
+class GoogleBackend(RecognitionBackend):
+    """Google Web Speech API through SpeechRecognition"""
+
+    name = "google"
+
+    def __init__(self, recognizer: Optional[sr.Recognizer] = None):
+        self.recognizer = recognizer or sr.Recognizer()
+
+    def recognize(self, audio, language):
+        result = self.recognizer.recognize_google(audio, language=language, show_all=True)
+        if not result or not result.get("alternative"):
+            raise sr.UnknownValueError()
+        best = result["alternative"][0]
+        # Google only reports confidence for the top alternative, and not always
+        return best["transcript"], float(best.get("confidence", 0.5))
+
+
+class LocalBackend(RecognitionBackend):
+    """Wrap an offline recognizer function ``fn(audio, language) -> text``"""
+
+    name = "local"
+
+    def __init__(self, fn: Callable[[sr.AudioData, str], str], confidence: float = 0.5):
+        self.fn = fn
+        self.confidence = confidence
+
+    def recognize(self, audio, language):
+        text = self.fn(audio, language)
+        if not text or not text.strip():
+            raise sr.UnknownValueError()
+        return text.strip(), self.confidence
+
+
+class WhisperBackend(LocalBackend):
+    """Offline recognition with a local Whisper model"""
+
+    name = "whisper"
+    LANGUAGES = {"te-IN": "telugu", "en-US": "english"}
+
+    def __init__(self, model: str = "base", recognizer: Optional[sr.Recognizer] = None):
+        recognizer = recognizer or sr.Recognizer()
+        super().__init__(lambda audio, language: recognizer.recognize_whisper(
+            audio, model=model, language=self.LANGUAGES.get(language, language)
+        ))
+
+
+def create_backend(name: str, recognizer: Optional[sr.Recognizer] = None) -> RecognitionBackend:
+    """Backend by name, as used by the BUJJI_STT_BACKEND setting"""
+    if name == "google":
+        return GoogleBackend(recognizer)
+    if name == "whisper":
+        return WhisperBackend(recognizer=recognizer)
+    raise ValueError(f"Unknown speech recognition backend: {name}")
+
+
+class RecognitionEngine:
+    """Recognize an utterance in Telugu and English at the same time.
+
+    Both language requests are sent concurrently. A Telugu-script result
+    from the Telugu request wins as soon as it arrives and the English
+    request is abandoned; otherwise the most confident result is used.
+    Results are cached by the raw audio so retries are free, and
+    ``prefetch`` starts recognition early (e.g. at a pause in speech) so a
+    later ``recognize`` of the same audio joins the request in flight.
+    """
+
+    def __init__(self, backend: Optional[RecognitionBackend] = None,
+                 languages: Sequence[str] = ("te-IN", "en-US"),
+                 timeout: float = 10.0, cache_size: int = 64, max_concurrent: int = 2):
+        self.backend = backend or GoogleBackend()
+        self.languages = tuple(languages)
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # One worker per language for each of ``max_concurrent`` recognitions
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrent * len(self.languages), thread_name_prefix="stt"
+        )
+        # Speculative requests; separate so they cannot starve the language workers
+        self._inflight = {}
+        self._last_prefetch = None
+        self._prefetch_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="stt-prefetch"
+        )
+
+    def _cache_key(self, audio: sr.AudioData) -> str:
+        digest = hashlib.sha1(audio.get_raw_data())
+        digest.update(f"{audio.sample_rate}:{audio.sample_width}:{self.backend.name}".encode())
+        return digest.hexdigest()
+
+    def recognize(self, audio: sr.AudioData) -> Optional[str]:
+        """Return the transcript, or None if no language understood the audio"""
+        key = self._cache_key(audio)
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            future = self._inflight.get(key)
+        if future is not None:
+            return future.result()
+        return self._recognize_and_store(key, audio)
+
+    def prefetch(self, audio: sr.AudioData):
+        """Start recognizing ``audio`` in the background"""
+        key = self._cache_key(audio)
+        with self._cache_lock:
+            if key in self._cache or key in self._inflight:
+                return
+            # A newer pause supersedes a speculation that has not started yet
+            if self._last_prefetch and self._last_prefetch[1].cancel():
+                self._inflight.pop(self._last_prefetch[0], None)
+            future = self._prefetch_executor.submit(
+                contextvars.copy_context().run, self._recognize_and_store, key, audio
+            )
+            self._inflight[key] = future
+            self._last_prefetch = (key, future)
+
+    def _recognize_and_store(self, key: str, audio: sr.AudioData) -> Optional[str]:
+        try:
+            text = self._recognize(audio)
+            if text is not None:
+                with self._cache_lock:
+                    self._cache[key] = text
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+            return text
+        finally:
+            with self._cache_lock:
+                self._inflight.pop(key, None)
+
+    def _recognize(self, audio: sr.AudioData) -> Optional[str]:
+        futures = {
+            self._executor.submit(contextvars.copy_context().run, self._recognize_one, audio, language): language
+            for language in self.languages
+        }
+        results = {}
+        request_errors = []
+        try:
+            for future in concurrent.futures.as_completed(futures, timeout=self.timeout):
+                language = futures[future]
+                try:
+                    results[language] = future.result()
+                except sr.UnknownValueError:
+                    continue
+                except sr.RequestError as e:
+                    request_errors.append(e)
+                    continue
+                text, _ = results[language]
+                if language == self.languages[0] and has_telugu_script(text):
+                    break
+        except concurrent.futures.TimeoutError:
+            print(f"Speech recognition timed out after {self.timeout}s")
+        finally:
+            for future in futures:
+                future.cancel()
+
+        if not results:
+            if request_errors and len(request_errors) == len(futures):
+                raise request_errors[0]
+            return None
+        return self.pick(results)
+
+    def _recognize_one(self, audio: sr.AudioData, language: str) -> Tuple[str, float]:
+        with tracer.span("stt", language=language, backend=self.backend.name):
+            return self.backend.recognize(audio, language)
+
+    def pick(self, results) -> str:
+        """Choose between per-language (text, confidence) results"""
+        primary = results.get(self.languages[0])
+        if primary and has_telugu_script(primary[0]):
+            return primary[0]
+        text, _ = max(results.values(), key=lambda result: result[1])
+        return text
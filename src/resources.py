@@ -0,0 +1,198 @@
+import os
+import threading
+from typing import Dict
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Process-wide registry so every UserManager shares one embedding model and
+# one Chroma client per storage directory
+_embeddings = None
+_embeddings_lock = threading.Lock()
+_chroma_clients: Dict[str, object] = {}
+_chroma_lock = threading.Lock()
+_tts_cache = None
+_tts_cache_lock = threading.Lock()
+_audio_player = None
+_audio_player_lock = threading.Lock()
+_llm = None
+_llm_lock = threading.Lock()
+_response_cache = None
+_response_cache_lock = threading.Lock()
+_auth_services: Dict[str, object] = {}
+_auth_lock = threading.Lock()
+
+
+def get_embeddings():
+    """Return the shared embedding model, loading it on first use.
+
+    The backend (``BUJJI_EMBEDDINGS``: huggingface, onnx or hashing) sits
+    behind a text-hash cache and a micro-batching queue shared by every
+    caller in the process.
+    """
+    global _embeddings
+    if _embeddings is None:
+        with _embeddings_lock:
+            if _embeddings is None:
+                from embedding_backends import EmbeddingService, create_backend
+                backend = create_backend(
+                    os.getenv('BUJJI_EMBEDDINGS', 'huggingface'),
+                    EMBEDDING_MODEL,
+                    model_dir=os.getenv('BUJJI_EMBEDDINGS_MODEL_DIR'),
+                )
+                _embeddings = EmbeddingService(
+                    backend,
+                    cache_size=int(os.getenv('BUJJI_EMBEDDING_CACHE', '2048')),
+                    max_batch=int(os.getenv('BUJJI_EMBEDDING_BATCH', '64')),
+                    max_wait_ms=float(os.getenv('BUJJI_EMBEDDING_WAIT_MS', '0')),
+                )
+    return _embeddings
+
+
+def embeddings_loaded() -> bool:
+    return _embeddings is not None
+
+
+def embedding_stats() -> Dict:
+    """Cache and batching counters of the shared embedding service"""
+    stats = getattr(_embeddings, "stats", None)
+    return stats() if stats else {}
+
+
+def get_chroma_client(path: str):
+    """Return the shared persistent Chroma client for a storage directory"""
+    key = os.path.abspath(path)
+    client = _chroma_clients.get(key)
+    if client is None:
+        with _chroma_lock:
+            client = _chroma_clients.get(key)
+            if client is None:
+                import chromadb
+                client = chromadb.PersistentClient(path=path)
+                _chroma_clients[key] = client
+    return client
+
+
+def get_auth_service(db_path: str):
+    """Return the shared password checker (user index and bcrypt pool) for a user store"""
+    key = os.path.abspath(db_path)
+    service = _auth_services.get(key)
+    if service is None:
+        with _auth_lock:
+            service = _auth_services.get(key)
+            if service is None:
+                from auth_service import AuthService
+                from user_store import UserStore
+                service = AuthService(UserStore(db_path))
+                _auth_services[key] = service
+    return service
+
+
+def get_tts_cache(cache_dir: str = os.path.join("user_data", "tts_cache")):
+    """Return the shared synthesized-speech cache"""
+    global _tts_cache
+    if _tts_cache is None:
+        with _tts_cache_lock:
+            if _tts_cache is None:
+                from tts_cache import TTSCache
+                _tts_cache = TTSCache(cache_dir)
+    return _tts_cache
+
+
+def get_llm():
+    """Return the Gemini client shared by every conversation in the process.
+
+    The client (and its connection pool) is created once and wrapped with
+    deadlines, retries, optional hedging and a process-wide rate limiter.
+    """
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                from dotenv import load_dotenv
+                from langchain_google_genai import GoogleGenerativeAI
+                from llm_client import ResilientLLM, TokenBucket
+                load_dotenv()
+
+                # Configure LangChain with Gemini
+                api_key = os.getenv('GOOGLE_API_KEY')
+                if not api_key:
+                    raise ValueError("Please set GOOGLE_API_KEY in your .env file")
+
+                # BUJJI_LLM_ENDPOINT points the client at another server, e.g. a local mock
+                endpoint = os.getenv('BUJJI_LLM_ENDPOINT')
+                client = GoogleGenerativeAI(
+                    model="gemini-2.0-flash",
+                    google_api_key=api_key,
+                    temperature=0.7,
+                    timeout=float(os.getenv('BUJJI_LLM_ATTEMPT_TIMEOUT', '10')),
+                    # Retries are handled by ResilientLLM
+                    max_retries=0,
+                    client_options={"api_endpoint": endpoint} if endpoint else None,
+                    transport="rest" if endpoint else None,
+                )
+                # GoogleGenerativeAI does not pass max_retries on to the chat model it
+                # wraps, which would otherwise retry 6 times with up to 60 s backoff
+                # underneath ResilientLLM, outside its deadline and rate limiter
+                inner = getattr(client, "client", None)
+                if inner is not None and hasattr(inner, "max_retries"):
+                    inner.max_retries = 0
+                _llm = ResilientLLM(
+                    client,
+                    deadline=float(os.getenv('BUJJI_LLM_DEADLINE', '20')),
+                    max_retries=int(os.getenv('BUJJI_LLM_RETRIES', '2')),
+                    hedge=os.getenv('BUJJI_LLM_HEDGE') == '1',
+                    max_workers=int(os.getenv('BUJJI_LLM_WORKERS', '16')),
+                    spare_workers=int(os.getenv('BUJJI_LLM_SPARE_WORKERS', '0')) or None,
+                    limiter=TokenBucket(
+                        rate=float(os.getenv('BUJJI_LLM_RPS', '10')),
+                        burst=int(os.getenv('BUJJI_LLM_BURST', '20'))
+                    ),
+                    # Read per call by the retry wrapper inside the chat model
+                    call_kwargs={"max_retries": 0},
+                )
+    return _llm
+
+
+def llm_stats() -> Dict:
+    """Call counts and latency percentiles of the shared LLM client"""
+    stats = getattr(_llm, "stats", None)
+    return stats() if stats else {}
+
+
+def get_response_cache():
+    """Return the shared semantic response cache"""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                from response_cache import SemanticResponseCache
+                _response_cache = SemanticResponseCache(
+                    get_embeddings(),
+                    threshold=float(os.getenv('BUJJI_RESPONSE_CACHE_THRESHOLD', '0.92'))
+                )
+    return _response_cache
+
+
+def get_audio_player():
+    """Return the process-wide audio player thread"""
+    global _audio_player
+    if _audio_player is None:
+        with _audio_player_lock:
+            if _audio_player is None:
+                from playback import AudioPlayer
+                _audio_player = AudioPlayer()
+    return _audio_player
+
+
+def preload_in_background(chroma_dir: str) -> threading.Thread:
+    """Load the embedding model and Chroma client without blocking the caller"""
+    def load():
+        try:
+            get_chroma_client(chroma_dir)
+            get_embeddings()
+        except Exception as e:
+            print(f"Error preloading resources: {e}")
+
+    thread = threading.Thread(target=load, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,181 @@
+import hashlib
+import itertools
+import math
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+def normalize_utterance(text: str) -> str:
+    """Lowercase, drop punctuation and symbols and collapse whitespace"""
+    # Category-based, since \W would also strip Telugu vowel signs (combining marks)
+    return " ".join("".join(
+        " " if unicodedata.category(char)[0] in "PS" else char for char in text.lower()
+    ).split())
+
+
+# Greetings and small talk whose reply does not depend on the conversation
+# so far (normalized; Telugu script and the romanized/English forms STT returns)
+CONTEXT_FREE_UTTERANCES = {
+    "hi", "hello", "hey", "namaskaram", "నమస్కారం", "హలో", "హాయ్",
+    "how are you", "ela unnav", "ela unnavu", "ఎలా ఉన్నావ్", "ఎలా ఉన్నావు", "బాగున్నావా",
+    "what is your name", "who are you", "నీ పేరు ఏంటి", "నీ పేరు ఏమిటి", "నువ్వు ఎవరు",
+    "thank you", "thanks", "థాంక్స్", "ధన్యవాదాలు",
+    "good morning", "good night", "శుభోదయం", "శుభ రాత్రి",
+}
+
+
+# Words that make the reply depend on when it is asked; such utterances are never cached
+TIME_DEPENDENT_WORDS = {
+    "time", "date", "day", "today", "tonight", "tomorrow", "yesterday", "now", "weather",
+    "టైం", "టైమ్", "సమయం", "తేదీ", "ఈరోజు", "ఇవాళ", "ఈ రోజు", "రేపు", "నిన్న", "ఇప్పుడు", "వాతావరణం",
+}
+
+
+def context_key(utterance: str, messages: Sequence, summary: Optional[str] = None,
+                window: int = 2) -> Optional[str]:
+    """Context a reply to ``utterance`` may be reused in, or None if it must not be cached.
+
+    Context-free intents (greetings, small talk) share one context.
+    Anything else is tied to the last ``window`` messages and the rolling
+    summary, so follow-ups like "tell me more" only match within the same
+    exchange. Time- and date-dependent asks are never cached.
+    """
+    normalized = normalize_utterance(utterance)
+    words = set(normalized.split())
+    if words & TIME_DEPENDENT_WORDS or any(" " in w and w in normalized for w in TIME_DEPENDENT_WORDS):
+        return None
+    if normalized in CONTEXT_FREE_UTTERANCES:
+        return ""
+    recent = [message.content for message in messages[-window:]] if window else []
+    return hashlib.sha1("\0".join([summary or ""] + recent).encode('utf-8')).hexdigest()[:16]
+
+
+def _unit(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+class _Entry:
+    __slots__ = ("entry_id", "scope", "normalized", "vector", "reply", "created", "hits")
+
+    def __init__(self, entry_id, scope, normalized, vector, reply):
+        self.entry_id = entry_id
+        self.scope = scope
+        self.normalized = normalized
+        self.vector = vector
+        self.reply = reply
+        self.created = time.monotonic()
+        self.hits = 0
+
+
+class SemanticResponseCache:
+    """Reuse replies to near-identical utterances.
+
+    Utterances are normalized and embedded with the shared embedding model;
+    a cached reply is returned when a previous utterance in the same scope
+    (user + ``context_key``) is above ``threshold`` cosine similarity.
+    Exact normalized matches skip the embedding entirely. Entries expire
+    after ``ttl`` seconds and the least recently used are evicted beyond
+    ``max_entries``. Synthesized audio for a cached reply is served by the
+    content-addressed TTS cache.
+    """
+
+    def __init__(self, embeddings, threshold: float = 0.92, ttl: float = 6 * 3600,
+                 max_entries: int = 5000):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._by_scope: Dict[tuple, List[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "evictions": self.evictions,
+        }
+
+    def _embed(self, normalized: str) -> List[float]:
+        return _unit(self.embeddings.embed_query(normalized))
+
+    def lookup(self, username: str, context: str, utterance: str) -> Optional[str]:
+        """Cached reply for an utterance, or None"""
+        normalized = normalize_utterance(utterance)
+        if not normalized:
+            return None
+        scope = (username, context)
+
+        with self._lock:
+            self._expire()
+            cutoff = time.monotonic() - self.ttl
+            candidates = [
+                self._entries[i] for i in self._by_scope.get(scope, ())
+                if self._entries[i].created >= cutoff
+            ]
+            for entry in candidates:
+                if entry.normalized == normalized:
+                    return self._hit(entry)
+            if not candidates:
+                self.misses += 1
+                return None
+
+        vector = self._embed(normalized)
+        best, best_score = None, self.threshold
+        for entry in candidates:
+            score = sum(a * b for a, b in zip(vector, entry.vector))
+            if score >= best_score:
+                best, best_score = entry, score
+
+        with self._lock:
+            if best is not None and self._entries.get(best.entry_id) is best:
+                return self._hit(best)
+            self.misses += 1
+            return None
+
+    def store(self, username: str, context: str, utterance: str, reply: str):
+        normalized = normalize_utterance(utterance)
+        if not normalized or not reply:
+            return
+        vector = self._embed(normalized)
+        with self._lock:
+            entry = _Entry(self._next_id, (username, context), normalized, vector, reply)
+            self._next_id += 1
+            self._entries[entry.entry_id] = entry
+            self._by_scope.setdefault(entry.scope, []).append(entry.entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _hit(self, entry: _Entry) -> str:
+        entry.hits += 1
+        self.hits += 1
+        self._entries.move_to_end(entry.entry_id)
+        return entry.reply
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        # Expired entries collect at the LRU end; check a bounded prefix so
+        # lookups stay cheap (stale candidates are also filtered in lookup)
+        for entry_id in list(itertools.islice(self._entries, 64)):
+            if self._entries[entry_id].created < cutoff:
+                self._remove(entry_id)
+                self.evictions += 1
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        ids = self._by_scope.get(entry.scope)
+        if ids is not None:
+            ids.remove(entry_id)
+            if not ids:
+                del self._by_scope[entry.scope]
@@ -0,0 +1,196 @@
+import concurrent.futures
+import contextvars
+import threading
+from typing import Callable, Dict, List, Optional
+
+from tracing import tracer
+
+# Workers per stage. One capture worker because there is one microphone;
+# STT runs its languages concurrently inside RecognitionEngine already.
+DEFAULT_WORKERS = {
+    "capture": 1,
+    "stt": 1,
+    "llm": 1,
+    "persistence": 1,
+    "tts": 1,
+}
+# Stages whose queued work must still run at shutdown (conversation turns to store)
+DRAINED_STAGES = ("persistence",)
+
+
+class TurnCancelled(Exception):
+    """Raised inside a turn once it has been cancelled"""
+
+
+class CancellationToken:
+    """Thread-safe cancelled flag with callbacks"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in cancel callback: {e}")
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run ``callback`` on cancel (now, if already cancelled); returns an unregister function"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise TurnCancelled()
+
+    def _discard(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+class Turn:
+    """One user utterance moving through the stage pools"""
+
+    def __init__(self, scheduler: "TurnScheduler", turn_id: str):
+        self.scheduler = scheduler
+        self.turn_id = turn_id
+        self.token = CancellationToken()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def cancel(self):
+        self.token.cancel()
+
+    def submit(self, stage: str, fn: Callable, *args, **kwargs) -> concurrent.futures.Future:
+        """Run ``fn`` on the stage pool without waiting for it"""
+        self.token.raise_if_cancelled()
+        context = contextvars.copy_context()
+        return self.scheduler.pools[stage].submit(context.run, fn, *args, **kwargs)
+
+    def run(self, stage: str, fn: Callable, *args, **kwargs):
+        """Run ``fn`` on the stage pool and wait for the result.
+
+        Returns as soon as the turn is cancelled (raising TurnCancelled),
+        even if the stage itself is still blocked, e.g. on the microphone.
+        """
+        future = self.submit(stage, fn, *args, **kwargs)
+        done = threading.Event()
+        future.add_done_callback(lambda _: done.set())
+        unregister = self.token.on_cancel(done.set)
+        try:
+            done.wait()
+        finally:
+            unregister()
+        if self.token.cancelled:
+            future.cancel()
+            raise TurnCancelled()
+        return future.result()
+
+
+class TurnScheduler:
+    """Run voice turns one at a time over fixed per-stage worker pools.
+
+    Each stage (capture, STT, LLM, persistence, TTS) has its own bounded
+    pool, so the thread count stays constant however long the session
+    runs. Only one turn is active: starting a new turn cancels the current
+    one, and a turn that is still waiting to start is replaced rather than
+    queued behind it, so turns never pile up.
+    """
+
+    def __init__(self, workers: Optional[Dict[str, int]] = None):
+        workers = {**DEFAULT_WORKERS, **(workers or {})}
+        self.pools = {
+            stage: concurrent.futures.ThreadPoolExecutor(max_workers=count, thread_name_prefix=f"turn-{stage}")
+            for stage, count in workers.items()
+        }
+        # Drives the stages of a turn; a single worker keeps turns in order
+        self._driver = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="turn")
+        self._lock = threading.Lock()
+        self._current: Optional[Turn] = None
+        self.started = 0
+        self.cancelled = 0
+
+    @property
+    def current(self) -> Optional[Turn]:
+        return self._current
+
+    @property
+    def busy(self) -> bool:
+        turn = self._current
+        return turn is not None and not turn.cancelled
+
+    def start_turn(self, pipeline: Callable[[Turn], None],
+                   on_done: Optional[Callable[[Turn], None]] = None) -> Turn:
+        """Cancel whatever is in flight and run ``pipeline(turn)`` next"""
+        with self._lock:
+            self._cancel_current()
+            turn = Turn(self, tracer.new_turn())
+            self._current = turn
+            self.started += 1
+        context = contextvars.copy_context()
+        self._driver.submit(context.run, self._drive, turn, pipeline, on_done)
+        return turn
+
+    def cancel_current(self):
+        """Abort the in-flight turn, if any"""
+        with self._lock:
+            self._cancel_current()
+
+    def _cancel_current(self):
+        if self._current is not None and not self._current.cancelled:
+            self._current.cancel()
+            self.cancelled += 1
+
+    def _drive(self, turn: Turn, pipeline: Callable[[Turn], None], on_done):
+        try:
+            if turn.cancelled:
+                return  # superseded before it started
+            with tracer.bind(turn.turn_id):
+                pipeline(turn)
+        except TurnCancelled:
+            pass
+        except Exception as e:
+            print(f"Error in turn {turn.turn_id}: {e}")
+        finally:
+            with self._lock:
+                if self._current is turn:
+                    self._current = None
+            if on_done:
+                on_done(turn)
+
+    def stats(self) -> Dict:
+        return {
+            "started": self.started,
+            "cancelled": self.cancelled,
+            "threads": {stage: len(pool._threads) for stage, pool in self.pools.items()},
+        }
+
+    def shutdown(self):
+        """Cancel the current turn and queued stage work, then wait for queued persistence"""
+        self.cancel_current()
+        self._driver.shutdown(wait=False, cancel_futures=True)
+        for stage, pool in self.pools.items():
+            if stage not in DRAINED_STAGES:
+                pool.shutdown(wait=False, cancel_futures=True)
+        for stage in DRAINED_STAGES:
+            if stage in self.pools:
+                self.pools[stage].shutdown(wait=True)
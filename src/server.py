@@ -0,0 +1,283 @@
+"""Headless multi-session Bujji server.
+
+Speaks newline-delimited JSON over TCP (or a Unix socket). Each request is
+one JSON object with an ``op`` field:
+
+    {"op": "open", "username": "...", "password": "..."}  -> {"session": "..."}
+    {"op": "turn", "session": "...", "text": "..."}        -> {"reply": "..."}
+    {"op": "turn", "session": "...", "audio": "<base64 WAV>", "speak": true}
+        -> {"transcript": "...", "reply": "...", "audio": "<base64 MP3>"}
+    {"op": "close", "session": "..."}                      -> {"closed": true}
+    {"op": "trace", "session": "...", "enabled": true}     -> {"tracing": true}
+    {"op": "stats", "session": "..."}                      -> {"latency_ms": {...}, ...}
+
+``trace`` and ``stats`` need a session of a user named with ``--admin``
+(or ``BUJJI_ADMINS``). Traces go to ``--trace-file`` (or
+``BUJJI_TRACE_FILE``) if set, and are kept in memory otherwise.
+
+Run with ``python src/main.py --server`` or ``python src/server.py``.
+"""
+import argparse
+import asyncio
+import base64
+import concurrent.futures
+import contextvars
+import functools
+import io
+import json
+import os
+import time
+import uuid
+from typing import Dict, Iterable, Optional
+
+os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+
+import speech_recognition as sr
+
+import resources
+from conversation import Conversation, is_exit_command, EXIT_RESPONSE, ERROR_RESPONSE, NOT_HEARD_RESPONSE
+from recognition import RecognitionEngine, create_backend
+from tracing import tracer
+from user_manager import UserManager
+
+
+class Session:
+    """Conversation state and concurrency limit for one connected user"""
+
+    def __init__(self, session_id: str, username: str, conversation: Conversation,
+                 max_concurrent_turns: int):
+        self.session_id = session_id
+        self.username = username
+        self.conversation = conversation
+        self.turns = asyncio.Semaphore(max_concurrent_turns)
+        self.last_active = time.monotonic()
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+
+class SessionManager:
+    """Open, look up and evict sessions.
+
+    The embedding model, Chroma client, LLM client and speech cache are
+    shared through ``resources``; only the rolling conversation state is
+    kept per session.
+    """
+
+    def __init__(self, user_manager: UserManager, max_sessions: int = 500,
+                 idle_timeout: float = 900.0, max_concurrent_turns: int = 1,
+                 max_workers: int = 64, admins: Iterable[str] = (), trace_path: Optional[str] = None):
+        self.user_manager = user_manager
+        # Users allowed to read stats and switch tracing; the trace file is never client-chosen
+        self.admins = set(admins)
+        self.trace_path = trace_path
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_concurrent_turns = max_concurrent_turns
+        self.sessions: Dict[str, Session] = {}
+        # Blocking work (Chroma, Gemini, STT, TTS) runs on this pool
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="session"
+        )
+        # Shared by every session; sized so each session worker can be transcribing at once
+        self.recognition = RecognitionEngine(
+            create_backend(os.getenv('BUJJI_STT_BACKEND', 'google')), max_concurrent=max_workers
+        )
+
+    async def run_blocking(self, fn, *args):
+        # Carry the turn ID over to the worker thread
+        call = functools.partial(contextvars.copy_context().run, fn, *args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+
+    async def open(self, username: str, password: str) -> Session:
+        # bcrypt runs on the auth pool, so session workers are not held while it hashes
+        check = await self.run_blocking(self.user_manager.authenticate_async, username, password)
+        if not await asyncio.wrap_future(check):
+            raise PermissionError("Invalid username or password")
+        if len(self.sessions) >= self.max_sessions:
+            self.evict_idle(force_oldest=True)
+        context = await self.run_blocking(self.user_manager.get_user_context, username)
+        conversation = await self.run_blocking(
+            Conversation, context, None,
+            lambda summary: self.user_manager.update_context_summary(username, summary)
+        )
+        session = Session(uuid.uuid4().hex, username, conversation, self.max_concurrent_turns)
+        self.sessions[session.session_id] = session
+        print(f"Opened session {session.session_id} for {username} ({len(self.sessions)} active)")
+        return session
+
+    def get(self, session_id: str) -> Session:
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Unknown or expired session: {session_id}")
+        return session
+
+    def require_admin(self, session_id: Optional[str]) -> Session:
+        session = self.get(session_id or "")
+        if session.username not in self.admins:
+            raise PermissionError("This op needs an admin session")
+        return session
+
+    def close(self, session_id: str):
+        if self.sessions.pop(session_id, None) is not None:
+            print(f"Closed session {session_id} ({len(self.sessions)} active)")
+
+    def evict_idle(self, force_oldest: bool = False):
+        """Drop sessions idle for longer than the timeout"""
+        now = time.monotonic()
+        for session_id, session in list(self.sessions.items()):
+            if now - session.last_active > self.idle_timeout:
+                self.close(session_id)
+        if force_oldest and len(self.sessions) >= self.max_sessions:
+            oldest = min(self.sessions.values(), key=lambda s: s.last_active)
+            self.close(oldest.session_id)
+
+    async def evict_forever(self, interval: float = 30.0):
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+    async def turn(self, session: Session, text: Optional[str] = None,
+                   audio: Optional[bytes] = None, speak: bool = False) -> Dict:
+        """Run one conversation turn, at most ``max_concurrent_turns`` per session"""
+        async with session.turns:
+            session.touch()
+            result = {"turn": tracer.new_turn()}
+            if audio is not None:
+                text = await self.run_blocking(self._transcribe, audio)
+                result["transcript"] = text
+
+            if text and is_exit_command(text):
+                reply = EXIT_RESPONSE
+            else:
+                reply = await self.run_blocking(session.conversation.get_llm_response, text)
+                # Only answered turns are stored, as in the GUI; persisting commits
+                # a turn number and may block on a full write queue
+                if text and reply and reply not in (NOT_HEARD_RESPONSE, ERROR_RESPONSE):
+                    await self.run_blocking(self.user_manager.update_user_context, session.username, text, True)
+                    await self.run_blocking(self.user_manager.update_user_context, session.username, reply, False)
+            result["reply"] = reply
+
+            if speak:
+                mp3 = await self.run_blocking(resources.get_tts_cache().synthesize, reply)
+                result["audio"] = base64.b64encode(mp3).decode('ascii')
+            session.touch()
+            return result
+
+    def _transcribe(self, wav_bytes: bytes) -> Optional[str]:
+        with sr.AudioFile(io.BytesIO(wav_bytes)) as source:
+            audio = sr.Recognizer().record(source)
+        return self.recognition.recognize(audio)
+
+
+async def handle_request(manager: SessionManager, request: Dict) -> Dict:
+    op = request.get("op")
+    if op == "open":
+        session = await manager.open(request["username"], request["password"])
+        return {"session": session.session_id}
+    if op == "turn":
+        session = manager.get(request["session"])
+        audio = base64.b64decode(request["audio"]) if request.get("audio") else None
+        return await manager.turn(session, request.get("text"), audio, bool(request.get("speak")))
+    if op == "close":
+        manager.close(request["session"])
+        return {"closed": True}
+    if op == "trace":
+        manager.require_admin(request.get("session"))
+        if request.get("enabled"):
+            tracer.enable(manager.trace_path)
+        else:
+            tracer.disable()
+        return {"tracing": tracer.enabled}
+    if op == "stats":
+        manager.require_admin(request.get("session"))
+        return {"latency_ms": tracer.summary(), "sessions": len(manager.sessions),
+                "persistence": manager.user_manager.persistence_stats(),
+                "llm": resources.llm_stats(), "embeddings": resources.embedding_stats(),
+                "auth": manager.user_manager.auth.stats()}
+    raise ValueError(f"Unknown op: {op}")
+
+
+async def handle_connection(manager: SessionManager, reader, writer):
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            request = {}
+            try:
+                request = json.loads(line)
+                response = await handle_request(manager, request)
+            except Exception as e:
+                response = {"error": str(e)}
+            # Echo the client's request id so responses can be matched up
+            if isinstance(request, dict) and "id" in request:
+                response["id"] = request["id"]
+            writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b"\n")
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, unix_socket: Optional[str] = None,
+                **manager_options):
+    # One upstream LLM call per session worker unless configured otherwise
+    os.environ.setdefault('BUJJI_LLM_WORKERS', str(manager_options.get('max_workers', 64)))
+    user_manager = UserManager()
+    manager = SessionManager(user_manager, **manager_options)
+
+    # Warm the shared resources once instead of on the first session
+    await manager.run_blocking(resources.get_embeddings)
+    await manager.run_blocking(resources.get_llm)
+
+    def client(reader, writer):
+        return handle_connection(manager, reader, writer)
+
+    if unix_socket:
+        server = await asyncio.start_unix_server(client, path=unix_socket)
+        print(f"Bujji server listening on {unix_socket}")
+    else:
+        server = await asyncio.start_server(client, host, port)
+        print(f"Bujji server listening on {host}:{port}")
+
+    evictor = asyncio.create_task(manager.evict_forever())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        evictor.cancel()
+        user_manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless multi-session Bujji server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix-socket", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--max-sessions", type=int, default=500)
+    parser.add_argument("--idle-timeout", type=float, default=900.0, help="seconds before an idle session is evicted")
+    parser.add_argument("--turns-per-session", type=int, default=1, help="concurrent turns allowed per session")
+    parser.add_argument("--workers", type=int, default=64, help="threads for blocking work")
+    parser.add_argument("--admin", action="append",
+                        default=[name for name in os.getenv('BUJJI_ADMINS', '').split(',') if name],
+                        help="user allowed to use the trace and stats ops (repeatable)")
+    parser.add_argument("--trace-file", default=os.getenv('BUJJI_TRACE_FILE'),
+                        help="append traces here when the trace op enables them (default: memory only)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(
+            args.host, args.port, args.unix_socket,
+            max_sessions=args.max_sessions,
+            idle_timeout=args.idle_timeout,
+            max_concurrent_turns=args.turns_per_session,
+            max_workers=args.workers,
+            admins=args.admin,
+            trace_path=args.trace_file,
+        ))
+    except KeyboardInterrupt:
+        print("\nServer stopped")
+
+
+if __name__ == "__main__":
+    main()
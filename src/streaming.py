@@ -0,0 +1,156 @@
+import re
+import queue
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+
+from tracing import tracer
+
+# Sentence terminators used in Telugu and English replies. The danda forms
+# show up occasionally in Gemini's Telugu output.
+SENTENCE_END = re.compile(r'[.!?।॥]+["\'”’)\]]*(?=\s|$)')
+SOFT_BREAK = re.compile(r'[,;:،]\s')
+
+
+class SentenceChunker:
+    """Cut a stream of LLM tokens into speakable sentence chunks"""
+
+    def __init__(self, min_chars: int = 12, max_chars: int = 200):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.buffer = ""
+
+    def feed(self, token: str) -> List[str]:
+        """Add a token and return any chunks that are now complete"""
+        self.buffer += token
+        chunks = []
+        while True:
+            chunk = self._next_chunk()
+            if chunk is None:
+                break
+            chunks.append(chunk)
+        return chunks
+
+    def flush(self) -> List[str]:
+        """Return whatever is left once the stream has ended"""
+        rest = self.buffer.strip()
+        self.buffer = ""
+        return [rest] if rest else []
+
+    def _next_chunk(self) -> Optional[str]:
+        for match in SENTENCE_END.finditer(self.buffer):
+            if len(self.buffer[:match.end()].strip()) >= self.min_chars:
+                return self._cut(match.end())
+
+        # No sentence boundary yet; avoid starving TTS on very long sentences
+        if len(self.buffer) > self.max_chars:
+            cut = None
+            for match in SOFT_BREAK.finditer(self.buffer, 0, self.max_chars):
+                cut = match.end()
+            if cut is None:
+                cut = self.buffer.rfind(" ", 0, self.max_chars) + 1 or self.max_chars
+            return self._cut(cut)
+        return None
+
+    def _cut(self, end: int) -> str:
+        chunk, self.buffer = self.buffer[:end].strip(), self.buffer[end:]
+        return chunk
+
+
+class StreamingSpeaker:
+    """Synthesize sentence chunks while the reply is still being generated.
+
+    Chunks are converted to speech on a worker thread and handed to the
+    shared audio player as soon as they are ready, so the first sentence
+    starts playing while Gemini is still producing the rest of the answer.
+    Pass ``executor`` to run synthesis on a shared pool instead of a
+    dedicated thread.
+    """
+
+    def __init__(self, tts_cache, player, lang: str = 'te', executor=None):
+        self.tts_cache = tts_cache
+        self.player = player
+        self.lang = lang
+        self.text_queue = queue.Queue()
+        self.playbacks = []
+        self.stopped = threading.Event()
+        self.started_at = time.monotonic()
+        self.turn_id = tracer.current_turn()
+        if executor is not None:
+            self._synth_done = executor.submit(self._synthesize_loop)
+        else:
+            thread = threading.Thread(target=self._synthesize_loop, daemon=True)
+            thread.start()
+            self._synth_done = thread
+
+    @property
+    def time_to_first_audio(self) -> Optional[float]:
+        """Seconds from the start of the turn until the first chunk played"""
+        if not self.playbacks or not self.playbacks[0].started.is_set():
+            return None
+        return self.playbacks[0].started_at - self.started_at
+
+    def add(self, chunk: str):
+        """Queue a chunk of text for synthesis"""
+        if chunk and not self.stopped.is_set():
+            self.text_queue.put(chunk)
+
+    def finish(self):
+        """Signal that no more chunks will be added"""
+        self.text_queue.put(None)
+
+    def wait(self):
+        """Block until every queued chunk has been played (or stopped)"""
+        if isinstance(self._synth_done, threading.Thread):
+            self._synth_done.join()
+        else:
+            self._synth_done.result()
+        for playback in self.playbacks:
+            playback.wait()
+
+    def stop(self):
+        """Stop playback immediately and drop pending chunks"""
+        self.stopped.set()
+        self.text_queue.put(None)
+        self.player.stop()
+
+    def _synthesize_loop(self):
+        with tracer.bind(self.turn_id):
+            self._synthesize_chunks()
+
+    def _synthesize_chunks(self):
+        while True:
+            chunk = self.text_queue.get()
+            if chunk is None or self.stopped.is_set():
+                break
+            try:
+                audio = self.tts_cache.synthesize(chunk, lang=self.lang)
+                if not self.stopped.is_set():
+                    self.playbacks.append(self.player.play(audio))
+            except Exception as e:
+                print(f"Error synthesizing chunk: {e}")
+
+
+def speak_stream(pieces: Iterable[str], speaker: StreamingSpeaker,
+                 on_text: Optional[Callable[[str], None]] = None) -> str:
+    """Feed streamed LLM pieces to the speaker sentence by sentence.
+
+    Returns the full text once generation is done; playback may still be
+    running, use ``speaker.wait()`` to block until it finishes.
+    """
+    chunker = SentenceChunker()
+    parts = []
+    try:
+        for piece in pieces:
+            parts.append(piece)
+            if on_text:
+                on_text(piece)
+            for chunk in chunker.feed(piece):
+                speaker.add(chunk)
+            if speaker.stopped.is_set():
+                break
+        for chunk in chunker.flush():
+            speaker.add(chunk)
+    finally:
+        speaker.finish()
+    return "".join(parts)
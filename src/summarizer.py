@@ -0,0 +1,77 @@
+import concurrent.futures
+import threading
+from typing import Callable, List, Optional
+
+from langchain.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+
+from memory import count_tokens
+from tracing import tracer
+
+# Summaries are folded in off the response path, a couple at a time
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="summarizer")
+
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You maintain a compact running summary of a conversation between a user and "
+               "Bujji, a Telugu speaking chatbot. Keep names, preferences, facts about the user "
+               "and open topics. Write the summary in Telugu, in at most {max_words} words."),
+    ("user", "Current summary:\n{summary}\n\nNew turns to fold in:\n{turns}\n\nUpdated summary:")
+])
+
+
+def history_tokens(messages) -> int:
+    return sum(count_tokens(message.content) for message in messages)
+
+
+class RollingSummarizer:
+    """Fold the oldest chat turns into a running summary once history gets long.
+
+    When the rolling history goes over ``token_threshold`` tokens, everything
+    but the most recent ``keep_recent`` messages is summarized together with
+    the previous summary on a background thread. The folded messages are then
+    dropped from the history and ``on_summary`` is called so the summary can
+    be persisted.
+    """
+
+    def __init__(self, llm, token_threshold: int = 1200, keep_recent: int = 4,
+                 max_words: int = 120, on_summary: Optional[Callable[[str], None]] = None):
+        self.chain = SUMMARY_PROMPT | llm | StrOutputParser()
+        self.token_threshold = token_threshold
+        self.keep_recent = keep_recent
+        self.max_words = max_words
+        self.on_summary = on_summary
+        self._running = threading.Lock()
+
+    def maybe_summarize(self, conversation) -> bool:
+        """Start folding old turns if the history is over budget"""
+        if len(conversation.chat_history) <= self.keep_recent:
+            return False
+        if history_tokens(conversation.chat_history) <= self.token_threshold:
+            return False
+        if not self._running.acquire(blocking=False):
+            return False  # a summary is already being built
+        folded = conversation.chat_history[:-self.keep_recent]
+        _executor.submit(self._summarize, conversation, folded)
+        return True
+
+    def _summarize(self, conversation, folded: List):
+        try:
+            with tracer.span("summarize", messages=len(folded)):
+                turns = "\n".join(
+                    f"{'Bujji' if message.type == 'ai' else 'User'}: {message.content}"
+                    for message in folded
+                )
+                summary = self.chain.invoke({
+                    "summary": conversation.summary or "(none yet)",
+                    "turns": turns,
+                    "max_words": self.max_words,
+                }).strip()
+            if not summary:
+                return
+            conversation.apply_summary(summary, folded)
+            if self.on_summary:
+                self.on_summary(summary)
+        except Exception as e:
+            print(f"Error summarizing conversation: {e}")
+        finally:
+            self._running.release()
@@ -0,0 +1,159 @@
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+_current_turn = contextvars.ContextVar("bujji_turn", default=None)
+
+
+class _NoopSpan:
+    """Returned by ``Tracer.span`` while tracing is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name, turn_id, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.turn_id = turn_id
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer.record(self.name, time.perf_counter() - self.start,
+                           turn_id=self.turn_id, wall_start=self.wall_start, **self.attrs)
+        return False
+
+    def set(self, **attrs):
+        """Attach attributes discovered while the span is open"""
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    """Per-stage latency spans for voice turns.
+
+    Spans carry the ID of the turn they belong to and are written as JSON
+    lines and folded into in-process latency histograms. While disabled,
+    ``span`` returns a shared no-op object so instrumented code pays only
+    for one attribute check.
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        self.enabled = False
+        self.max_samples = max_samples
+        self.samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.max_samples))
+        self._export = None
+        self._lock = threading.Lock()
+        self._turn_ids = itertools.count(1)
+
+    def enable(self, export_path: Optional[str] = None):
+        """Start recording; spans are appended to ``export_path`` if given"""
+        with self._lock:
+            if self._export is not None:
+                self._export.close()
+            self._export = open(export_path, "a", encoding="utf-8") if export_path else None
+            self.enabled = True
+
+    def disable(self):
+        with self._lock:
+            self.enabled = False
+            if self._export is not None:
+                self._export.close()
+                self._export = None
+
+    def new_turn(self) -> str:
+        """Start a new turn in the current context and return its ID"""
+        turn_id = f"{os.getpid()}-{next(self._turn_ids)}"
+        _current_turn.set(turn_id)
+        return turn_id
+
+    @staticmethod
+    def current_turn() -> Optional[str]:
+        return _current_turn.get()
+
+    @contextmanager
+    def bind(self, turn_id: Optional[str]):
+        """Attribute spans on this thread to ``turn_id``"""
+        token = _current_turn.set(turn_id)
+        try:
+            yield
+        finally:
+            _current_turn.reset(token)
+
+    def span(self, name: str, turn_id: Optional[str] = None, **attrs):
+        """Time a block of code as one stage of the current turn"""
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name, turn_id or _current_turn.get(), attrs)
+
+    def record(self, name: str, duration: float, turn_id: Optional[str] = None,
+               wall_start: Optional[float] = None, **attrs):
+        """Record a stage that was timed elsewhere (e.g. on the player thread)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.samples[name].append(duration)
+            if self._export is not None:
+                event = {
+                    "turn": turn_id or _current_turn.get(),
+                    "span": name,
+                    "start": wall_start if wall_start is not None else time.time() - duration,
+                    "duration_ms": round(duration * 1000, 3),
+                }
+                event.update(attrs)
+                self._export.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+                self._export.flush()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count and p50/p95/p99/max latency in milliseconds per span name"""
+        with self._lock:
+            snapshot = {name: sorted(values) for name, values in self.samples.items() if values}
+        result = {}
+        for name, values in snapshot.items():
+            def pct(p):
+                return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))] * 1000
+            result[name] = {
+                "count": len(values),
+                "p50": pct(50),
+                "p95": pct(95),
+                "p99": pct(99),
+                "max": values[-1] * 1000,
+            }
+        return result
+
+    def format_summary(self) -> str:
+        """Latency table (milliseconds) for printing"""
+        lines = [f"{'stage':<20}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"]
+        for name, stats in sorted(self.summary().items()):
+            lines.append(f"{name:<20}{stats['count']:>7}{stats['p50']:>10.1f}{stats['p95']:>10.1f}"
+                         f"{stats['p99']:>10.1f}{stats['max']:>10.1f}")
+        return "\n".join(lines)
+
+
+tracer = Tracer()
+
+# BUJJI_TRACE=1 records in memory only; any other value is a JSONL export path
+if os.getenv('BUJJI_TRACE'):
+    tracer.enable(None if os.getenv('BUJJI_TRACE') == '1' else os.getenv('BUJJI_TRACE'))
@@ -0,0 +1,155 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from gtts import gTTS
+
+from tracing import tracer
+
+
+class TTSCache:
+    """Content-addressed cache of synthesized speech.
+
+    Audio is keyed by (text, lang, voice) and kept in a small in-memory LRU
+    in front of a size-bounded directory of MP3 files, so fixed phrases
+    such as greetings and the exit reply are only synthesized once.
+    """
+
+    def __init__(self, cache_dir: str, max_disk_bytes: int = 50 * 1024 * 1024,
+                 max_memory_bytes: int = 8 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_disk_index()
+
+    def _load_disk_index(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".mp3"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        # Least recently used first
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    @staticmethod
+    def key(text: str, lang: str = 'te', voice: str = 'com') -> str:
+        return hashlib.sha256(f"{lang}\0{voice}\0{text}".encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_bytes,
+        }
+
+    def get(self, text: str, lang: str = 'te', voice: str = 'com') -> Optional[bytes]:
+        """Cached audio for the text, or None"""
+        key = self.key(text, lang, voice)
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                return audio
+            if key not in self._disk:
+                return None
+            self._disk.move_to_end(key)
+        try:
+            with open(self._path(key), 'rb') as f:
+                audio = f.read()
+            os.utime(self._path(key))
+        except OSError:
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+            return None
+        with self._lock:
+            self._remember(key, audio)
+        return audio
+
+    def synthesize(self, text: str, lang: str = 'te', voice: str = 'com') -> bytes:
+        """Return MP3 audio for the text, synthesizing it only on a cache miss"""
+        with tracer.span("tts", chars=len(text)) as span:
+            audio = self.get(text, lang, voice)
+            if audio is not None:
+                self.hits += 1
+                span.set(cache="hit")
+                return audio
+            self.misses += 1
+            span.set(cache="miss")
+            audio = self._render(text, lang, voice)
+            self.put(text, audio, lang, voice)
+            return audio
+
+    def put(self, text: str, audio: bytes, lang: str = 'te', voice: str = 'com'):
+        key = self.key(text, lang, voice)
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._remember(key, audio)
+            self._disk_bytes += len(audio) - self._disk.pop(key, 0)
+            self._disk[key] = len(audio)
+            self._evict_disk()
+
+    def _remember(self, key: str, audio: bytes):
+        if len(audio) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass  # still open for playback; re-indexed on next start
+
+    def warm_up(self, phrases: Iterable[str], lang: str = 'te', voice: str = 'com') -> threading.Thread:
+        """Pre-synthesize fixed phrases in the background"""
+        def run():
+            for phrase in phrases:
+                try:
+                    if self.get(phrase, lang, voice) is None:
+                        self.put(phrase, self._render(phrase, lang, voice), lang, voice)
+                except Exception as e:
+                    print(f"Error warming up speech cache: {e}")
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _render(text: str, lang: str, voice: str) -> bytes:
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang, tld=voice).write_to_fp(buffer)
+        return buffer.getvalue()
@@ -0,0 +1,102 @@
+import threading
+import tkinter as tk
+from typing import Callable, Dict, List, Tuple
+
+
+class TranscriptView:
+    """Append-only chat transcript that keeps at most ``max_lines`` lines.
+
+    Older lines are trimmed from the top as new text arrives, so the Text
+    widget stays small however long the session runs; the full history
+    remains in the user's stored conversation.
+    """
+
+    def __init__(self, text: tk.Text, max_lines: int = 400):
+        self.text = text
+        self.max_lines = max_lines
+        self.trimmed_lines = 0
+
+    def append(self, content: str):
+        # Only follow the end if the user has not scrolled up to read
+        at_bottom = self.text.yview()[1] >= 0.999
+        self.text.config(state=tk.NORMAL)
+        self.text.insert(tk.END, content)
+        self._trim()
+        self.text.config(state=tk.DISABLED)
+        if at_bottom:
+            self.text.see(tk.END)
+
+    def clear(self):
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.config(state=tk.DISABLED)
+
+    def _trim(self):
+        lines = int(self.text.index("end-1c").split(".")[0])
+        excess = lines - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self.trimmed_lines += excess
+
+
+class UIUpdateQueue:
+    """Marshal widget updates from worker threads onto the Tk main loop.
+
+    Workers call ``append``, ``config`` and ``post`` from any thread; the
+    main loop drains everything every ``interval_ms``. Transcript appends
+    made between drains become a single insert, and repeated ``config``
+    calls on a widget collapse to the latest options, so token-by-token
+    streaming costs one redraw per interval.
+    """
+
+    def __init__(self, root: tk.Misc, transcript: TranscriptView, interval_ms: int = 50):
+        self.root = root
+        self.transcript = transcript
+        self.interval_ms = interval_ms
+        self._lock = threading.Lock()
+        self._ops: List[Tuple[str, object]] = []
+        self._config: Dict[tk.Misc, Dict] = {}
+        self._closed = False
+        self.root.after(self.interval_ms, self._drain)
+
+    def append(self, content: str):
+        """Add text to the end of the transcript"""
+        with self._lock:
+            if self._ops and self._ops[-1][0] == "append":
+                self._ops[-1] = ("append", self._ops[-1][1] + content)
+            else:
+                self._ops.append(("append", content))
+
+    def config(self, widget: tk.Misc, **options):
+        """Configure a widget; only the latest value of each option is applied"""
+        with self._lock:
+            self._config.setdefault(widget, {}).update(options)
+
+    def post(self, fn: Callable, *args):
+        """Run ``fn(*args)`` on the main loop, in order with appends"""
+        with self._lock:
+            self._ops.append(("call", (fn, args)))
+
+    def close(self):
+        self._closed = True
+
+    def _drain(self):
+        if self._closed:
+            return
+        with self._lock:
+            ops, self._ops = self._ops, []
+            configs, self._config = self._config, {}
+        try:
+            for kind, payload in ops:
+                if kind == "append":
+                    self.transcript.append(payload)
+                else:
+                    fn, args = payload
+                    fn(*args)
+            for widget, options in configs.items():
+                widget.config(**options)
+        except tk.TclError:
+            return  # window destroyed
+        except Exception as e:
+            print(f"Error updating UI: {e}")
+        self.root.after(self.interval_ms, self._drain)
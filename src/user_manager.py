@@ -1,110 +1,169 @@
+import concurrent.futures
 import os
-import bcrypt
-import json
+import threading
 import time
 from typing import Optional, Dict
-from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_core.documents import Document
-from langchain_core.messages import HumanMessage, AIMessage
-import chromadb
+# LangChain and Chroma are imported where they are used, so creating a
+# UserManager (and logging in) does not pay for them
+import resources
+from persistence import ContextWriter, turn_id
+from tracing import tracer
+from user_store import UserStore
+
+# All users' turns live in one collection, partitioned by "username" metadata
+CONTEXT_COLLECTION = "conversations"
 
 class UserManager:
     def __init__(self, data_dir: str = "user_data"):
         self.data_dir = data_dir
+        # Per-user JSON profiles from before the user store; see migrate_store.py
         self.users_dir = os.path.join(data_dir, "users")
         self.chroma_dir = os.path.join(data_dir, "chroma")
         self.ensure_directories()
-        
-        # Initialize embeddings
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
+        # Persist turns from a background queue instead of on the response path
+        self.write_behind = os.getenv('BUJJI_WRITE_BEHIND', '1') != '0'
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._collection = None
+        # Credentials, profiles and per-user turn counters
+        self.store = UserStore(os.path.join(data_dir, "users.sqlite3"))
+        # Cached user index and bcrypt pool, shared by every UserManager on this store
+        self.auth = resources.get_auth_service(self.store.db_path)
+
+    @property
+    def embeddings(self):
+        """Embedding model shared by all UserManager instances, loaded lazily"""
+        return resources.get_embeddings()
+
+    @property
+    def chroma_client(self):
+        """Chroma client shared by all UserManager instances"""
+        return resources.get_chroma_client(self.chroma_dir)
+
+    @property
+    def collection(self):
+        """Shared Chroma collection holding every user's turns"""
+        if self._collection is None:
+            self._collection = self.chroma_client.get_or_create_collection(name=CONTEXT_COLLECTION)
+        return self._collection
+
+    def vectorstore(self):
+        """LangChain view of the shared collection; filter searches by username"""
+        from langchain_chroma import Chroma
+        return Chroma(
+            collection_name=CONTEXT_COLLECTION,
+            embedding_function=self.embeddings,
+            client=self.chroma_client
         )
-        
-        # Initialize ChromaDB client
-        self.chroma_client = chromadb.PersistentClient(path=self.chroma_dir)
+
+    def preload(self):
+        """Start loading the embedding model and Chroma client in the background"""
+        return resources.preload_in_background(self.chroma_dir)
+
+    @property
+    def writer(self) -> ContextWriter:
+        """Background writer for conversation turns, started on first use"""
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = ContextWriter(
+                        get_embeddings=lambda: self.embeddings,
+                        get_collection=lambda username: self.collection
+                    )
+        return self._writer
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued interactions to be written"""
+        if self._writer is None:
+            return True
+        return self._writer.flush(timeout)
+
+    def close(self):
+        """Flush queued interactions and stop the background writer (e.g. on logout)"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def persistence_stats(self) -> Dict:
+        """Queue depth and batch sizes of the background writer"""
+        if self._writer is None:
+            return {"queue_depth": 0, "written": 0, "failed": 0, "retried": 0, "batches": 0,
+                    "avg_batch_size": 0.0, "max_batch_size": 0}
+        return self._writer.stats()
 
     def ensure_directories(self):
         """Create necessary directories if they don't exist"""
         os.makedirs(self.data_dir, exist_ok=True)
-        os.makedirs(self.users_dir, exist_ok=True)
         os.makedirs(self.chroma_dir, exist_ok=True)
 
     def create_user(self, username: str, password: str) -> bool:
         """Create a new user with hashed password"""
-        user_path = os.path.join(self.users_dir, f"{username}.json")
-        if os.path.exists(user_path):
-            return False
+        return self.create_user_async(username, password).result()
 
-        # Hash the password
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+    def create_user_async(self, username: str, password: str) -> concurrent.futures.Future:
+        """Hash the password on the auth pool; the future is False if the name is taken.
 
-        # Initialize vector store for user
-        vectorstore = Chroma(
-            collection_name=f"{username}_context",
-            embedding_function=self.embeddings,
-            client=self.chroma_client
-        )
-        
-        # Store user data
-        user_data = {
-            "username": username,
-            "password_hash": hashed.decode('utf-8'),
-            "context_summary": "New user profile"
-        }
+        Turns go to the shared collection, which is only opened on the
+        first write, so there is nothing to create per user.
+        """
+        return self.auth.submit(self._create_user, username, password)
 
-        with open(user_path, 'w') as f:
-            json.dump(user_data, f)
-
-        return True
+    def _create_user(self, username: str, password: str) -> bool:
+        if self._legacy_profile(username):
+            return False
+        return self.auth.create(username, password)
 
     def authenticate(self, username: str, password: str) -> bool:
         """Authenticate a user"""
-        user_path = os.path.join(self.users_dir, f"{username}.json")
-        if not os.path.exists(user_path):
-            return False
+        return self.authenticate_async(username, password).result()
 
-        with open(user_path, 'r') as f:
-            user_data = json.load(f)
+    def authenticate_async(self, username: str, password: str) -> concurrent.futures.Future:
+        """Check credentials on the auth pool; the future resolves to True or False.
 
-        return bcrypt.checkpw(
-            password.encode('utf-8'),
-            user_data['password_hash'].encode('utf-8')
-        )
+        Nothing runs on the calling thread, so the Tk loop never waits on
+        the user index, the legacy profile check or bcrypt.
+        """
+        return self.auth.submit(self._authenticate, username, password)
+
+    def _authenticate(self, username: str, password: str) -> bool:
+        if not self.auth.has_user(username) and self._legacy_profile(username):
+            # Account from before the user store; move it over on first login
+            from migrate_store import migrate_user
+            migrate_user(self, username)
+        return self.auth.check(username, password)
+
+    def _legacy_profile(self, username: str) -> Optional[str]:
+        path = os.path.join(self.users_dir, f"{username}.json")
+        return path if os.path.exists(path) else None
+
+    def get_context_summary(self, username: str) -> str:
+        """Running conversation summary stored in the user's profile"""
+        summary = self.store.context_summary(username)
+        # Placeholder written for accounts created before summaries existed
+        return "" if summary == "New user profile" else summary
+
+    def update_context_summary(self, username: str, summary: str):
+        """Persist the running conversation summary for a user"""
+        try:
+            self.store.set_context_summary(username, summary)
+        except Exception as e:
+            print(f"Error saving conversation summary: {e}")
 
     def get_user_context(self, username: str) -> Optional[Dict]:
         """Get user's conversation history using LangChain's vector store"""
+        # Make sure queued turns are visible before reading them back
+        self.flush()
+        from langchain_core.messages import HumanMessage, AIMessage
         try:
             # Load vector store
-            vectorstore = Chroma(
-                collection_name=f"{username}_context",
-                embedding_function=self.embeddings,
-                client=self.chroma_client
-            )
+            vectorstore = self.vectorstore()
             
-            # Get chronological conversations using metadata filter
-            collection = self.chroma_client.get_collection(name=f"{username}_context")
-            
-            # Get all documents and sort by timestamp
-            results = collection.get(
-                include=['metadatas', 'documents']
-            )
-            
-            # Convert to Document objects and sort by timestamp
-            docs = []
-            if results and results['documents']:
-                for doc, metadata in zip(results['documents'], results['metadatas']):
-                    docs.append(Document(
-                        page_content=doc,
-                        metadata=metadata
-                    ))
-                # Sort by timestamp
-                docs.sort(key=lambda x: x.metadata.get('timestamp', 0))
+            # Only the tail of the history is loaded, by turn id
+            docs = self.get_recent_turns(username)
             
             # Format conversation history with proper message types
             history = []
-            for doc in docs[-10:]:  # Get last 10 conversations
+            for doc in docs:  # Last 10 conversations
                 if doc.metadata.get("type") == "human":
                     history.append(HumanMessage(content=doc.page_content))
                 elif doc.metadata.get("type") == "ai":
@@ -115,45 +174,120 @@ class UserManager:
             return {
                 "history": [msg.content for msg in history],
                 "messages": history,
+                "username": username,
+                "summary": self.get_context_summary(username),
                 "session_start": time.time(),
                 "vectorstore": vectorstore
             }
             
         except Exception as e:
             print(f"Creating new context for user {username}")
-            vectorstore = Chroma(
-                collection_name=f"{username}_context",
-                embedding_function=self.embeddings,
-                client=self.chroma_client
-            )
+            vectorstore = self.vectorstore()
             return {
                 "history": [],
                 "messages": [],
+                "username": username,
+                "summary": self.get_context_summary(username),
                 "session_start": time.time(),
                 "vectorstore": vectorstore
             }
 
+    def get_recent_turns(self, username: str, limit: int = 10, collection=None) -> list:
+        """Return the last ``limit`` turns of a user in chronological order.
+
+        Turns are stored under ``turn_id(username, turn)``, so the tail is
+        fetched by id and the cost depends on ``limit`` rather than on the
+        size of the collection.
+        """
+        if collection is None:
+            collection = self.collection
+
+        last_turn = self.store.last_turn(username)
+        if last_turn is None:
+            last_turn = self._backfill_turns(username, collection)
+        if not last_turn:
+            return []
+
+        from langchain_core.documents import Document
+        first = max(1, last_turn - limit + 1)
+        results = collection.get(
+            ids=[turn_id(username, turn) for turn in range(first, last_turn + 1)],
+            include=['metadatas', 'documents']
+        )
+        docs = [
+            Document(page_content=doc, metadata=metadata)
+            for doc, metadata in zip(results['documents'], results['metadatas'])
+        ]
+        docs.sort(key=lambda x: x.metadata['turn'])
+        return docs[-limit:]
+
+    def renumber_turns(self, username: str) -> int:
+        """Renumber a user's stored turns 1..N by timestamp (e.g. after pruning)"""
+        return self._backfill_turns(username, self.collection)
+
+    def _backfill_turns(self, username: str, collection) -> int:
+        """Number a user's turns 1..N by timestamp and store each under its turn id.
+
+        Needed after turns are pruned or imported. This is the only
+        history path that scans the collection.
+        """
+        results = collection.get(where={"username": username}, include=['metadatas', 'documents', 'embeddings'])
+        rows = sorted(
+            zip(results['ids'], results['documents'], results['metadatas'], results['embeddings']),
+            key=lambda row: row[2].get('timestamp', 0)
+        )
+        stale, changed = [], []
+        for turn, (doc_id, document, metadata, embedding) in enumerate(rows, start=1):
+            new_id = turn_id(username, turn)
+            if doc_id != new_id:
+                stale.append(doc_id)
+            if doc_id != new_id or metadata.get('turn') != turn:
+                changed.append((new_id, document, dict(metadata, turn=turn), embedding))
+        # Old ids that are not reused go first, so no turn is left under two ids
+        stale = sorted(set(stale) - {turn_id(username, turn) for turn in range(1, len(rows) + 1)})
+        # Chroma limits the size of a single write
+        for start in range(0, len(stale), 5000):
+            collection.delete(ids=stale[start:start + 5000])
+        for start in range(0, len(changed), 5000):
+            chunk = changed[start:start + 5000]
+            collection.upsert(
+                ids=[row[0] for row in chunk],
+                documents=[row[1] for row in chunk],
+                metadatas=[row[2] for row in chunk],
+                embeddings=[row[3] for row in chunk],
+            )
+        self.store.set_last_turn(username, len(rows))
+        if changed:
+            print(f"Indexed {len(rows)} existing turns for user {username}")
+        return len(rows)
+
     def update_user_context(self, username: str, interaction: str, is_human: bool = True):
         """Update user's conversation history using LangChain's vector store"""
+        metadata = {
+            "timestamp": time.time(),
+            "type": "human" if is_human else "ai",
+            "username": username,
+            "turn": self.store.next_turn(username)
+        }
+        if self.write_behind:
+            try:
+                self.writer.put(username, interaction, metadata)
+                return
+            except Exception as e:
+                print(f"Error queueing interaction, writing directly: {e}")
         try:
             # Load or create vector store
-            vectorstore = Chroma(
-                collection_name=f"{username}_context",
-                embedding_function=self.embeddings,
-                client=self.chroma_client
-            )
+            vectorstore = self.vectorstore()
             
             # Add new interaction
+            from langchain_core.documents import Document
             document = Document(
                 page_content=interaction,
-                metadata={
-                    "timestamp": time.time(),
-                    "type": "human" if is_human else "ai",
-                    "username": username
-                }
+                metadata=metadata
             )
             
-            vectorstore.add_documents([document])
+            with tracer.span("persist", batch_size=1):
+                vectorstore.add_documents([document], ids=[turn_id(username, metadata["turn"])])
             # No need to call persist() as PersistentClient handles persistence automatically
             print(f"Successfully added interaction to {username}'s context")
             
@@ -0,0 +1,147 @@
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, Optional, Tuple
+
+
+class UserStore:
+    """Credentials, profile and turn counters for every user in one SQLite table.
+
+    Replaces the per-user JSON files: lookups are a primary-key read no
+    matter how many accounts exist. ``last_turn`` numbers each user's
+    stored interactions so the last N turns can be fetched by their
+    ``username:turn`` ids; NULL means the user has no turns numbered yet.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "username TEXT PRIMARY KEY, "
+                "password_hash TEXT NOT NULL, "
+                "context_summary TEXT NOT NULL DEFAULT '', "
+                "created_at REAL NOT NULL, "
+                "last_turn INTEGER)"
+            )
+            # Bumped by every account insert, delete or password change, from any
+            # connection, so caches of credentials know when to reload
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('accounts_version', 0)")
+            for name, event in (("insert", "INSERT"), ("delete", "DELETE"),
+                                ("password", "UPDATE OF password_hash")):
+                self._conn.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS accounts_{name} AFTER {event} ON users BEGIN "
+                    "UPDATE meta SET value = value + 1 WHERE key = 'accounts_version'; END"
+                )
+
+    def create(self, username: str, password_hash: str, context_summary: str = "",
+               created_at: Optional[float] = None, last_turn: Optional[int] = None) -> bool:
+        """Add a user; returns False if the username is taken"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO users (username, password_hash, context_summary, created_at, last_turn) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (username, password_hash, context_summary, created_at or time.time(), last_turn)
+            )
+        return cursor.rowcount == 1
+
+    def create_many(self, rows: Iterable[Tuple[str, str, str, float, Optional[int]]]) -> int:
+        """Bulk insert (username, password_hash, context_summary, created_at, last_turn) rows"""
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO users (username, password_hash, context_summary, created_at, last_turn) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        return cursor.rowcount
+
+    def set_password_hash(self, username: str, password_hash: str):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE users SET password_hash = ? WHERE username = ?", (password_hash, username))
+
+    def accounts_version(self) -> int:
+        """Counter that changes whenever an account is added or removed or a password changes"""
+        with self._lock:
+            return self._conn.execute("SELECT value FROM meta WHERE key = 'accounts_version'").fetchone()[0]
+
+    def exists(self, username: str) -> bool:
+        return self._get(username, "1") is not None
+
+    def password_hash(self, username: str) -> Optional[str]:
+        return self._get(username, "password_hash")
+
+    def context_summary(self, username: str) -> str:
+        return self._get(username, "context_summary") or ""
+
+    def set_context_summary(self, username: str, summary: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE users SET context_summary = ? WHERE username = ?", (summary, username)
+            )
+
+    def last_turn(self, username: str) -> Optional[int]:
+        """Latest turn number for a user, or None if never indexed"""
+        return self._get(username, "last_turn")
+
+    def next_turn(self, username: str) -> int:
+        """Reserve and return the next turn number for a user"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE users SET last_turn = COALESCE(last_turn, 0) + 1 WHERE username = ?", (username,)
+            )
+            if cursor.rowcount == 0:
+                raise KeyError(f"Unknown user {username}")
+            return self._conn.execute(
+                "SELECT last_turn FROM users WHERE username = ?", (username,)
+            ).fetchone()[0]
+
+    def set_last_turn(self, username: str, turn: int):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE users SET last_turn = ? WHERE username = ?", (turn, username))
+
+    def account(self, username: str) -> Optional[Tuple[str, str, str, float, Optional[int]]]:
+        """(username, password_hash, context_summary, created_at, last_turn) for one user, or None"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT username, password_hash, context_summary, created_at, last_turn FROM users "
+                "WHERE username = ?", (username,)
+            ).fetchone()
+
+    def accounts(self, batch: int = 1000) -> Iterator[Tuple[str, str, str, float, Optional[int]]]:
+        """Yield (username, password_hash, context_summary, created_at, last_turn) for every user"""
+        after = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT username, password_hash, context_summary, created_at, last_turn FROM users "
+                    "WHERE username > ? ORDER BY username LIMIT ?", (after, batch)
+                ).fetchall()
+            if not rows:
+                return
+            yield from rows
+            after = rows[-1][0]
+
+    def usernames(self) -> Iterator[str]:
+        for row in self.accounts():
+            yield row[0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _get(self, username: str, column: str):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {column} FROM users WHERE username = ?", (username,)
+            ).fetchone()
+        return row[0] if row else None
@@ -0,0 +1,27 @@
+import math
+import os
+import struct
+import sys
+import wave
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+@pytest.fixture
+def make_wav(tmp_path):
+    """Write a 16 kHz mono WAV from (seconds, amplitude) segments of a 200 Hz tone"""
+    def make(segments, name="fixture.wav", rate=16000):
+        samples = []
+        for seconds, amplitude in segments:
+            for _ in range(int(seconds * rate)):
+                samples.append(int(amplitude * math.sin(2 * math.pi * 200 * len(samples) / rate)))
+        path = str(tmp_path / name)
+        with wave.open(path, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(rate)
+            wav.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+        return path
+    return make
@@ -0,0 +1,88 @@
+import bcrypt
+import pytest
+
+from auth_service import AuthService, _cost
+from user_store import UserStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "users.sqlite3")
+
+
+@pytest.fixture
+def auth(db_path):
+    service = AuthService(UserStore(db_path), rounds=4, workers=2, cache_ttl=60)
+    yield service
+    service.shutdown()
+
+
+def test_login_checks_the_password(auth):
+    assert auth.create("ravi", "secret")
+    assert auth.check("ravi", "secret")
+    assert not auth.check("ravi", "wrong")
+    assert not auth.check("nobody", "secret")
+    assert auth.stats()["failed"] == 2
+
+
+def test_username_can_only_be_taken_once(auth):
+    assert auth.create("ravi", "secret")
+    assert not auth.create("ravi", "other")
+    assert auth.check("ravi", "secret")
+
+
+def test_repeat_login_skips_bcrypt(auth):
+    auth.create("ravi", "secret")
+    assert auth.check("ravi", "secret") and auth.check("ravi", "secret")
+    stats = auth.stats()
+    assert stats["bcrypt_checks"] == 1
+    assert stats["cache_hits"] == 1
+
+
+def test_wrong_password_is_never_cached(auth):
+    auth.create("ravi", "secret")
+    auth.check("ravi", "secret")
+    assert not auth.check("ravi", "wrong")
+    assert auth.stats()["bcrypt_checks"] == 2
+
+
+def test_password_change_elsewhere_invalidates_the_cache(auth, db_path):
+    auth.create("ravi", "secret")
+    assert auth.check("ravi", "secret")
+
+    other = UserStore(db_path)
+    other.set_password_hash("ravi", bcrypt.hashpw(b"changed", bcrypt.gensalt(rounds=4)).decode('utf-8'))
+    other.close()
+
+    assert not auth.check("ravi", "secret")
+    assert auth.check("ravi", "changed")
+
+
+def test_account_created_elsewhere_is_visible(auth, db_path):
+    assert not auth.has_user("sita")
+    other = UserStore(db_path)
+    other.create("sita", bcrypt.hashpw(b"pw", bcrypt.gensalt(rounds=4)).decode('utf-8'))
+    other.close()
+
+    assert auth.has_user("sita")
+    assert auth.check("sita", "pw")
+
+
+def test_weaker_hash_is_upgraded_on_login(db_path):
+    store = UserStore(db_path)
+    store.create("ravi", bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=4)).decode('utf-8'))
+    auth = AuthService(store, rounds=5, workers=1, cache_ttl=60)
+    try:
+        assert auth.check("ravi", "secret")
+        assert _cost(store.password_hash("ravi")) == 5
+        assert auth.stats()["rehashed"] == 1
+        assert auth.check("ravi", "secret")
+        assert auth.stats()["bcrypt_checks"] == 1
+    finally:
+        auth.shutdown()
+
+
+def test_verify_and_register_run_on_the_pool(auth):
+    assert auth.register("ravi", "secret").result(timeout=10)
+    assert auth.verify("ravi", "secret").result(timeout=10)
+    assert not auth.verify("ravi", "wrong").result(timeout=10)
@@ -0,0 +1,67 @@
+from capture import FRAME_MS, SAMPLE_WIDTH, EnergyVAD, StreamingCapture, WavSource
+
+SILENCE = 0
+VOICE = 4000
+
+
+def capture_from(path, **options):
+    pulled = []
+    source = WavSource(path, on_frame=pulled.append)
+    capture = StreamingCapture(source, vad=EnergyVAD(webrtc_mode=None), **options)
+    return capture, pulled
+
+
+def seconds(audio):
+    return len(audio.get_raw_data()) / SAMPLE_WIDTH / audio.sample_rate
+
+
+def test_utterance_ends_shortly_after_speech(make_wav):
+    path = make_wav([(0.6, SILENCE), (1.0, VOICE), (3.0, SILENCE)])
+    capture, pulled = capture_from(path, end_silence_ms=500)
+    utterance = capture.capture()
+
+    assert utterance is not None
+    # Preroll before the onset plus a short tail after it, not the trailing silence
+    assert 1.0 <= seconds(utterance.audio) <= 1.0 + 0.3 + 0.15 + FRAME_MS / 1000
+    # Endpointed about end_silence_ms after speech, long before the fixture ends
+    speech_end_frame = (0.6 + 1.0) * 1000 // FRAME_MS
+    assert pulled[-1] <= speech_end_frame + 500 // FRAME_MS + 2
+
+
+def test_short_pause_does_not_end_the_utterance(make_wav):
+    path = make_wav([(0.6, SILENCE), (0.6, VOICE), (0.3, SILENCE), (0.6, VOICE), (2.0, SILENCE)])
+    speculated = []
+    capture, _ = capture_from(path, end_silence_ms=500, speculate_ms=240, on_speculate=speculated.append)
+    utterance = capture.capture()
+
+    assert seconds(utterance.audio) >= 1.5  # both phrases and the pause between them
+    # Recognition was started at the pause and again at the end
+    assert len(speculated) == 2
+    assert speculated[-1].get_raw_data() == utterance.audio.get_raw_data()
+
+
+def test_speculated_audio_matches_the_final_utterance(make_wav):
+    path = make_wav([(0.6, SILENCE), (1.0, VOICE), (2.0, SILENCE)])
+    speculated = []
+    capture, _ = capture_from(path, on_speculate=speculated.append)
+    utterance = capture.capture()
+    assert len(speculated) == 1
+    assert speculated[0].get_raw_data() == utterance.audio.get_raw_data()
+
+
+def test_silence_only_returns_none(make_wav):
+    capture, _ = capture_from(make_wav([(2.0, SILENCE)]))
+    assert capture.capture() is None
+
+
+def test_cancelled_capture_returns_none(make_wav):
+    capture, pulled = capture_from(make_wav([(0.6, SILENCE), (1.0, VOICE), (2.0, SILENCE)]))
+    assert capture.capture(cancelled=lambda: len(pulled) > 30) is None
+    assert len(pulled) <= 32
+
+
+def test_long_speech_is_capped(make_wav):
+    capture, _ = capture_from(make_wav([(0.6, SILENCE), (4.0, VOICE), (1.0, SILENCE)]),
+                              max_phrase_seconds=2.0)
+    utterance = capture.capture()
+    assert seconds(utterance.audio) <= 2.0 + FRAME_MS / 1000
@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+
+from llm_client import CANCELLED, LLMCancelled, LLMTimeoutError, ResilientLLM, TokenBucket
+
+
+class FakeLLM:
+    """Stands in for the Gemini runnable; each call takes the next scripted outcome"""
+
+    def __init__(self, *outcomes, delay: float = 0.0):
+        self.outcomes = list(outcomes)
+        self.delay = delay
+        self.calls = 0
+        self.kwargs = []
+        self._lock = threading.Lock()
+
+    def _next(self, kwargs):
+        with self._lock:
+            self.calls += 1
+            self.kwargs.append(kwargs)
+            outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        time.sleep(self.delay)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    def invoke(self, input, config=None, **kwargs):
+        return self._next(kwargs)
+
+    def stream(self, input, config=None, **kwargs):
+        for word in self._next(kwargs).split():
+            time.sleep(self.delay)
+            yield word
+
+
+class ResourceExhausted(Exception):
+    """Named like google.api_core's 429 error"""
+
+
+def resilient(llm, **options):
+    return ResilientLLM(llm, **{"backoff": 0.01, "max_backoff": 0.01, **options})
+
+
+def cancel_after(seconds):
+    cancelled = threading.Event()
+    threading.Timer(seconds, cancelled.set).start()
+    return {"configurable": {CANCELLED: cancelled.is_set}}
+
+
+def test_retryable_error_is_retried():
+    llm = FakeLLM(ResourceExhausted("429"), "ok")
+    client = resilient(llm)
+    assert client.invoke("hi") == "ok"
+    assert llm.calls == 2
+    assert client.counts["retries"] == 1
+
+
+def test_other_errors_are_not_retried():
+    llm = FakeLLM(ValueError("bad prompt"))
+    with pytest.raises(ValueError):
+        resilient(llm).invoke("hi")
+    assert llm.calls == 1
+
+
+def test_gives_up_after_max_retries():
+    llm = FakeLLM(ConnectionError("down"))
+    client = resilient(llm, max_retries=2)
+    with pytest.raises(ConnectionError):
+        client.invoke("hi")
+    assert llm.calls == 3
+    assert client.counts["failed"] == 1
+
+
+def test_call_kwargs_reach_every_attempt():
+    llm = FakeLLM(ResourceExhausted("429"), "ok")
+    resilient(llm, call_kwargs={"max_retries": 0}).invoke("hi")
+    assert llm.kwargs == [{"max_retries": 0}, {"max_retries": 0}]
+
+
+def test_deadline_bounds_a_slow_call():
+    client = resilient(FakeLLM("late", delay=2.0), deadline=0.2, max_retries=0)
+    started = time.monotonic()
+    with pytest.raises(LLMTimeoutError):
+        client.invoke("hi")
+    assert time.monotonic() - started < 1.0
+    assert client.counts["timeouts"] == 1
+
+
+def test_cancel_abandons_a_slow_call():
+    client = resilient(FakeLLM("late", delay=2.0))
+    started = time.monotonic()
+    with pytest.raises(LLMCancelled):
+        client.invoke("hi", cancel_after(0.1))
+    assert time.monotonic() - started < 1.0
+    assert client.counts["cancelled"] == 1
+
+
+def test_cancel_stops_retry_backoff():
+    llm = FakeLLM(ConnectionError("down"))
+    client = resilient(llm, max_retries=5, backoff=5.0, max_backoff=5.0)
+    started = time.monotonic()
+    with pytest.raises(LLMCancelled):
+        client.invoke("hi", cancel_after(0.2))
+    assert time.monotonic() - started < 1.0
+    assert llm.calls < 6
+
+
+def test_stream_yields_chunks():
+    assert list(resilient(FakeLLM("one two three")).stream("hi")) == ["one", "two", "three"]
+
+
+def test_stream_retries_before_the_first_chunk():
+    llm = FakeLLM(ResourceExhausted("429"), "one two")
+    assert list(resilient(llm).stream("hi")) == ["one", "two"]
+    assert llm.calls == 2
+
+
+def test_cancel_stops_a_stream_between_chunks():
+    client = resilient(FakeLLM("a b c d e f", delay=0.1))
+    received = []
+    with pytest.raises(LLMCancelled):
+        for chunk in client.stream("hi", cancel_after(0.35)):
+            received.append(chunk)
+    assert 0 < len(received) < 6
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20, burst=2)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.acquire(timeout=0.5)
@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+from embedding_backends import HashingEmbeddings
+from persistence import ContextWriter, turn_id
+
+
+class FakeCollection:
+    """Records upserts; ``failures`` leading writes raise first"""
+
+    name = "conversations"
+
+    def __init__(self, failures: int = 0, delay: float = 0.0):
+        self.failures = failures
+        self.delay = delay
+        self.rows = {}
+        self.upserts = 0
+        self.release = threading.Event()
+        if not delay:
+            self.release.set()
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.release.wait(self.delay or None)
+        self.upserts += 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database is locked")
+        for doc_id, vector, text, metadata in zip(ids, embeddings, documents, metadatas):
+            self.rows[doc_id] = (vector, text, metadata)
+
+
+def writer_for(collection, **options):
+    embeddings = HashingEmbeddings(dim=32)
+    options = {"max_wait": 0.01, "backoff": 0.01, "max_backoff": 0.01, **options}
+    return ContextWriter(lambda: embeddings, lambda _: collection, **options)
+
+
+def test_flush_waits_for_every_turn():
+    collection = FakeCollection()
+    writer = writer_for(collection)
+    for turn in range(1, 6):
+        writer.put("ravi", f"User: hi {turn}", {"turn": turn})
+    writer.put("sita", "User: hello", {"turn": 1})
+
+    assert writer.flush(timeout=5)
+    assert set(collection.rows) == {turn_id("ravi", t) for t in range(1, 6)} | {"sita:1"}
+    assert collection.rows["ravi:3"][1] == "User: hi 3"
+    assert writer.stats()["written"] == 6
+    writer.close()
+
+
+def test_failed_batch_is_retried_under_the_same_ids():
+    collection = FakeCollection(failures=2)
+    writer = writer_for(collection)
+    writer.put("ravi", "User: hi", {"turn": 1})
+
+    assert writer.flush(timeout=5)
+    assert list(collection.rows) == ["ravi:1"]
+    assert writer.stats()["retried"] == 2
+    writer.close()
+
+
+def test_flush_reports_dropped_turns_once():
+    collection = FakeCollection(failures=10)
+    writer = writer_for(collection, retries=1)
+    writer.put("ravi", "User: hi", {"turn": 1})
+
+    assert not writer.flush(timeout=5)
+    assert collection.rows == {}
+    assert writer.stats()["failed"] == 1
+    # Already reported; nothing new was dropped
+    assert writer.flush(timeout=5)
+    writer.close()
+
+
+def test_flush_times_out_while_a_write_is_stuck():
+    collection = FakeCollection(delay=5.0)
+    writer = writer_for(collection)
+    writer.put("ravi", "User: hi", {"turn": 1})
+
+    assert not writer.flush(timeout=0.1)
+    collection.release.set()
+    assert writer.flush(timeout=5)
+    writer.close()
+
+
+def test_put_after_close_raises():
+    writer = writer_for(FakeCollection())
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.put("ravi", "User: hi", {"turn": 1})
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import speech_recognition as sr
+
+from recognition import LocalBackend, RecognitionEngine
+
+
+def audio(tag: bytes = b"\x01") -> sr.AudioData:
+    return sr.AudioData(tag * 3200, 16000, 2)
+
+
+def engine_for(replies, **options):
+    """Engine over a LocalBackend answering ``replies[language]`` (a string or a callable)"""
+    calls = []
+    lock = threading.Lock()
+
+    def recognize(_, language):
+        with lock:
+            calls.append(language)
+        reply = replies.get(language, "")
+        return reply() if callable(reply) else reply
+
+    return RecognitionEngine(LocalBackend(recognize), **options), calls
+
+
+def slow(text, seconds):
+    def reply():
+        time.sleep(seconds)
+        return text
+    return reply
+
+
+def test_pick_prefers_telugu_script_from_the_telugu_request():
+    engine = RecognitionEngine(LocalBackend(lambda *_: ""))
+    assert engine.pick({"te-IN": ("నమస్కారం", 0.2), "en-US": ("namaskaram", 0.9)}) == "నమస్కారం"
+
+
+def test_pick_falls_back_to_the_most_confident_result():
+    engine = RecognitionEngine(LocalBackend(lambda *_: ""))
+    assert engine.pick({"te-IN": ("hello", 0.4), "en-US": ("hello there", 0.9)}) == "hello there"
+    assert engine.pick({"en-US": ("only english", 0.1)}) == "only english"
+
+
+def test_telugu_result_does_not_wait_for_english():
+    engine, _ = engine_for({"te-IN": "ఎలా ఉన్నావ్", "en-US": slow("ela unnav", 2.0)})
+    started = time.monotonic()
+    assert engine.recognize(audio()) == "ఎలా ఉన్నావ్"
+    assert time.monotonic() - started < 1.0
+
+
+def test_english_is_used_when_telugu_is_not_understood():
+    engine, _ = engine_for({"te-IN": "", "en-US": "what is the weather"})
+    assert engine.recognize(audio()) == "what is the weather"
+
+
+def test_nothing_understood_returns_none():
+    engine, _ = engine_for({})
+    assert engine.recognize(audio()) is None
+
+
+def test_timeout_returns_what_arrived_in_time():
+    engine, _ = engine_for({"te-IN": "hello", "en-US": slow("hello there", 2.0)}, timeout=0.3)
+    started = time.monotonic()
+    assert engine.recognize(audio()) == "hello"
+    assert time.monotonic() - started < 1.5
+
+
+def test_timeout_with_no_result_returns_none():
+    engine, _ = engine_for({"te-IN": slow("ఆలస్యం", 2.0), "en-US": slow("late", 2.0)}, timeout=0.2)
+    assert engine.recognize(audio()) is None
+
+
+def test_same_audio_is_recognized_once():
+    engine, calls = engine_for({"te-IN": "నమస్కారం"})
+    assert engine.recognize(audio()) == engine.recognize(audio()) == "నమస్కారం"
+    assert calls.count("te-IN") == 1
+    engine.recognize(audio(b"\x02"))
+    assert calls.count("te-IN") == 2
+
+
+def test_recognize_joins_a_prefetch_in_flight():
+    engine, calls = engine_for({"te-IN": slow("నమస్కారం", 0.2)})
+    engine.prefetch(audio())
+    assert engine.recognize(audio()) == "నమస్కారం"
+    assert calls.count("te-IN") == 1
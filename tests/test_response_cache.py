@@ -0,0 +1,77 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+import response_cache
+from embedding_backends import HashingEmbeddings
+from response_cache import SemanticResponseCache, context_key, normalize_utterance
+
+
+@pytest.fixture
+def cache():
+    return SemanticResponseCache(HashingEmbeddings(), threshold=0.8)
+
+
+def test_exact_match_in_the_same_scope(cache):
+    cache.store("ravi", "", "Hello!", "Namaskaram Ravi")
+    assert cache.lookup("ravi", "", "hello") == "Namaskaram Ravi"
+    assert cache.stats()["hits"] == 1
+
+
+def test_other_users_and_contexts_do_not_match(cache):
+    cache.store("ravi", "abc", "tell me more", "More about cricket")
+    assert cache.lookup("sita", "abc", "tell me more") is None
+    assert cache.lookup("ravi", "def", "tell me more") is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_near_duplicate_matches_and_unrelated_does_not(cache):
+    cache.store("ravi", "", "tell me a story about krishna", "Once upon a time...")
+    assert cache.lookup("ravi", "", "tell me story about krishna") == "Once upon a time..."
+    assert cache.lookup("ravi", "", "play some telugu songs") is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    cache = SemanticResponseCache(HashingEmbeddings(), ttl=60)
+    cache.store("ravi", "", "hello", "Namaskaram")
+    now[0] += 59
+    assert cache.lookup("ravi", "", "hello") == "Namaskaram"
+    now[0] += 2
+    assert cache.lookup("ravi", "", "hello") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_is_evicted(cache):
+    cache.max_entries = 2
+    cache.store("ravi", "", "hello", "a")
+    cache.store("ravi", "", "thank you", "b")
+    cache.lookup("ravi", "", "hello")
+    cache.store("ravi", "", "good night", "c")
+    assert cache.lookup("ravi", "", "thank you") is None
+    assert cache.lookup("ravi", "", "hello") == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_normalize_keeps_telugu_vowel_signs():
+    assert normalize_utterance("  ఎలా ఉన్నావ్?? ") == "ఎలా ఉన్నావ్"
+
+
+def test_context_key_of_small_talk_ignores_history():
+    history = [HumanMessage(content="who won"), AIMessage(content="India")]
+    assert context_key("Hello!", history) == context_key("hello", []) == ""
+
+
+def test_context_key_follows_the_last_exchange_and_summary():
+    first = [HumanMessage(content="tell me about cricket"), AIMessage(content="Cricket is...")]
+    second = [HumanMessage(content="tell me about movies"), AIMessage(content="Movies are...")]
+    key = context_key("tell me more", first, "likes sports")
+    assert key
+    assert key == context_key("tell me more", [HumanMessage(content="old")] + first, "likes sports")
+    assert key != context_key("tell me more", second, "likes sports")
+    assert key != context_key("tell me more", first, "likes films")
+
+
+@pytest.mark.parametrize("utterance", ["what time is it", "ఈరోజు తేదీ ఏంటి", "weather today?", "ఈ రోజు ఏం ఉంది"])
+def test_context_key_never_caches_time_dependent_asks(utterance):
+    assert context_key(utterance, []) is None
@@ -0,0 +1,51 @@
+from streaming import SentenceChunker
+
+
+def feed_all(chunker, tokens):
+    chunks = []
+    for token in tokens:
+        chunks.extend(chunker.feed(token))
+    return chunks + chunker.flush()
+
+
+def test_cuts_at_sentence_end_once_long_enough():
+    chunker = SentenceChunker(min_chars=12)
+    assert chunker.feed("Hello there, friend") == []
+    assert chunker.feed(". How") == ["Hello there, friend."]
+    assert chunker.flush() == ["How"]
+
+
+def test_short_sentences_are_merged_with_the_next():
+    chunks = feed_all(SentenceChunker(min_chars=12), ["Hi. ", "How are you today? ", "Fine."])
+    assert chunks == ["Hi. How are you today?", "Fine."]
+
+
+def test_telugu_danda_ends_a_sentence():
+    chunks = feed_all(SentenceChunker(min_chars=5), ["నమస్కారం బుజ్జి ఇక్కడ। ", "ఏం కావాలి"])
+    assert chunks == ["నమస్కారం బుజ్జి ఇక్కడ।", "ఏం కావాలి"]
+
+
+def test_decimal_point_is_not_a_boundary():
+    chunks = feed_all(SentenceChunker(min_chars=5), ["Pi is 3.14 or so and that is all"])
+    assert chunks == ["Pi is 3.14 or so and that is all"]
+
+
+def test_long_sentence_is_cut_at_a_soft_break():
+    chunker = SentenceChunker(min_chars=5, max_chars=40)
+    chunks = chunker.feed("one two three four five, six seven eight nine ten eleven")
+    assert chunks == ["one two three four five,"]
+    assert chunker.flush() == ["six seven eight nine ten eleven"]
+
+
+def test_long_sentence_without_breaks_is_cut_at_a_space():
+    chunker = SentenceChunker(min_chars=5, max_chars=20)
+    chunks = chunker.feed("aaaa bbbb cccc dddd eeee ffff")
+    assert chunks and all(len(chunk) <= 20 for chunk in chunks)
+    assert " ".join(chunks + chunker.flush()) == "aaaa bbbb cccc dddd eeee ffff"
+
+
+def test_flush_empties_the_buffer():
+    chunker = SentenceChunker()
+    chunker.feed("   ")
+    assert chunker.flush() == []
+    assert chunker.buffer == ""